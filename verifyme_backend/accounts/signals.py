@@ -1,8 +1,9 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from .models import User, UserProfile
+from forms.data_version import ACTIVITY, bump_data_version
+from .models import Organization, UserProfile
 import logging
 
 logger = logging.getLogger(__name__)
@@ -33,4 +34,16 @@ def update_user_metadata(sender, instance, **kwargs):
             if old_instance.role != instance.role:
                 logger.info(f"User {instance.email} role changed from {old_instance.role} to {instance.role}")
         except User.DoesNotExist:
-            pass
\ No newline at end of file
+            pass
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_user_activity_version(sender, instance, **kwargs):
+    """User counts are part of the cached activity analytics"""
+    bump_data_version(instance.organization_id, ACTIVITY)
+
+@receiver(post_save, sender=Organization)
+@receiver(post_delete, sender=Organization)
+def bump_organization_activity_version(sender, instance, **kwargs):
+    """Organization counts are part of the cached real-time analytics"""
+    bump_data_version(instance.pk, ACTIVITY)
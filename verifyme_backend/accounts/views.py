@@ -9,6 +9,7 @@ from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Count, Q
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 from .models import Organization, UserProfile
 from .serializers import (
@@ -23,6 +24,7 @@ from .serializers import (
     EmployeeUpdateSerializer
 )
 from .permissions import IsSuperAdmin, IsOrganizationAdmin
+from forms.data_version import ACTIVITY, cached_statistics
 
 User = get_user_model()
 
@@ -552,73 +554,76 @@ class UserViewSet(viewsets.ModelViewSet):
             )
         
         from logs.models import AuditLog
-        from datetime import datetime, timedelta
         
-        # Get current time
-        now = datetime.now()
-        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        # Start of the local day, for the "today" counters
+        today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
         
-        # Organization statistics
-        total_organizations = Organization.objects.count()
-        active_organizations = Organization.objects.filter(is_active=True).count()
+        def compute():
+            # Organization statistics
+            total_organizations = Organization.objects.count()
+            active_organizations = Organization.objects.filter(is_active=True).count()
         
-        # User statistics
-        total_users = User.objects.count()
-        total_employees = User.objects.filter(role='EMPLOYEE').count()
-        total_admins = User.objects.filter(role='ADMIN').count()
-        total_super_admins = User.objects.filter(role='SUPER_ADMIN').count()
-        
-        # Today's statistics
-        new_organizations_today = Organization.objects.filter(created_at__gte=today).count()
-        new_users_today = User.objects.filter(date_joined__gte=today).count()
-        
-        # Login/Logout statistics
-        total_logins = AuditLog.objects.filter(action='LOGIN').count()
-        total_logouts = AuditLog.objects.filter(action='LOGOUT').count()
-        logins_today = AuditLog.objects.filter(action='LOGIN', timestamp__gte=today).count()
-        logouts_today = AuditLog.objects.filter(action='LOGOUT', timestamp__gte=today).count()
-        
-        # Recent login/logout activities (last 20)
-        recent_activities = AuditLog.objects.filter(
-            action__in=['LOGIN', 'LOGOUT']
-        ).select_related('user', 'organization').order_by('-timestamp')[:20]
-        
-        # Format recent activities
-        formatted_activities = []
-        for activity in recent_activities:
-            formatted_activities.append({
-                'id': str(activity.id),
-                'action': activity.action,
-                'user_name': f"{activity.user.first_name} {activity.user.last_name}" if activity.user else "Unknown User",
-                'user_role': activity.user.role if activity.user else "Unknown",
-                'organization_name': activity.organization.name if activity.organization else "System",
-                'timestamp': activity.timestamp.isoformat(),
-                'ip_address': activity.ip_address,
-                'details': activity.details
-            })
+            # User statistics
+            total_users = User.objects.count()
+            total_employees = User.objects.filter(role='EMPLOYEE').count()
+            total_admins = User.objects.filter(role='ADMIN').count()
+            total_super_admins = User.objects.filter(role='SUPER_ADMIN').count()
+        
+            # Today's statistics
+            new_organizations_today = Organization.objects.filter(created_at__gte=today).count()
+            new_users_today = User.objects.filter(date_joined__gte=today).count()
+        
+            # Login/Logout statistics
+            total_logins = AuditLog.objects.filter(action='LOGIN').count()
+            total_logouts = AuditLog.objects.filter(action='LOGOUT').count()
+            logins_today = AuditLog.objects.filter(action='LOGIN', timestamp__gte=today).count()
+            logouts_today = AuditLog.objects.filter(action='LOGOUT', timestamp__gte=today).count()
+        
+            # Recent login/logout activities (last 20)
+            recent_activities = AuditLog.objects.filter(
+                action__in=['LOGIN', 'LOGOUT']
+            ).select_related('user', 'organization').order_by('-timestamp')[:20]
+        
+            # Format recent activities
+            formatted_activities = []
+            for activity in recent_activities:
+                formatted_activities.append({
+                    'id': str(activity.id),
+                    'action': activity.action,
+                    'user_name': f"{activity.user.first_name} {activity.user.last_name}" if activity.user else "Unknown User",
+                    'user_role': activity.user.role if activity.user else "Unknown",
+                    'organization_name': activity.organization.name if activity.organization else "System",
+                    'timestamp': activity.timestamp.isoformat(),
+                    'ip_address': activity.ip_address,
+                    'details': activity.details
+                })
+        
+            return {
+                'organizations': {
+                    'total': total_organizations,
+                    'active': active_organizations,
+                    'new_today': new_organizations_today
+                },
+                'users': {
+                    'total': total_users,
+                    'employees': total_employees,
+                    'admins': total_admins,
+                    'super_admins': total_super_admins,
+                    'new_today': new_users_today
+                },
+                'activities': {
+                    'total_logins': total_logins,
+                    'total_logouts': total_logouts,
+                    'logins_today': logins_today,
+                    'logouts_today': logouts_today
+                },
+                'recent_activities': formatted_activities
+            }
         
-        return Response({
-            'organizations': {
-                'total': total_organizations,
-                'active': active_organizations,
-                'new_today': new_organizations_today
-            },
-            'users': {
-                'total': total_users,
-                'employees': total_employees,
-                'admins': total_admins,
-                'super_admins': total_super_admins,
-                'new_today': new_users_today
-            },
-            'activities': {
-                'total_logins': total_logins,
-                'total_logouts': total_logouts,
-                'logins_today': logins_today,
-                'logouts_today': logouts_today
-            },
-            'recent_activities': formatted_activities,
-            'last_updated': now.isoformat()
-        })
+        # Cached until users, organizations or audit logs change; the timestamp
+        # is the time of this response, not of the cached figures
+        data = cached_statistics('real_time_analytics', None, compute, scopes=(ACTIVITY,), parts=(today,))
+        return Response(dict(data, last_updated=timezone.now().isoformat()))
 
 
 class CustomTokenObtainPairView(TokenObtainPairView):
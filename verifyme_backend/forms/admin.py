@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import DynamicFormSchema, FormEntry, FileAttachment, FormField, FormFieldFile
+from .models import DynamicFormSchema, FormEntry, FileAttachment, FormField, FormFieldFile, EntrySequence
 
 
 @admin.register(DynamicFormSchema)
@@ -111,3 +111,10 @@ class FormFieldFileAdmin(admin.ModelAdmin):
     list_filter = ['is_verified', 'file_type', 'uploaded_at']
     search_fields = ['original_filename', 'form_entry__case_id', 'field_name']
     readonly_fields = ['uploaded_at', 'file_size']
+
+
+@admin.register(EntrySequence)
+class EntrySequenceAdmin(admin.ModelAdmin):
+    list_display = ['organization', 'name', 'last_value', 'updated_at']
+    list_filter = ['name', 'organization']
+    readonly_fields = ['updated_at']
@@ -0,0 +1,116 @@
+"""
+Count service for filtered form entry querysets.
+
+Exact COUNT(*) over a large filtered set can cost more than fetching the page
+it belongs to. count_entries() asks the Postgres planner for an estimate
+first (EXPLAIN, no execution) and only runs the exact count when the estimate
+is below COUNT_ESTIMATE_THRESHOLD. Exact counts are cached under the
+normalized filter hash (see forms/filter_compiler.py) and the organization's
+data version in the statistics cache (see forms/data_version.py), so any
+write invalidates them, and computed once for concurrent identical requests.
+
+Every result says whether it is exact, so clients can show "about 1.2M".
+"""
+import hashlib
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connections
+
+from .data_version import get_data_version, single_flight, statistics_cache
+from .statistics import conditional_counts
+
+COUNT_ESTIMATE_THRESHOLD = getattr(settings, 'FORM_ENTRY_COUNT_ESTIMATE_THRESHOLD', 50000)
+COUNT_CACHE_TIMEOUT = getattr(settings, 'FORM_ENTRY_COUNT_CACHE_TIMEOUT', 300)
+
+
+class CountResult:
+    """A count and how it was obtained"""
+    __slots__ = ('value', 'exact', 'cached')
+
+    def __init__(self, value, exact=True, cached=False):
+        self.value = value
+        self.exact = exact
+        self.cached = cached
+
+    def as_dict(self, prefix='count'):
+        return {prefix: self.value, f'{prefix}_exact': self.exact}
+
+
+def estimate_count(queryset):
+    """Planner row estimate for a queryset, or None when the database can't provide one"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def queryset_fingerprint(queryset):
+    """Hash of a queryset's SQL, for callers that don't have a compiled filter.
+
+    Datetime parameters are truncated to the minute: filters relative to now
+    would otherwise give every request its own key.
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    params = [param.replace(second=0, microsecond=0) if isinstance(param, datetime) else param for param in params]
+    payload = json.dumps([sql, [str(param) for param in params]])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def count_cache_key(organization_id, filter_hash, suffix='count'):
+    version = get_data_version(organization_id)
+    return f'forms:{suffix}:{organization_id or "all"}:{version}:{filter_hash}'
+
+
+def count_entries(queryset, filter_hash=None, organization_id=None, exact=False,
+                  threshold=COUNT_ESTIMATE_THRESHOLD):
+    """Count a FormEntry queryset, estimating above `threshold` unless `exact` is set"""
+    filter_hash = filter_hash or queryset_fingerprint(queryset)
+    key = count_cache_key(organization_id, filter_hash)
+
+    cached = statistics_cache.get(key)
+    if cached is not None:
+        return CountResult(cached, exact=True, cached=True)
+
+    if not exact:
+        estimate = estimate_count(queryset)
+        if estimate is not None and estimate > threshold:
+            return CountResult(estimate, exact=False)
+
+    # Concurrent requests for the same filter wait for one COUNT(*)
+    value, cached = single_flight(key, lambda: queryset.order_by().count(), COUNT_CACHE_TIMEOUT)
+    return CountResult(value, exact=True, cached=cached)
+
+
+def count_periods(queryset, periods, filter_hash=None, organization_id=None,
+                  threshold=COUNT_ESTIMATE_THRESHOLD):
+    """Counts of a queryset overall and per named Q (e.g. created this week).
+
+    Returns (counts, exact). Exact counts come from one conditional aggregate
+    and are cached like count_entries(); large sets are estimated per period.
+    """
+    filter_hash = filter_hash or queryset_fingerprint(queryset)
+    key = count_cache_key(organization_id, filter_hash, suffix='period_counts')
+
+    cached = statistics_cache.get(key)
+    if cached is not None:
+        return cached, True
+
+    estimate = estimate_count(queryset)
+    if estimate is not None and estimate > threshold:
+        counts = {'total': estimate}
+        for name, period_q in periods.items():
+            counts[name] = estimate_count(queryset.filter(period_q))
+        return counts, False
+
+    counts, _ = single_flight(
+        key, lambda: conditional_counts(queryset, {'total': None, **periods}), COUNT_CACHE_TIMEOUT
+    )
+    return counts, True
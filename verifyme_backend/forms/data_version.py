@@ -0,0 +1,308 @@
+"""
+Per-organization data versions and the statistics cache.
+
+Anything cached from tenant queries (counts, statistics, analytics) includes
+the organization's data versions in its cache key. Writes bump the version,
+so stale entries are never read again and simply expire. The "all" counter is
+bumped with every organization and keys super-admin (cross-tenant) caches.
+
+Versions are kept per scope, so activity (audit logs, users) doesn't
+invalidate entry statistics and vice versa:
+
+    ENTRIES   form entries and schemas (forms/signals.py)
+    ACTIVITY  audit logs, users and organizations (logs/ and accounts/signals.py)
+
+Values and versions live in the STATISTICS_CACHE_ALIAS cache (Redis when
+REDIS_URL is set). When it can't be reached, statistics_cache falls back to an
+in-process LRU with short timeouts, since bumps in other processes don't reach
+it, and retries the shared cache after SHARED_RETRY_INTERVAL. On recovery the
+shared epoch is bumped, which retires everything cached before the outage.
+Tests can swap the backend with use_statistics_cache(LocalLRUCache()).
+
+single_flight() keeps a crowd of identical requests (a whole organization
+opening the dashboard at shift start) from all running the same query: one
+computes under a cache lock, the rest wait for its result.
+"""
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+ALL_ORGANIZATIONS = 'all'
+
+KEY_PREFIX = 'forms:data_version'
+EPOCH_KEY = f'{KEY_PREFIX}:epoch'
+
+ENTRIES = 'entries'
+ACTIVITY = 'activity'
+
+# Versions outlive the data cached under them
+VERSION_TIMEOUT = None
+
+STATISTICS_CACHE_ALIAS = getattr(settings, 'STATISTICS_CACHE_ALIAS', 'default')
+STATISTICS_CACHE_TIMEOUT = getattr(settings, 'STATISTICS_CACHE_TIMEOUT', 300)
+LOCAL_CACHE_SIZE = getattr(settings, 'STATISTICS_LOCAL_CACHE_SIZE', 1024)
+
+# Longest an entry lives in the fallback LRU, versions included
+LOCAL_FALLBACK_TIMEOUT = 30
+SHARED_RETRY_INTERVAL = 30
+
+# Identical computations in flight: how long waiters poll for the result, and
+# how long the lock outlives a holder that died
+SINGLE_FLIGHT_WAIT = getattr(settings, 'STATISTICS_SINGLE_FLIGHT_WAIT', 10)
+SINGLE_FLIGHT_LOCK_TIMEOUT = 60
+SINGLE_FLIGHT_POLL_INTERVAL = 0.02
+SINGLE_FLIGHT_MAX_POLL_INTERVAL = 0.25
+
+
+class LocalLRUCache:
+    """Small thread-safe in-process cache with the subset of the Django cache API used here"""
+
+    def __init__(self, max_size=LOCAL_CACHE_SIZE, max_timeout=None):
+        self.max_size = max_size
+        self.max_timeout = max_timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expiry(self, timeout):
+        if self.max_timeout is not None and (timeout is None or timeout > self.max_timeout):
+            timeout = self.max_timeout
+        return None if timeout is None else time.monotonic() + timeout
+
+    def _live(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[0] is not None and item[0] <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return item
+
+    def _store(self, key, value, timeout):
+        self._data[key] = (self._expiry(timeout), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._live(key)
+            return default if item is None else item[1]
+
+    def get_many(self, keys):
+        with self._lock:
+            return {key: item[1] for key in keys if (item := self._live(key)) is not None}
+
+    def set(self, key, value, timeout=STATISTICS_CACHE_TIMEOUT):
+        if timeout is not None and timeout <= 0:
+            return
+        with self._lock:
+            self._store(key, value, timeout)
+
+    def add(self, key, value, timeout=STATISTICS_CACHE_TIMEOUT):
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            self._store(key, value, timeout)
+            return True
+
+    def incr(self, key, delta=1):
+        with self._lock:
+            item = self._live(key)
+            if item is None:
+                raise ValueError(f"Key '{key}' not found")
+            self._data[key] = (item[0], item[1] + delta)
+            return item[1] + delta
+
+    def delete(self, key):
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class StatisticsCache:
+    """The shared statistics cache, or an in-process LRU while it is unreachable"""
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.local = LocalLRUCache(max_timeout=LOCAL_FALLBACK_TIMEOUT)
+        self._down_until = None
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return self.backend if self.backend is not None else caches[STATISTICS_CACHE_ALIAS]
+
+    def _call(self, method, *args):
+        down_until = self._down_until
+        if down_until is None or time.monotonic() >= down_until:
+            try:
+                result = getattr(self.shared, method)(*args)
+            except ValueError:
+                # incr() of a missing key; not a connection problem
+                raise
+            except Exception as exc:
+                with self._lock:
+                    if self._down_until is None:
+                        logger.warning(f"Statistics cache unavailable, using the local cache: {exc}")
+                    self._down_until = time.monotonic() + SHARED_RETRY_INTERVAL
+            else:
+                if down_until is not None:
+                    self._recovered()
+                return result
+        return getattr(self.local, method)(*args)
+
+    def _recovered(self):
+        with self._lock:
+            if self._down_until is None:
+                return
+            self._down_until = None
+        logger.info("Statistics cache reachable again, retiring entries cached before the outage")
+        try:
+            self.shared.set(EPOCH_KEY, _initial_version(), VERSION_TIMEOUT)
+        except Exception as exc:
+            logger.warning(f"Could not bump the statistics cache epoch: {exc}")
+        self.local.clear()
+
+    def get(self, key, default=None):
+        value = self._call('get', key)
+        return default if value is None else value
+
+    def get_many(self, keys):
+        return self._call('get_many', keys)
+
+    def set(self, key, value, timeout=STATISTICS_CACHE_TIMEOUT):
+        return self._call('set', key, value, timeout)
+
+    def add(self, key, value, timeout=STATISTICS_CACHE_TIMEOUT):
+        return self._call('add', key, value, timeout)
+
+    def incr(self, key, delta=1):
+        return self._call('incr', key, delta)
+
+    def delete(self, key):
+        return self._call('delete', key)
+
+
+statistics_cache = StatisticsCache()
+
+
+def use_statistics_cache(backend=None):
+    """Point statistics_cache at another backend (e.g. a LocalLRUCache in tests); None restores the configured one"""
+    statistics_cache.backend = backend
+    statistics_cache.local.clear()
+    statistics_cache._down_until = None
+
+
+def _initial_version():
+    # Time based, so a counter that was evicted restarts above every version handed out before
+    return time.time_ns() // 1000
+
+
+def _key(organization_id, scope=ENTRIES):
+    return f'{KEY_PREFIX}:{scope}:{organization_id or ALL_ORGANIZATIONS}'
+
+
+def _versions(keys):
+    """Current values of some version counters, starting the missing ones"""
+    found = statistics_cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            statistics_cache.add(key, _initial_version(), VERSION_TIMEOUT)
+            version = statistics_cache.get(key) or 0
+        versions.append(version)
+    return versions
+
+
+def get_data_version(organization_id=None, scopes=(ENTRIES,)):
+    """Current data version of an organization (or of all organizations), for cache keys"""
+    if isinstance(scopes, str):
+        scopes = (scopes,)
+    versions = _versions([EPOCH_KEY] + [_key(organization_id, scope) for scope in scopes])
+    return '.'.join(str(version) for version in versions)
+
+
+def bump_data_version(organization_id=None, scope=ENTRIES):
+    """Invalidate everything cached for an organization and for cross-tenant views"""
+    keys = [_key(ALL_ORGANIZATIONS, scope)]
+    if organization_id:
+        keys.append(_key(organization_id, scope))
+    for key in keys:
+        try:
+            statistics_cache.incr(key)
+        except ValueError:
+            # Not set yet (or evicted): start above any version handed out before
+            statistics_cache.add(key, _initial_version(), VERSION_TIMEOUT)
+
+
+def statistics_cache_key(name, organization_id=None, scopes=(ENTRIES,), parts=()):
+    """Cache key of a statistic for an organization's current data versions"""
+    version = get_data_version(organization_id, scopes)
+    digest = hashlib.md5(repr(tuple(parts)).encode('utf-8')).hexdigest()
+    return f'forms:statistics:{name}:{organization_id or ALL_ORGANIZATIONS}:{version}:{digest}'
+
+
+def single_flight(key, compute, timeout=STATISTICS_CACHE_TIMEOUT, wait=SINGLE_FLIGHT_WAIT):
+    """(value, cached) of the statistics cache entry `key`, computing it once at a time.
+
+    The first caller to miss takes a lock entry with add() (SET NX on Redis,
+    so across processes) and computes; concurrent callers poll for its
+    result instead of running the same query. A waiter gives up after `wait`
+    seconds and computes itself; the lock expires on its own if its holder dies.
+    """
+    value = statistics_cache.get(key)
+    if value is not None:
+        return value, True
+
+    lock_key = f'{key}:lock'
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + wait
+    delay = SINGLE_FLIGHT_POLL_INTERVAL
+    while not statistics_cache.add(lock_key, token, SINGLE_FLIGHT_LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            logger.warning(f"Gave up waiting for {key} after {wait}s, computing it again")
+            value = compute()
+            statistics_cache.set(key, value, timeout)
+            return value, False
+        time.sleep(delay)
+        delay = min(delay * 2, SINGLE_FLIGHT_MAX_POLL_INTERVAL)
+        value = statistics_cache.get(key)
+        if value is not None:
+            logger.debug(f"Waited for in-flight {key}")
+            return value, True
+
+    try:
+        # The previous holder may have stored it between our get() and add()
+        value = statistics_cache.get(key)
+        if value is not None:
+            return value, True
+        value = compute()
+        statistics_cache.set(key, value, timeout)
+        return value, False
+    finally:
+        if statistics_cache.get(lock_key) == token:
+            statistics_cache.delete(lock_key)
+
+
+def cached_statistics(name, organization_id, compute, scopes=(ENTRIES,), parts=(),
+                      timeout=STATISTICS_CACHE_TIMEOUT):
+    """compute() cached until the organization's data changes or `timeout` passes.
+
+    parts are anything else the result depends on (role, filter hash, day).
+    Identical concurrent requests share one computation (see single_flight()).
+    """
+    key = statistics_cache_key(name, organization_id, scopes, parts)
+    return single_flight(key, compute, timeout)[0]
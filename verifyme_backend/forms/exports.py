@@ -0,0 +1,487 @@
+"""
+Building blocks of the form entry exports (FormEntryExportView and
+EnhancedFormEntryExportView).
+
+Exports used to load every entry, walk them once to collect the schema columns
+and again to write rows, with two attachment queries per row. Here columns are
+planned from the DISTINCT schemas of the filtered entries, rows come from a
+server-side cursor (queryset.iterator) in chunks with their attachments
+prefetched per chunk, and streaming_csv_response() sends each chunk as it is
+written, so memory stays flat and the header goes out before the first row
+is read.
+
+Excel exports use a write-only openpyxl workbook (WriteOnlySheet): cells go
+straight to a temporary file with shared named styles, dates and numbers as
+typed cells, and column widths estimated from the first rows.
+settings.EXCEL_EXPORT_ENGINE = 'workbook' (or options.excel_engine) switches
+back to the in-memory Workbook; `manage.py benchmark_excel_export` compares
+the two.
+
+PDF exports plan their columns, widths and table style once and hand the rows
+to utils.pdf, which renders them in chunks on a process pool and merges the
+parts. A web process runs at most PDF_PARALLEL_RENDERS pools at once; other
+PDF exports meanwhile render in their own thread. They refuse more than PDF_MAX_ROWS entries (PDF_JOB_MAX_ROWS in a
+background job) and give up after PDF_REQUEST_TIMEOUT (PDF_JOB_TIMEOUT)
+seconds, raising ExportLimitError; `manage.py benchmark_pdf_export` compares
+one process with the pool.
+
+Parquet and Arrow IPC (Feather) exports are typed: form_data columns take
+their field's field_type (NUMERIC, DATE, BOOLEAN; values that don't parse are
+null), dates are timestamps and empty values are null rather than 'N/A'. Rows
+go to the file in record batches as they come off the cursor. Both need
+pyarrow; without it they raise ExportFormatError.
+"""
+import csv
+import io
+import itertools
+import json
+import math
+import os
+import tempfile
+import threading
+from datetime import date, datetime, timezone as dt_timezone
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date, parse_datetime
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+from utils.pdf import PDFRenderTimeout, render_table_pdf
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pq = None
+
+from .models import DynamicFormSchema, FileAttachment, FormFieldFile
+from .schema_cache import get_compiled_schema
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXCEL_EXPORT_ENGINE = getattr(settings, 'EXCEL_EXPORT_ENGINE', 'write_only')
+EXCEL_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+# Rows held back to estimate column widths, and the widest a column gets
+EXCEL_WIDTH_SAMPLE = 500
+EXCEL_MAX_WIDTH = 50
+
+# Named styles of export workbooks, stored once in the file and shared by every cell
+HEADER_STYLE = 'export_header'
+CELL_STYLE = 'export_cell'
+DATE_STYLE = 'export_date'
+DATETIME_STYLE = 'export_datetime'
+ALERT_STYLE = 'export_alert'
+TITLE_STYLE = 'export_title'
+
+# Entries a PDF export may hold; longer reports belong in Excel or CSV
+PDF_MAX_ROWS = getattr(settings, 'PDF_MAX_ROWS', 5000)
+PDF_JOB_MAX_ROWS = getattr(settings, 'PDF_JOB_MAX_ROWS', 50000)
+# Seconds rendering may take: below the web worker timeout in a request
+PDF_REQUEST_TIMEOUT = getattr(settings, 'PDF_REQUEST_TIMEOUT', 90)
+PDF_JOB_TIMEOUT = getattr(settings, 'PDF_JOB_TIMEOUT', 30 * 60)
+# Rows rendered per part (a few pages), and the processes rendering parts
+PDF_CHUNK_ROWS = getattr(settings, 'PDF_CHUNK_ROWS', 500)
+PDF_WORKERS = getattr(settings, 'PDF_WORKERS', min(4, os.cpu_count() or 1))
+# Pools rendering at once per process (requests and background jobs together)
+PDF_PARALLEL_RENDERS = getattr(settings, 'PDF_PARALLEL_RENDERS', 1)
+_pdf_pool_slots = threading.BoundedSemaphore(PDF_PARALLEL_RENDERS)
+# Rows measured to size PDF columns
+PDF_WIDTH_SAMPLE = 500
+
+# Columnar formats: (extension, content type)
+COLUMNAR_FORMATS = {
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'feather': ('feather', 'application/vnd.apache.arrow.file'),
+}
+COLUMNAR_COMPRESSION = 'zstd'
+# Rows per Parquet row group; batches are buffered up to this many
+PARQUET_ROW_GROUP_SIZE = 50000
+# Column type of a form_data field by field_type; every other field is text
+FIELD_COLUMN_TYPES = {'NUMERIC': 'float64', 'DATE': 'date32', 'BOOLEAN': 'bool'}
+TRUE_VALUES = {'true', 'yes', 'y', '1', 'on'}
+FALSE_VALUES = {'false', 'no', 'n', '0', 'off'}
+
+
+class ExportLimitError(ValueError):
+    """The export is larger, or took longer, than its format allows"""
+
+
+class ExportFormatError(ValueError):
+    """The export format can't be written on this server"""
+
+
+def planned_field_types(entries):
+    """{field name: field type} of the distinct schemas an export's entries use; None where schemas disagree"""
+    schema_ids = entries.order_by().values('form_schema_id').distinct()
+    schemas = DynamicFormSchema.objects.filter(pk__in=schema_ids).select_related(None).only('id', 'version')
+    types = {}
+    for schema in schemas:
+        for name, field in get_compiled_schema(schema).field_map.items():
+            field_type = str(field.get('field_type') or '').upper() or None
+            types[name] = field_type if types.get(name, field_type) == field_type else None
+    return types
+
+
+def planned_field_names(entries):
+    """Sorted form_data columns of an export: the fields of the distinct schemas its entries use"""
+    return sorted(planned_field_types(entries))
+
+
+def field_header(field_name):
+    return field_name.replace('_', ' ').title()
+
+
+def export_rows(entries, attachments=False, chunk_size=EXPORT_CHUNK_SIZE):
+    """Entries from a server-side cursor, chunk_size at a time.
+
+    With attachments, each chunk's attachments and field files (file names
+    only) are loaded with one query each; see attachment_names().
+    """
+    # Rows only need the schema's TAT limit, not its field definitions
+    entries = entries.defer('form_schema__fields_definition')
+    if attachments:
+        entries = entries.prefetch_related(
+            Prefetch('attachments', queryset=FileAttachment.objects.only(
+                'id', 'form_entry_id', 'file', 'original_filename', 'uploaded_at'
+            )),
+            Prefetch('field_files', queryset=FormFieldFile.objects.only(
+                'id', 'form_entry_id', 'field_name', 'original_filename', 'uploaded_at'
+            )),
+        )
+    return entries.iterator(chunk_size=chunk_size)
+
+
+def attachment_names(entry):
+    """Attachment and field file names of an entry loaded by export_rows(attachments=True)"""
+    names = [attachment.original_filename for attachment in entry.attachments.all()]
+    names.extend(f"{field_file.field_name}: {field_file.original_filename}" for field_file in entry.field_files.all())
+    return names
+
+
+def iter_csv(headers, rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield CSV text: the header line, then one string per chunk_size rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    writer.writerow(headers)
+    yield flush()
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_size:
+            yield flush()
+            pending = 0
+    if pending:
+        yield flush()
+
+
+def streaming_csv_response(headers, rows, filename, chunk_size=EXPORT_CHUNK_SIZE):
+    """StreamingHttpResponse writing a CSV attachment from an iterator of rows"""
+    response = StreamingHttpResponse(iter_csv(headers, rows, chunk_size), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def new_export_workbook():
+    """Write-only workbook with the export named styles registered"""
+    workbook = Workbook(write_only=True)
+    thin = Side(style='thin')
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    for style in (
+        NamedStyle(
+            HEADER_STYLE,
+            font=Font(bold=True, color='FFFFFF', size=12),
+            fill=PatternFill(start_color='366092', end_color='366092', fill_type='solid'),
+            alignment=Alignment(horizontal='center', vertical='center'),
+            border=border,
+        ),
+        NamedStyle(CELL_STYLE, border=border),
+        NamedStyle(DATE_STYLE, border=border, number_format='yyyy-mm-dd'),
+        NamedStyle(DATETIME_STYLE, border=border, number_format='yyyy-mm-dd hh:mm:ss'),
+        NamedStyle(
+            ALERT_STYLE,
+            font=Font(color='FFFFFF', bold=True),
+            fill=PatternFill(start_color='FF0000', end_color='FF0000', fill_type='solid'),
+            border=border,
+        ),
+        NamedStyle(TITLE_STYLE, font=Font(bold=True, size=14)),
+    ):
+        workbook.add_named_style(style)
+    return workbook
+
+
+def excel_datetime(value):
+    """Aware datetime as the naive UTC datetime Excel can store, to the second like the text exports"""
+    if value is None:
+        return None
+    if value.tzinfo:
+        value = value.astimezone(dt_timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=0)
+
+
+def excel_value(value, field_type=None):
+    """A form_data value as a typed cell: numbers, booleans and dates keep their type, the rest is text"""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        if field_type == 'NUMERIC':
+            try:
+                number = float(value)
+            except ValueError:
+                pass
+            else:
+                if not math.isfinite(number):
+                    return value
+                return int(number) if number.is_integer() and '.' not in value else number
+        elif field_type == 'DATE':
+            try:
+                parsed = parse_date(value) or excel_datetime(parse_datetime(value))
+            except ValueError:
+                parsed = None
+            if parsed is not None:
+                return parsed
+        # Control characters make openpyxl refuse the whole file
+        return ILLEGAL_CHARACTERS_RE.sub('', value)
+    return str(value)
+
+
+def field_style(field_type):
+    return DATE_STYLE if field_type == 'DATE' else CELL_STYLE
+
+
+def _display_width(value):
+    if value is None:
+        return 0
+    if isinstance(value, datetime):
+        return 19
+    if isinstance(value, date):
+        return 10
+    return len(str(value))
+
+
+class WriteOnlySheet:
+    """A write-only worksheet whose column widths are estimated from its first rows.
+
+    Widths have to be set before any row is written, so the header and up to
+    sample_size rows are held back and measured first.
+    """
+
+    def __init__(self, workbook, title, headers, sample_size=EXCEL_WIDTH_SAMPLE):
+        self.worksheet = workbook.create_sheet(title)
+        self.headers = headers
+        self.sample_size = sample_size
+        self.widths = [len(str(header)) for header in headers]
+        self._sample = []
+        self._started = False
+
+    def append(self, values, styles):
+        """Add a row; styles holds a named style (or None) per column"""
+        if self._started:
+            self._write(values, styles)
+            return
+        for index, value in enumerate(values):
+            self.widths[index] = max(self.widths[index], _display_width(value))
+        self._sample.append((values, styles))
+        if len(self._sample) >= self.sample_size:
+            self._start()
+
+    def close(self):
+        if not self._started:
+            self._start()
+
+    def _start(self):
+        self._started = True
+        for index, width in enumerate(self.widths, 1):
+            self.worksheet.column_dimensions[get_column_letter(index)].width = min(width + 2, EXCEL_MAX_WIDTH)
+        self._write(self.headers, [HEADER_STYLE] * len(self.headers))
+        for values, styles in self._sample:
+            self._write(values, styles)
+        self._sample = []
+
+    def _write(self, values, styles):
+        row = []
+        for value, style in zip(values, styles):
+            cell = WriteOnlyCell(self.worksheet, value=value)
+            if style:
+                cell.style = style
+            row.append(cell)
+        self.worksheet.append(row)
+
+
+def excel_file_response(workbook, filename):
+    """Save a workbook to a temporary file and stream it as an attachment"""
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return FileResponse(output, as_attachment=True, filename=filename, content_type=EXCEL_CONTENT_TYPE)
+
+
+def check_pdf_rows(count, background=False):
+    """Raise ExportLimitError when a PDF export would hold more than its row limit"""
+    limit = PDF_JOB_MAX_ROWS if background else PDF_MAX_ROWS
+    if count > limit:
+        hint = 'Use Excel or CSV' if background else 'Run it in the background ("async": true) or use Excel or CSV'
+        raise ExportLimitError(f"PDF exports are limited to {limit} entries, this one has {count}. {hint}.")
+    return count
+
+
+def url_file_name(url):
+    """Last path segment of a file URL, for display in a PDF cell"""
+    try:
+        return urlparse(url).path.split('/')[-1] or 'File uploaded'
+    except ValueError:
+        return 'File uploaded'
+
+
+def sample_rows(rows, size=PDF_WIDTH_SAMPLE):
+    """(first size rows, iterator of all rows) so widths can be measured before rendering starts"""
+    rows = iter(rows)
+    sample = list(itertools.islice(rows, size))
+    return sample, itertools.chain(sample, rows)
+
+
+def pdf_column_widths(headers, rows, available, minimum, maximum):
+    """Column widths proportional to the longest text of each column, kept within minimum/maximum and available"""
+    lengths = [len(header) for header in headers]
+    for row in rows:
+        for index, cell in enumerate(row):
+            text = cell[0] if isinstance(cell, tuple) else cell
+            lengths[index] = max(lengths[index], len(str(text)))
+    total = sum(lengths) or 1
+    widths = [max(minimum, min(maximum, length / total * available)) for length in lengths]
+    if sum(widths) > available:
+        scale = available / sum(widths)
+        widths = [width * scale for width in widths]
+    return widths
+
+
+def pdf_file_response(filename, document, head, table, rows, background=False, workers=None):
+    """Render a table PDF (utils.pdf) to a temporary file and stream it as an attachment"""
+    timeout = PDF_JOB_TIMEOUT if background else PDF_REQUEST_TIMEOUT
+    output = tempfile.TemporaryFile()
+    try:
+        render_table_pdf(output, document, head, table, rows, chunk_rows=PDF_CHUNK_ROWS,
+                         workers=workers or PDF_WORKERS, timeout=timeout, pool_slots=_pdf_pool_slots)
+    except PDFRenderTimeout:
+        output.close()
+        raise ExportLimitError(f"The PDF took longer than {timeout} seconds to render. "
+                               f"Narrow the filters or use Excel or CSV.")
+    except BaseException:
+        output.close()
+        raise
+    output.seek(0)
+    return FileResponse(output, as_attachment=True, filename=filename, content_type='application/pdf')
+
+
+def field_column_type(field_type):
+    """Column type (a name for arrow_type) of a form_data field"""
+    return FIELD_COLUMN_TYPES.get(field_type, 'string')
+
+
+def column_value(value, field_type=None):
+    """A form_data value as its field's column type; None where it is empty or doesn't parse"""
+    if value is None or value == '':
+        return None
+    if field_type == 'NUMERIC':
+        if isinstance(value, bool):
+            return None
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return None
+        return number if math.isfinite(number) else None
+    if field_type == 'DATE':
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        try:
+            parsed = parse_date(str(value)) or parse_datetime(str(value))
+        except ValueError:
+            return None
+        return parsed.date() if isinstance(parsed, datetime) else parsed
+    if field_type == 'BOOLEAN':
+        if isinstance(value, (bool, int, float)):
+            return bool(value)
+        text = str(value).strip().lower()
+        return True if text in TRUE_VALUES else False if text in FALSE_VALUES else None
+    if isinstance(value, str):
+        return value
+    # Multi-selects and nested values stay readable as JSON
+    return json.dumps(value, default=str) if isinstance(value, (list, dict)) else str(value)
+
+
+def arrow_type(name):
+    return {
+        'string': pa.string(),
+        'int64': pa.int64(),
+        'float64': pa.float64(),
+        'date32': pa.date32(),
+        'bool': pa.bool_(),
+        'timestamp': pa.timestamp('us', tz='UTC'),
+    }[name]
+
+
+def row_batches(rows, size=EXPORT_CHUNK_SIZE):
+    """Lists of up to size rows"""
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def columnar_file_response(columns, rows, filename, file_format, batch_size=EXPORT_CHUNK_SIZE):
+    """Write rows to a Parquet or Arrow IPC (Feather) file in record batches and stream it as an attachment.
+
+    columns are (name, column type) pairs; see arrow_type(). Raises
+    ExportFormatError when pyarrow isn't installed.
+    """
+    if pa is None:
+        raise ExportFormatError(f"{file_format.title()} exports need pyarrow, which isn't installed on this server")
+    extension, content_type = COLUMNAR_FORMATS[file_format]
+    schema = pa.schema([pa.field(name, arrow_type(column_type)) for name, column_type in columns])
+
+    def record_batch(batch):
+        values = list(zip(*batch))
+        return pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(values, schema)], schema=schema
+        )
+
+    output = tempfile.TemporaryFile()
+    try:
+        if file_format == 'parquet':
+            with pq.ParquetWriter(output, schema, compression=COLUMNAR_COMPRESSION) as writer:
+                pending, pending_rows = [], 0
+                for batch in row_batches(rows, batch_size):
+                    pending.append(record_batch(batch))
+                    pending_rows += len(batch)
+                    if pending_rows >= PARQUET_ROW_GROUP_SIZE:
+                        writer.write_table(pa.Table.from_batches(pending), row_group_size=pending_rows)
+                        pending, pending_rows = [], 0
+                if pending:
+                    writer.write_table(pa.Table.from_batches(pending), row_group_size=pending_rows)
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=COLUMNAR_COMPRESSION)
+            with pa.ipc.new_file(output, schema, options=options) as writer:
+                for batch in row_batches(rows, batch_size):
+                    writer.write_batch(record_batch(batch))
+    except BaseException:
+        output.close()
+        raise
+    output.seek(0)
+    return FileResponse(output, as_attachment=True, filename=f"{filename}.{extension}", content_type=content_type)
@@ -0,0 +1,156 @@
+"""
+Page-level resolution of form field file URLs.
+
+form_data stores uploaded files as FormFieldFile ids. Serializing an entry
+used to look every id up with its own query, list the entry's files with
+another, and sign a URL for each file. FileUrlResolver does this once for a
+whole page: the files of all entries are loaded with one query (or taken from
+a prefetch_related('field_files') cache), and the URLs of files without a
+stored s3_url are signed once and kept in the cache for part of their
+lifetime, so repeated pages don't re-sign them either.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Signed URLs are cached for half their validity so clients never get one about to expire
+FILE_URL_CACHE_TIMEOUT = getattr(settings, 'AWS_QUERYSTRING_EXPIRE', 3600) // 2
+
+# Cached responses embedding signed URLs must be rebuilt at least this often
+FILE_URL_REFRESH_PERIOD = max(FILE_URL_CACHE_TIMEOUT // 2, 1)
+
+FILE_FIELDS = ('id', 'form_entry_id', 'field_name', 'file', 's3_url', 'uploaded_at')
+
+
+def looks_like_file_id(value):
+    """The check get_filtered_form_data has always used for UUID-like values"""
+    return isinstance(value, str) and len(value) == 36 and '-' in value
+
+
+def file_url_period():
+    """Number of the current refresh period, for validators of responses with file URLs"""
+    return int(time.time() // FILE_URL_REFRESH_PERIOD)
+
+
+def _url_cache_key(name):
+    digest = hashlib.sha1(name.encode('utf-8')).hexdigest()
+    return f'forms:file_url:{digest}'
+
+
+def sign_file_urls(field_files):
+    """Map of FormFieldFile id -> URL, signing each stored file at most once.
+
+    A stored s3_url wins, as before. Other files are signed through their
+    storage; signatures are looked up and stored in the cache in one batch.
+    """
+    urls = {}
+    unsigned = {}
+    for field_file in field_files:
+        if not field_file.file:
+            continue
+        if field_file.s3_url:
+            urls[field_file.id] = field_file.s3_url
+        else:
+            unsigned.setdefault(field_file.file.name, []).append(field_file)
+
+    if not unsigned:
+        return urls
+
+    keys = {_url_cache_key(name): name for name in unsigned}
+    cached = cache.get_many(list(keys))
+    signed = {keys[key]: url for key, url in cached.items()}
+
+    fresh = {}
+    for name, files in unsigned.items():
+        if name not in signed:
+            signed[name] = files[0].file.url
+            fresh[_url_cache_key(name)] = signed[name]
+        for field_file in files:
+            urls[field_file.id] = signed[name]
+    if fresh:
+        cache.set_many(fresh, FILE_URL_CACHE_TIMEOUT)
+    return urls
+
+
+class FileUrlResolver:
+    """File URLs for a page of entries, loaded with at most one query"""
+
+    def __init__(self, entries):
+        self.entries = [entry for entry in entries if entry is not None]
+        self._files = None
+        self._urls = None
+
+    def _load(self):
+        from .models import FormFieldFile
+
+        files = {}
+        missing = []
+        for entry in self.entries:
+            prefetched = getattr(entry, '_prefetched_objects_cache', {}).get('field_files')
+            if prefetched is not None:
+                files[entry.pk] = list(prefetched)
+            else:
+                files[entry.pk] = []
+                missing.append(entry.pk)
+
+        if missing:
+            rows = FormFieldFile.objects.filter(form_entry_id__in=missing).only(*FILE_FIELDS)
+            for field_file in rows:
+                files[field_file.form_entry_id].append(field_file)
+
+        self._files = files
+        self._urls = sign_file_urls(
+            field_file for entry_files in files.values() for field_file in entry_files
+        )
+
+    def files_of(self, entry):
+        """The entry's FormFieldFile rows, newest first (the model's default ordering)"""
+        if self._files is None:
+            self._load()
+        if entry.pk not in self._files:
+            # Entry was not part of the page the resolver was built for
+            self.entries.append(entry)
+            self._load()
+        return sorted(self._files[entry.pk], key=lambda field_file: field_file.uploaded_at, reverse=True)
+
+    def url(self, field_file):
+        if self._urls is None:
+            self._load()
+        return self._urls.get(field_file.id)
+
+    def for_entry(self, entry):
+        """(urls by file id, urls by field name) for one entry; newest file wins per field"""
+        by_id = {}
+        by_field = {}
+        for field_file in self.files_of(entry):
+            file_url = self.url(field_file)
+            if not file_url:
+                continue
+            by_id[str(field_file.id)] = file_url
+            by_field.setdefault(field_file.field_name, file_url)
+        return by_id, by_field
+
+
+def resolve_form_data(form_data, schema_fields, urls_by_id, urls_by_field):
+    """form_data restricted to schema fields, with file ids replaced by file URLs.
+
+    Fields whose file is not referenced from form_data get the newest
+    uploaded file's URL.
+    """
+    filtered_data = {}
+    for key, value in form_data.items():
+        if key in schema_fields:
+            # File IDs (UUID format) are replaced by the file's URL
+            if looks_like_file_id(value):
+                filtered_data[key] = urls_by_id.get(value.lower(), value)
+            else:
+                # Regular value, keep as is
+                filtered_data[key] = value
+
+    # Add file URLs for file fields that might not be in form_data
+    for field_name, file_url in urls_by_field.items():
+        if field_name in schema_fields and field_name not in filtered_data:
+            filtered_data[field_name] = file_url
+    return filtered_data
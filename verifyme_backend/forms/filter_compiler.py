@@ -0,0 +1,327 @@
+"""
+Filter compiler for form entry queries.
+
+Every entry listing, count and export endpoint used to parse its own copy of
+the filter payload. compile_filters() is the single implementation: it
+normalizes the payload once (aliases, types, date bounds), validates form_data
+filters against the organization's schemas once, and returns a CompiledFilter
+holding one Q tree plus a stable hash of the normalized filter that caches can
+key on. Relative filters (date ranges counted back from now, TAT) put the
+time they were compiled at into the hash, to the day for `today` and to the
+minute otherwise, so cached results move on with the clock.
+
+Accepted keys (aliases in parentheses):
+
+    search                          full-text search, see forms/search.py
+    status                          completed | pending | verified | all
+    date_range                      today | week | month | quarter | year | custom | all
+                                    (last_7_days, last_30_days, last_90_days)
+    start_date (dateFrom, custom_start_date)
+    end_date (dateTo, custom_end_date)
+                                    YYYY-MM-DD (whole day, end inclusive) or ISO datetime
+    month, year                     created_at month / year
+    employee_name (employee)        employee first/last name, icontains
+    case_type (caseType)            schema name, icontains
+    form_schema                     schema id
+    is_completed, is_verified       booleans
+    is_out_of_tat (isOutOfTat)      boolean, see forms/tat.py
+    is_repeat_case                  boolean form_data flag
+    bank_nbfc_name, location, product_type, case_status,
+    field_verifier_name, back_office_executive_name
+                                    form_data icontains, see forms/indexed_fields.py
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .indexed_fields import form_data_filter_q
+from .schema_cache import get_compiled_schema
+from .search import annotate_search_rank, search_q
+from .tat import tat_filter_q
+
+ALIASES = {
+    'dateFrom': 'start_date',
+    'dateTo': 'end_date',
+    'custom_start_date': 'start_date',
+    'custom_end_date': 'end_date',
+    'employee': 'employee_name',
+    'caseType': 'case_type',
+    'isOutOfTat': 'is_out_of_tat',
+}
+
+DATE_RANGE_ALIASES = {
+    'last_7_days': 'week',
+    'last_30_days': 'month',
+    'last_90_days': 'quarter',
+}
+
+DATE_RANGE_DAYS = {
+    'week': 7,
+    'month': 30,
+    'quarter': 90,
+    'year': 365,
+}
+
+STATUSES = ('completed', 'pending', 'verified')
+
+BOOLEAN_FILTERS = ('is_completed', 'is_verified', 'is_out_of_tat', 'is_repeat_case')
+
+# form_data keys that can be filtered when present in the organization's schemas
+BUSINESS_FILTERS = (
+    'bank_nbfc_name', 'location', 'product_type', 'case_status',
+    'field_verifier_name', 'back_office_executive_name',
+)
+
+# Keys that are part of a request payload but not of the filter itself
+IGNORED_KEYS = {
+    'page', 'page_size', 'cursor', 'pagination', 'ordering', 'exact_count',
+    'fields', 'exclude', 'include', 'format', 'password',
+}
+
+
+class FilterValidationError(ValueError):
+    """Raised when a filter value cannot be interpreted"""
+
+
+def time_bucket(normalized, now):
+    """How precisely a normalized filter depends on the current time, as a string; None when it doesn't"""
+    if normalized.get('date_range') in DATE_RANGE_DAYS or 'is_out_of_tat' in normalized:
+        return timezone.localtime(now).strftime('%Y-%m-%dT%H:%M')
+    if normalized.get('date_range') == 'today':
+        return timezone.localtime(now).date().isoformat()
+    return None
+
+
+class CompiledFilter:
+    """Result of compile_filters(): one Q tree and its normalized form"""
+
+    def __init__(self, q, normalized, warnings=None, now=None):
+        self.q = q
+        self.normalized = normalized
+        self.warnings = warnings or []
+        self.time_bucket = time_bucket(normalized, now or timezone.now())
+
+    @property
+    def search_term(self):
+        return self.normalized.get('search')
+
+    @property
+    def hash(self):
+        """Stable hash of the normalized filter (and its time bucket), suitable as a cache key component"""
+        key = self.normalized
+        if self.time_bucket is not None:
+            key = dict(key, _now=self.time_bucket)
+        payload = json.dumps(key, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def apply(self, queryset):
+        """Filter a FormEntry queryset; search results also get a search_rank annotation"""
+        queryset = queryset.filter(self.q)
+        if self.search_term:
+            queryset = annotate_search_rank(queryset, self.search_term)
+        return queryset
+
+    def ordered(self, queryset, default=('case_id',)):
+        """Apply the filter and order by search rank when searching, else by `default`"""
+        queryset = self.apply(queryset)
+        if 'search_rank' in queryset.query.annotations:
+            return queryset.order_by('-search_rank', *default)
+        return queryset.order_by(*default)
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ('true', '1', 'yes'):
+            return True
+        if lowered in ('false', '0', 'no'):
+            return False
+        raise FilterValidationError(f"Invalid boolean value: {value}")
+    return bool(value)
+
+
+def _to_int(name, value, low, high):
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise FilterValidationError(f"Invalid {name}: {value}")
+    if not low <= number <= high:
+        raise FilterValidationError(f"Invalid {name}: {value}")
+    return number
+
+
+def _to_bound(name, value):
+    """Normalize a date/datetime filter value to an ISO string (date-only kept as YYYY-MM-DD)"""
+    text = str(value).strip()
+    if len(text) == 10:
+        try:
+            return datetime.strptime(text, '%Y-%m-%d').date().isoformat()
+        except ValueError:
+            raise FilterValidationError(f"Invalid {name} format: {value}")
+    parsed = parse_datetime(text)
+    if parsed is None:
+        raise FilterValidationError(f"Invalid {name} format: {value}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed.isoformat()
+
+
+def _bound_q(name, bound):
+    """created_at predicate for a normalized start_date/end_date"""
+    if len(bound) == 10:
+        day_start = timezone.make_aware(datetime.strptime(bound, '%Y-%m-%d'))
+        if name == 'start_date':
+            return Q(created_at__gte=day_start)
+        return Q(created_at__lt=day_start + timedelta(days=1))
+    moment = datetime.fromisoformat(bound)
+    if name == 'start_date':
+        return Q(created_at__gte=moment)
+    return Q(created_at__lte=moment)
+
+
+def _date_range_q(date_range, now):
+    if date_range == 'today':
+        today_start = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+        return Q(created_at__gte=today_start, created_at__lt=today_start + timedelta(days=1))
+    if date_range in DATE_RANGE_DAYS:
+        return Q(created_at__gte=now - timedelta(days=DATE_RANGE_DAYS[date_range]))
+    return Q()
+
+
+def normalize_filters(payload):
+    """Canonical dict for a filter payload: aliases resolved, blanks dropped, values typed"""
+    normalized = {}
+    for key, value in (payload or {}).items():
+        key = ALIASES.get(key, key)
+        if key in IGNORED_KEYS or value is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                continue
+        if isinstance(value, (list, dict)) and not value:
+            continue
+
+        if key == 'search':
+            normalized[key] = ' '.join(str(value).split())
+        elif key == 'status':
+            status_value = str(value).lower()
+            if status_value == 'all':
+                continue
+            if status_value not in STATUSES:
+                raise FilterValidationError(f"Invalid status: {value}")
+            normalized[key] = status_value
+        elif key == 'date_range':
+            date_range = DATE_RANGE_ALIASES.get(str(value).lower(), str(value).lower())
+            if date_range not in ('today', 'custom', 'all', *DATE_RANGE_DAYS):
+                raise FilterValidationError(f"Invalid date_range: {value}")
+            if date_range != 'all':
+                normalized[key] = date_range
+        elif key in ('start_date', 'end_date'):
+            normalized[key] = _to_bound(key, value)
+        elif key == 'month':
+            normalized[key] = _to_int('month', value, 1, 12)
+        elif key == 'year':
+            normalized[key] = _to_int('year', value, 1900, 9999)
+        elif key in BOOLEAN_FILTERS:
+            normalized[key] = _to_bool(value)
+        elif key in ('employee_name', 'case_type'):
+            normalized[key] = str(value)
+        elif key == 'form_schema':
+            normalized[key] = str(value)
+        elif key in BUSINESS_FILTERS:
+            normalized[key] = str(value).lower()
+    return normalized
+
+
+def schema_field_names(schemas):
+    """Lowercased field names declared by a list of schemas"""
+    names = set()
+    for schema in schemas:
+        names.update(name.lower() for name in get_compiled_schema(schema).field_names)
+    return names
+
+
+def compile_filters(payload, organization=None, schemas=None, now=None):
+    """Compile a filter payload into a CompiledFilter.
+
+    `organization` scopes the filter (None means all organizations). `schemas`
+    are the schemas form_data filters are validated against; by default the
+    organization's schemas are loaded with one query (ids and versions only,
+    definitions come from forms/schema_cache.py).
+    """
+    from .models import DynamicFormSchema
+
+    normalized = normalize_filters(payload)
+    normalized['organization'] = str(organization.pk) if organization else None
+    now = now or timezone.now()
+    warnings = []
+
+    q = Q()
+    if organization:
+        q &= Q(organization=organization)
+
+    search_term = normalized.get('search')
+    if search_term:
+        q &= search_q(search_term)
+
+    status_value = normalized.get('status')
+    if status_value == 'completed':
+        q &= Q(is_completed=True)
+    elif status_value == 'pending':
+        q &= Q(is_completed=False, is_verified=False)
+    elif status_value == 'verified':
+        q &= Q(is_verified=True)
+
+    q &= _date_range_q(normalized.get('date_range'), now)
+    for name in ('start_date', 'end_date'):
+        if name in normalized:
+            q &= _bound_q(name, normalized[name])
+    if 'month' in normalized:
+        q &= Q(created_at__month=normalized['month'])
+    if 'year' in normalized:
+        q &= Q(created_at__year=normalized['year'])
+
+    if 'employee_name' in normalized:
+        q &= (
+            Q(employee__first_name__icontains=normalized['employee_name']) |
+            Q(employee__last_name__icontains=normalized['employee_name'])
+        )
+    if 'case_type' in normalized:
+        q &= Q(form_schema__name__icontains=normalized['case_type'])
+    if 'form_schema' in normalized:
+        q &= Q(form_schema_id=normalized['form_schema'])
+
+    if 'is_completed' in normalized:
+        q &= Q(is_completed=normalized['is_completed'])
+    if 'is_verified' in normalized:
+        q &= Q(is_verified=normalized['is_verified'])
+    if 'is_out_of_tat' in normalized:
+        q &= tat_filter_q(normalized['is_out_of_tat'], now)
+
+    requested = [name for name in BUSINESS_FILTERS + ('is_repeat_case',) if name in normalized]
+    if requested:
+        if schemas is None:
+            schemas = DynamicFormSchema.objects.all()
+            if organization:
+                schemas = schemas.filter(organization=organization)
+            schemas = list(schemas.select_related(None).only('id', 'version'))
+        field_names = schema_field_names(schemas)
+        for name in requested:
+            if name not in field_names:
+                field_display_name = name.replace('_', ' ').title()
+                warnings.append(f"Filter field '{field_display_name}' is not present in your organization's form schemas")
+                del normalized[name]
+            elif name == 'is_repeat_case':
+                q &= Q(form_data__is_repeat_case=normalized[name])
+            else:
+                q &= form_data_filter_q(name, normalized[name], schemas, organization)
+
+    return CompiledFilter(q, normalized, warnings, now)
+
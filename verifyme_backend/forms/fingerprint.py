@@ -0,0 +1,91 @@
+"""
+Repeat-case detection via normalized form_data fingerprints.
+
+Every FormEntry stores a SHA-256 fingerprint of the values of its schema's
+identity fields (DynamicFormSchema.identity_fields, or the whole form_data
+when none are configured). Two entries of the same schema are repeats of
+each other when their fingerprints match, so repeat counts become a single
+GROUP BY and "repeats of this case" becomes an index probe on
+(organization, form_schema, fingerprint).
+"""
+import hashlib
+import json
+
+from django.db.models import Count
+
+
+def normalize_value(value):
+    """Normalize a form value so cosmetic differences don't break matching"""
+    if isinstance(value, str):
+        return ' '.join(value.split()).lower()
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        # 5 and 5.0 are the same amount
+        return float(value)
+    if isinstance(value, dict):
+        return {str(key): normalize_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize_value(item) for item in value]
+    return str(value)
+
+
+def compute_fingerprint(schema_id, form_data, identity_fields=None):
+    """Return the hex fingerprint for an entry, or None if it has no identity values.
+
+    The schema id is part of the hash, so equal fingerprints always mean the
+    same schema and COUNT(DISTINCT fingerprint) counts repeat groups directly.
+    """
+    if not isinstance(form_data, dict):
+        return None
+
+    keys = identity_fields or sorted(form_data.keys())
+    identity = {}
+    for key in keys:
+        value = normalize_value(form_data.get(key))
+        if value not in (None, '', [], {}):
+            identity[key] = value
+
+    if not identity:
+        return None
+
+    payload = json.dumps([str(schema_id), identity], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def repeat_groups(queryset):
+    """Fingerprint groups with more than one entry, with their sizes"""
+    return (
+        queryset.filter(fingerprint__isnull=False)
+        .order_by()
+        .values('form_schema_id', 'fingerprint')
+        .annotate(entry_count=Count('id'))
+        .filter(entry_count__gt=1)
+    )
+
+
+def count_repeat_cases(queryset):
+    """Number of entries that repeat an earlier entry of the same schema.
+
+    A group of n matching entries contributes n - 1 repeats, which is
+    COUNT(*) - COUNT(DISTINCT fingerprint) over fingerprinted entries.
+    """
+    totals = queryset.filter(fingerprint__isnull=False).order_by().aggregate(
+        entries=Count('id'),
+        groups=Count('fingerprint', distinct=True),
+    )
+    return totals['entries'] - totals['groups']
+
+
+def repeats_of(entry, queryset=None):
+    """Other entries of the same organization and schema sharing entry's fingerprint"""
+    from .models import FormEntry
+
+    if not entry.fingerprint:
+        return FormEntry.objects.none()
+    queryset = queryset if queryset is not None else FormEntry.objects.all()
+    return queryset.filter(
+        organization_id=entry.organization_id,
+        form_schema_id=entry.form_schema_id,
+        fingerprint=entry.fingerprint,
+    ).exclude(pk=entry.pk)
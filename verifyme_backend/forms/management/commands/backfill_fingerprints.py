@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from forms.models import DynamicFormSchema
+
+
+class Command(BaseCommand):
+    help = 'Compute repeat-case fingerprints for existing form entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', help='Only process schemas of this organization id')
+        parser.add_argument('--schema', help='Only process this form schema id')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Entries per bulk update')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Starting fingerprint backfill...')
+        
+        schemas = DynamicFormSchema.objects.all()
+        if options['organization']:
+            schemas = schemas.filter(organization_id=options['organization'])
+        if options['schema']:
+            schemas = schemas.filter(id=options['schema'])
+        
+        total_updated = 0
+        for schema in schemas:
+            updated = schema.sync_fingerprints(batch_size=options['batch_size'])
+            total_updated += updated
+            identity = ', '.join(schema.identity_fields) if schema.identity_fields else 'all fields'
+            self.stdout.write(f'  {schema.name} ({identity}): {updated} entries updated')
+        
+        self.stdout.write(self.style.SUCCESS(f'Successfully backfilled fingerprints: {total_updated} entries updated'))
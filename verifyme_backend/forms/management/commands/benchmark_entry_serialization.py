@@ -0,0 +1,93 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.request import Request
+from accounts.models import User
+from forms.models import FormEntry
+from forms.row_mapper import EntryRowMapper
+from forms.serializers import entry_fieldset
+
+
+# (label, request parameters, slim default)
+VARIANTS = (
+    ('slim', {}, True),
+    ('full', {'fields': 'all'}, True),
+    ('sparse', {'fields': 'id,case_id,status,is_out_of_tat,tat_duration_hours,verified_by_name'}, True),
+    ('include', {'fields': 'all', 'include': 'form_schema,employee'}, True),
+)
+
+
+class Command(BaseCommand):
+    help = 'Check the fast entry row mapper against FormEntrySerializer and compare their throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', help='Only use entries of this organization id')
+        parser.add_argument('--rows', type=int, default=500, help='Rows per run (default 500)')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per variant (default 3)')
+        parser.add_argument('--user', help='Email of the user the representation is built for (default: first admin)')
+
+    def context_for(self, email):
+        user = User.objects.filter(email=email).first() if email else User.objects.exclude(role='EMPLOYEE').first()
+        if user is None:
+            raise CommandError('No user to build the request context for')
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=user)
+        request.user = user
+        return {'request': Request(request)}
+
+    def serializer_rows(self, fieldset, queryset, context):
+        rows = list(fieldset.queryset(queryset))
+        return fieldset.serializer(rows, many=True, context=context).data
+
+    def mapper_rows(self, fieldset, queryset, context):
+        mapper = EntryRowMapper(fieldset, context)
+        return mapper.map(mapper.values(queryset))
+
+    def timed(self, func, repeat):
+        best = None
+        queries = 0
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                data = func()
+                elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+            queries = len(captured)
+        return data, best, queries
+
+    def handle(self, *args, **options):
+        entries = FormEntry.objects.all()
+        if options['organization']:
+            entries = entries.filter(organization_id=options['organization'])
+        entries = entries.order_by('-created_at', '-id')[:options['rows']]
+        context = self.context_for(options['user'])
+        renderer = JSONRenderer()
+
+        self.stdout.write(f'Serializing up to {options["rows"]} entries, best of {options["repeat"]} runs')
+        for label, params, slim in VARIANTS:
+            fieldset = entry_fieldset(params, slim=slim)
+
+            expected = json.loads(renderer.render(self.serializer_rows(fieldset, entries, context)))
+            actual = json.loads(renderer.render(self.mapper_rows(fieldset, entries, context)))
+            if expected != actual:
+                for position, (want, got) in enumerate(zip(expected, actual)):
+                    if want != got:
+                        diff = {key: (want.get(key), got.get(key)) for key in set(want) | set(got) if want.get(key) != got.get(key)}
+                        raise CommandError(f'{label}: row {position} differs: {diff}')
+                raise CommandError(f'{label}: row counts differ ({len(expected)} vs {len(actual)})')
+
+            _, drf_time, drf_queries = self.timed(lambda: self.serializer_rows(fieldset, entries, context), options['repeat'])
+            _, fast_time, fast_queries = self.timed(lambda: self.mapper_rows(fieldset, entries, context), options['repeat'])
+            count = len(expected)
+            self.stdout.write(
+                f'  {label:<8} rows={count:<6} identical '
+                f'serializer={count / drf_time if drf_time else 0:>10.0f} rows/s ({drf_queries} queries)  '
+                f'mapper={count / fast_time if fast_time else 0:>10.0f} rows/s ({fast_queries} queries)  '
+                f'speedup={drf_time / fast_time if fast_time else 0:.1f}x'
+            )
+        self.stdout.write(self.style.SUCCESS('Row mapper output matches FormEntrySerializer'))
@@ -0,0 +1,93 @@
+import multiprocessing
+import resource
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Subquery
+from accounts.models import Organization
+from forms.views import EnhancedFormEntryExportView, FormEntryExportView
+
+LAYOUTS = {
+    'standard': FormEntryExportView,
+    'enhanced': EnhancedFormEntryExportView,
+}
+ENGINES = ('workbook', 'write_only')
+
+
+def _max_rss_kib():
+    # Kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _run_export(layout, engine, organization_id, rows, pipe):
+    """One export in a fresh process, so its peak RSS isn't hidden by an earlier run"""
+    try:
+        view = LAYOUTS[layout]()
+        view.request = None
+        organization = Organization.objects.get(pk=organization_id) if organization_id else None
+        entries = view.get_filtered_entries({}, organization)
+        if rows:
+            entries = entries.filter(pk__in=Subquery(entries.values('pk')[:rows]))
+        count = entries.count()
+
+        baseline = _max_rss_kib()
+        start = time.perf_counter()
+        response = view.export_to_excel(entries, {'excel_engine': engine}, 'benchmark')
+        size = 0
+        try:
+            for chunk in response:
+                size += len(chunk)
+        finally:
+            response.close()
+        elapsed = time.perf_counter() - start
+        pipe.send({'rows': count, 'seconds': elapsed, 'bytes': size,
+                   'peak_kib': _max_rss_kib(), 'growth_kib': _max_rss_kib() - baseline})
+    except Exception as e:
+        pipe.send({'error': f'{type(e).__name__}: {e}'})
+    finally:
+        connections.close_all()
+        pipe.close()
+
+
+class Command(BaseCommand):
+    help = 'Compare rows/sec and peak RSS of the in-memory Workbook and the write-only Excel export engines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', help='Only export entries of this organization id')
+        parser.add_argument('--rows', type=int, default=0, help='Export at most this many entries (default all)')
+        parser.add_argument('--layout', choices=sorted(LAYOUTS), default='standard',
+                            help='Export view whose columns are written (default standard)')
+
+    def handle(self, *args, **options):
+        context = multiprocessing.get_context('fork')
+        results = {}
+        for engine in ENGINES:
+            # Each child opens its own database connection
+            connections.close_all()
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_run_export,
+                args=(options['layout'], engine, options['organization'], options['rows'], sender),
+            )
+            process.start()
+            sender.close()
+            result = receiver.recv()
+            process.join()
+            if 'error' in result:
+                raise CommandError(f'{engine}: {result["error"]}')
+            results[engine] = result
+
+            rate = result['rows'] / result['seconds'] if result['seconds'] else 0
+            self.stdout.write(
+                f'{engine:<11} {result["rows"]:>8} rows {result["seconds"]:>8.2f} s {rate:>9.0f} rows/s  '
+                f'peak RSS {result["peak_kib"] / 1024:>7.1f} MiB (+{result["growth_kib"] / 1024:.1f} MiB)  '
+                f'{result["bytes"] / 1024:.0f} KiB'
+            )
+
+        workbook, write_only = results['workbook'], results['write_only']
+        speedup = workbook['seconds'] / write_only['seconds'] if write_only['seconds'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'write_only: {speedup:.1f}x the rows/sec, '
+            f'{(workbook["growth_kib"] - write_only["growth_kib"]) / 1024:.1f} MiB less RSS growth'
+        ))
@@ -0,0 +1,113 @@
+import io
+import json
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.request import Request
+from accounts.models import User
+from forms.models import FormEntry
+from forms.row_mapper import EntryRowMapper
+from forms.serializers import entry_fieldset
+from utils.renderers import FastJSONParser, FastJSONRenderer, iter_json_list, orjson
+
+
+# (label, request parameters, slim default)
+PAYLOADS = (
+    ('slim', {}, True),
+    ('full', {}, False),
+)
+
+
+class Command(BaseCommand):
+    help = 'Compare DRF JSON rendering/parsing with the orjson renderer and the streaming list writer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', help='Only use entries of this organization id')
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per payload (default 1000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per measurement (default 5)')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Rows per streamed chunk (default 500)')
+        parser.add_argument('--user', help='Email of the user the representation is built for (default: first admin)')
+
+    def context_for(self, email):
+        user = User.objects.filter(email=email).first() if email else User.objects.exclude(role='EMPLOYEE').first()
+        if user is None:
+            raise CommandError('No user to build the request context for')
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=user)
+        request.user = user
+        return {'request': Request(request)}
+
+    def best_of(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def peak_memory(self, func):
+        tracemalloc.start()
+        try:
+            func()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; the fast classes fall back to DRF'))
+        entries = FormEntry.objects.all()
+        if options['organization']:
+            entries = entries.filter(organization_id=options['organization'])
+        entries = entries.order_by('-created_at', '-id')[:options['rows']]
+        context = self.context_for(options['user'])
+        repeat = options['repeat']
+        drf_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+
+        for label, params, slim in PAYLOADS:
+            mapper = EntryRowMapper(entry_fieldset(params, slim=slim), context)
+            data = mapper.map(mapper.values(entries))
+            count = len(data)
+
+            expected = drf_renderer.render(data)
+            rendered = fast_renderer.render(data)
+            streamed = b''.join(iter_json_list(mapper.chunks(entries, chunk_size=options['chunk_size'])))
+            if json.loads(rendered) != json.loads(expected):
+                raise CommandError(f'{label}: FastJSONRenderer output differs from JSONRenderer')
+            if json.loads(streamed) != json.loads(expected):
+                raise CommandError(f'{label}: streamed output differs from JSONRenderer')
+
+            drf_render = self.best_of(lambda: drf_renderer.render(data), repeat)
+            fast_render = self.best_of(lambda: fast_renderer.render(data), repeat)
+            drf_parse = self.best_of(lambda: JSONParser().parse(io.BytesIO(expected)), repeat)
+            fast_parse = self.best_of(lambda: FastJSONParser().parse(io.BytesIO(expected)), repeat)
+
+            # Whole list built then rendered, as Response does, against the streamed writer
+            materialized = lambda: fast_renderer.render(mapper.map(mapper.values(entries)))
+            streaming = lambda: sum(len(piece) for piece in iter_json_list(
+                mapper.chunks(entries, chunk_size=options['chunk_size'])
+            ))
+            materialized_time = self.best_of(materialized, repeat)
+            streaming_time = self.best_of(streaming, repeat)
+            materialized_peak = self.peak_memory(materialized)
+            streaming_peak = self.peak_memory(streaming)
+
+            self.stdout.write(f'{label}: {count} rows, {len(expected) / 1024:.0f} KiB')
+            self.stdout.write(
+                f'  render   drf={drf_render * 1000:>8.1f} ms  orjson={fast_render * 1000:>8.1f} ms  '
+                f'speedup={drf_render / fast_render if fast_render else 0:.1f}x'
+            )
+            self.stdout.write(
+                f'  parse    drf={drf_parse * 1000:>8.1f} ms  orjson={fast_parse * 1000:>8.1f} ms  '
+                f'speedup={drf_parse / fast_parse if fast_parse else 0:.1f}x'
+            )
+            self.stdout.write(
+                f'  list     materialized={materialized_time * 1000:>8.1f} ms peak {materialized_peak / 1024:.0f} KiB  '
+                f'streamed={streaming_time * 1000:>8.1f} ms peak {streaming_peak / 1024:.0f} KiB'
+            )
+        self.stdout.write(self.style.SUCCESS('Rendered, parsed and streamed output match DRF'))
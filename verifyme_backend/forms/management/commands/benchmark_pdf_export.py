@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Subquery
+from accounts.models import Organization
+from forms.exports import PDF_WORKERS, ExportLimitError
+from forms.views import EnhancedFormEntryExportView, FormEntryExportView
+
+LAYOUTS = {
+    'standard': FormEntryExportView,
+    'enhanced': EnhancedFormEntryExportView,
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare rows/sec of the PDF export rendered in one process and in parallel chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', help='Only export entries of this organization id')
+        parser.add_argument('--rows', type=int, default=0, help='Export at most this many entries (default all)')
+        parser.add_argument('--layout', choices=sorted(LAYOUTS), default='standard',
+                            help='Export view whose columns are written (default standard)')
+        parser.add_argument('--workers', type=int, default=PDF_WORKERS,
+                            help=f'Processes of the parallel run (default {PDF_WORKERS})')
+
+    def handle(self, *args, **options):
+        organization = Organization.objects.get(pk=options['organization']) if options['organization'] else None
+        results = {}
+        for workers in (1, options['workers']):
+            view = LAYOUTS[options['layout']]()
+            view.request = None
+            view.pdf_workers = workers
+            entries = view.get_filtered_entries({}, organization)
+            if options['rows']:
+                entries = entries.filter(pk__in=Subquery(entries.values('pk')[:options['rows']]))
+
+            start = time.perf_counter()
+            try:
+                response = view.export_to_pdf(entries, {}, 'benchmark')
+            except ExportLimitError as e:
+                raise CommandError(str(e))
+            size = 0
+            try:
+                for chunk in response:
+                    size += len(chunk)
+            finally:
+                response.close()
+            elapsed = time.perf_counter() - start
+            count = entries.count()
+            results[workers] = elapsed
+
+            rate = count / elapsed if elapsed else 0
+            self.stdout.write(f'{workers:>2} workers {count:>8} rows {elapsed:>8.2f} s {rate:>9.0f} rows/s  '
+                              f'{size / 1024:.0f} KiB')
+
+        serial, parallel = results[1], results[options['workers']]
+        self.stdout.write(self.style.SUCCESS(
+            f'{options["workers"]} workers: {serial / parallel if parallel else 0:.1f}x the rows/sec'
+        ))
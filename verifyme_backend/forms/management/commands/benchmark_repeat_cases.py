@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from forms.models import FormEntry
+from forms.fingerprint import count_repeat_cases
+
+
+class Command(BaseCommand):
+    help = 'Compare the legacy per-entry repeat-case scan with the fingerprint GROUP BY'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', help='Only count entries of this organization id')
+        parser.add_argument('--skip-legacy', action='store_true', help='Only time the fingerprint query')
+
+    def legacy_count(self, entries):
+        """The previous statistics implementation: one containment query per entry"""
+        repeat_cases = 0
+        for entry in entries:
+            similar_entries = entries.filter(
+                form_schema=entry.form_schema,
+                form_data__contains=entry.form_data
+            ).exclude(id=entry.id)
+            if similar_entries.exists():
+                repeat_cases += 1
+        return repeat_cases // 2
+
+    def run(self, label, func, entries):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            result = func(entries)
+            elapsed = time.perf_counter() - start
+        self.stdout.write(f'  {label:<12} repeats={result:<8} queries={len(queries):<8} time={elapsed * 1000:.1f}ms')
+        return result, elapsed
+
+    def handle(self, *args, **options):
+        entries = FormEntry.objects.all()
+        if options['organization']:
+            entries = entries.filter(organization_id=options['organization'])
+        
+        missing = entries.filter(fingerprint__isnull=True).count()
+        self.stdout.write(f'Benchmarking repeat-case detection over {entries.count()} entries')
+        if missing:
+            self.stdout.write(self.style.WARNING(
+                f'  {missing} entries have no fingerprint; run backfill_fingerprints first'
+            ))
+        
+        _, fingerprint_time = self.run('fingerprint', count_repeat_cases, entries)
+        
+        if options['skip_legacy']:
+            return
+        
+        _, legacy_time = self.run('legacy', self.legacy_count, entries)
+        if fingerprint_time:
+            self.stdout.write(self.style.SUCCESS(f'Speedup: {legacy_time / fingerprint_time:.1f}x'))
+        self.stdout.write(
+            'Note: legacy counts pairs of exact form_data matches (halved), fingerprints count '
+            'entries repeating an earlier entry on the schema identity fields.'
+        )
@@ -1,5 +1,5 @@
 from django.core.management.base import BaseCommand
-from forms.models import FormEntry
+from forms.models import FormEntry, EntrySequence
 from accounts.models import Organization
 from django.db import transaction, connection
 
@@ -41,6 +41,10 @@ class Command(BaseCommand):
                             WHERE id = %s
                         """, [index, entry.id])
                         self.stdout.write(f'  Updated entry {entry.id}: -> {index}')
+                
+                # Restart the case_id counter right after the renumbered range
+                EntrySequence.objects.seed(org.id, 'case_id')
+                EntrySequence.objects.filter(organization=org, name='case_id').update(last_value=entries.count())
             
             self.stdout.write(f'  Completed {org.name}: {entries.count()} entries reordered')
         
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from forms.data_version import statistics_cache
+from forms.models import FormEntry
+from utils.events import publish
+
+LAST_RUN_KEY = 'events:tat_breaches:last_run'
+
+
+class Command(BaseCommand):
+    help = 'Publish dashboard events for pending entries whose TAT deadline passed since the last run (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutes', type=int, default=5,
+                            help='Look back this far when there is no previous run (default 5)')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        since = statistics_cache.get(LAST_RUN_KEY) or now - timedelta(minutes=options['minutes'])
+
+        # Pending entries turn out of TAT without being saved, so no signal sees it
+        breached = FormEntry.objects.filter(
+            is_completed=False, tat_deadline__gt=since, tat_deadline__lte=now
+        ).order_by('tat_deadline').values(
+            'id', 'case_id', 'organization_id', 'form_schema_id', 'employee_id', 'created_at', 'tat_deadline'
+        )
+        published = 0
+        for entry in breached.iterator():
+            publish(entry['organization_id'], 'entry.tat_breached', {
+                'id': entry['id'],
+                'case_id': entry['case_id'],
+                'form_schema': entry['form_schema_id'],
+                'employee': entry['employee_id'],
+                'created_at': entry['created_at'],
+                'tat_deadline': entry['tat_deadline'],
+                'delta': {'out_of_tat': 1},
+            }, user_id=entry['employee_id'])
+            published += 1
+
+        statistics_cache.set(LAST_RUN_KEY, now, None)
+        self.stdout.write(self.style.SUCCESS(f'Published {published} TAT breaches since {since:%Y-%m-%d %H:%M:%S}'))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from forms.rollups import RollupScope, rebuild_rollups
+from forms.statistics import entry_statistics
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily form entry rollups from the entries table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', help='Only rebuild rollups of this organization id')
+        parser.add_argument('--schema', help='Only rebuild rollups of this form schema id')
+        parser.add_argument('--check', action='store_true', help='Compare rollups with the raw entries instead of rebuilding')
+
+    def handle(self, *args, **options):
+        if options['check']:
+            scope = RollupScope(options['organization'], options['schema'])
+            expected = entry_statistics(scope.entries(), repeats=False)
+            actual = scope.statistics()
+            differences = {
+                name: (expected[name], actual[name]) for name in actual
+                if name != 'average_tat_hours' and expected[name] != actual[name]
+            }
+            if expected['average_tat_hours'] is not None and actual['average_tat_hours'] is not None:
+                if abs(expected['average_tat_hours'] - actual['average_tat_hours']) > 1e-6:
+                    differences['average_tat_hours'] = (expected['average_tat_hours'], actual['average_tat_hours'])
+            if differences:
+                raise CommandError(f'Rollups differ from entries (expected, rollup): {differences}')
+            self.stdout.write(self.style.SUCCESS(f'Rollups match entries: {actual}'))
+            return
+
+        self.stdout.write('Rebuilding daily entry rollups...')
+        created = rebuild_rollups(options['organization'], options['schema'])
+        self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt {created} rollup rows'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from forms.models import DynamicFormSchema
+from forms.indexed_fields import indexed_fields, sync_schema
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the indexed field side table for schemas with is_indexed fields'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', help='Only rebuild schemas of this organization id')
+        parser.add_argument('--schema', help='Only rebuild this form schema id')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk insert')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding indexed field values...')
+        
+        schemas = DynamicFormSchema.objects.all()
+        if options['organization']:
+            schemas = schemas.filter(organization_id=options['organization'])
+        if options['schema']:
+            schemas = schemas.filter(id=options['schema'])
+        
+        total = 0
+        for schema in schemas:
+            fields = indexed_fields(schema.fields_definition)
+            created = sync_schema(schema, batch_size=options['batch_size'])
+            total += created
+            if fields:
+                self.stdout.write(f'  {schema.name} ({", ".join(fields)}): {created} values')
+        
+        self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt {total} indexed values'))
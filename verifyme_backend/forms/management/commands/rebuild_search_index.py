@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from forms.models import DynamicFormSchema
+from forms.search import refresh_search_vectors, search_supported
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search vectors of form entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', help='Only rebuild entries of this organization id')
+
+    def handle(self, *args, **options):
+        if not search_supported():
+            self.stdout.write(self.style.WARNING('Full-text search needs PostgreSQL; nothing to rebuild'))
+            return
+        
+        self.stdout.write('Rebuilding search vectors...')
+        
+        if options['organization']:
+            total = 0
+            for schema in DynamicFormSchema.objects.filter(organization_id=options['organization']):
+                updated = refresh_search_vectors(form_schema_id=schema.id)
+                total += updated
+                self.stdout.write(f'  {schema.name}: {updated} entries')
+        else:
+            total = refresh_search_vectors()
+        
+        self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt search vectors for {total} entries'))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-17 00:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_rename_organizations_name_idx_organizatio_name_5cd1d4_idx_and_more'),
+        ('forms', '0015_dynamicformschema_version_alter_formfield_field_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EntrySequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Counter name, e.g. entry_id or case_id', max_length=32)),
+                ('last_value', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entry_sequences', to='accounts.organization')),
+            ],
+            options={
+                'db_table': 'forms_entry_sequence',
+                'unique_together': {('organization', 'name')},
+            },
+        ),
+    ]
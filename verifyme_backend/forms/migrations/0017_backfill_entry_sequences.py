@@ -0,0 +1,34 @@
+from django.db import migrations
+from django.db.models import Max
+
+
+def backfill_entry_sequences(apps, schema_editor):
+    """Assign missing entry_id/case_id values and seed the per-organization counters"""
+    FormEntry = apps.get_model('forms', 'FormEntry')
+    EntrySequence = apps.get_model('forms', 'EntrySequence')
+
+    organization_ids = FormEntry.objects.values_list('organization_id', flat=True).distinct()
+    for organization_id in organization_ids:
+        entries = FormEntry.objects.filter(organization_id=organization_id)
+        for name in ('entry_id', 'case_id'):
+            last_value = entries.aggregate(max_id=Max(name))['max_id'] or 0
+            missing = entries.filter(**{f'{name}__isnull': True}).order_by('created_at').values_list('id', flat=True)
+            for entry_pk in list(missing):
+                last_value += 1
+                FormEntry.objects.filter(pk=entry_pk).update(**{name: last_value})
+            EntrySequence.objects.update_or_create(
+                organization_id=organization_id,
+                name=name,
+                defaults={'last_value': last_value},
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forms', '0016_entrysequence'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_entry_sequences, migrations.RunPython.noop),
+    ]
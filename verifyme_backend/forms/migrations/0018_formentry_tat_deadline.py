@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2026-10-17 00:11
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_tat_deadlines(apps, schema_editor):
+    """Materialize tat_deadline with one UPDATE per schema"""
+    DynamicFormSchema = apps.get_model('forms', 'DynamicFormSchema')
+    FormEntry = apps.get_model('forms', 'FormEntry')
+    for schema_id, tat_hours_limit in DynamicFormSchema.objects.values_list('id', 'tat_hours_limit'):
+        FormEntry.objects.filter(form_schema_id=schema_id).update(
+            tat_deadline=models.F('tat_start_time') + timedelta(hours=tat_hours_limit)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_rename_organizations_name_idx_organizatio_name_5cd1d4_idx_and_more'),
+        ('forms', '0017_backfill_entry_sequences'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='formentry',
+            name='tat_deadline',
+            field=models.DateTimeField(blank=True, help_text='tat_start_time + schema TAT limit, kept in sync on save', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='formentry',
+            index=models.Index(fields=['organization', 'is_completed', 'tat_deadline'], name='forms_forme_organiz_c84446_idx'),
+        ),
+        migrations.RunPython(backfill_tat_deadlines, migrations.RunPython.noop),
+    ]
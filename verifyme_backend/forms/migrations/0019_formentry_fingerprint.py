@@ -0,0 +1,30 @@
+# Generated by Django 5.2.3 on 2026-10-17 00:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_rename_organizations_name_idx_organizatio_name_5cd1d4_idx_and_more'),
+        ('forms', '0018_formentry_tat_deadline'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dynamicformschema',
+            name='identity_fields',
+            field=models.JSONField(blank=True, default=list, help_text='Field names that identify a repeat case; empty means all submitted fields'),
+        ),
+        migrations.AddField(
+            model_name='formentry',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, help_text='Hash of the schema identity fields, used for repeat-case detection', max_length=64, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='formentry',
+            index=models.Index(fields=['organization', 'form_schema', 'fingerprint'], name='forms_forme_organiz_0c7ad3_idx'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.3 on 2026-10-17 00:16
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+
+# The search document as it was defined when search_vector was added
+BACKFILL_SQL = """
+    UPDATE {entry_table} AS fe
+    SET search_vector =
+        setweight(to_tsvector('simple', concat_ws(' ', fe.entry_id, fe.case_id)), 'A') ||
+        setweight(to_tsvector('simple', concat_ws(' ', u.first_name, u.last_name, u.email, s.name)), 'B') ||
+        setweight(jsonb_to_tsvector('simple', fe.form_data, '["string", "numeric", "boolean"]'), 'B') ||
+        setweight(to_tsvector('simple', coalesce(fe.verification_notes, '')), 'C')
+    FROM {user_table} AS u, {schema_table} AS s
+    WHERE u.id = fe.employee_id AND s.id = fe.form_schema_id AND fe.id = ANY(%s::uuid[])
+"""
+
+BACKFILL_BATCH_SIZE = 2000
+
+
+def backfill_search_vectors(apps, schema_editor):
+    """Build the search document of existing entries, a batch of ids per UPDATE"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    FormEntry = apps.get_model('forms', 'FormEntry')
+    DynamicFormSchema = apps.get_model('forms', 'DynamicFormSchema')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    sql = BACKFILL_SQL.format(
+        entry_table=schema_editor.quote_name(FormEntry._meta.db_table),
+        user_table=schema_editor.quote_name(User._meta.db_table),
+        schema_table=schema_editor.quote_name(DynamicFormSchema._meta.db_table),
+    )
+
+    def update(batch):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(sql, [batch])
+
+    ids = FormEntry.objects.using(schema_editor.connection.alias).order_by('id').values_list('id', flat=True)
+    batch = []
+    for entry_id in ids.iterator(chunk_size=BACKFILL_BATCH_SIZE):
+        batch.append(str(entry_id))
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            update(batch)
+            batch = []
+    if batch:
+        update(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_rename_organizations_name_idx_organizatio_name_5cd1d4_idx_and_more'),
+        ('forms', '0019_formentry_fingerprint'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='formentry',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Full-text search document, see forms/search.py', null=True),
+        ),
+        # Before the index, so the backfill doesn't maintain it row by row
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='formentry',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='forms_forme_search__5216de_gin'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.3 on 2026-10-17 00:18
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_rename_organizations_name_idx_organizatio_name_5cd1d4_idx_and_more'),
+        ('forms', '0020_formentry_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name='FormEntryIndexedValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field_name', models.CharField(max_length=255)),
+                ('value_text', models.TextField(help_text='Whitespace-collapsed, lowercased value')),
+                ('value_number', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('value_date', models.DateField(blank=True, null=True)),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='indexed_values', to='forms.formentry')),
+                ('form_schema', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='forms.dynamicformschema')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.organization')),
+            ],
+            options={
+                'db_table': 'forms_entry_indexed_value',
+                'indexes': [models.Index(fields=['organization', 'field_name', 'value_number'], name='forms_entry_organiz_d3bf9f_idx'), models.Index(fields=['organization', 'field_name', 'value_date'], name='forms_entry_organiz_975b61_idx'), models.Index(fields=['form_schema'], name='forms_entry_form_sc_b4b4a5_idx'), django.contrib.postgres.indexes.GinIndex(fields=['value_text'], name='forms_idxval_text_trgm', opclasses=['gin_trgm_ops'])],
+                'unique_together': {('entry', 'field_name')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.3 on 2026-10-17 00:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_rename_organizations_name_idx_organizatio_name_5cd1d4_idx_and_more'),
+        ('forms', '0021_formentryindexedvalue'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='formentry',
+            index=models.Index(fields=['organization', 'case_id', 'id'], name='forms_forme_organiz_ca9e56_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='formentry',
+            index=models.Index(fields=['organization', 'created_at', 'id'], name='forms_forme_organiz_f52095_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='formentry',
+            index=models.Index(fields=['employee', 'created_at', 'id'], name='forms_forme_employe_4e9d49_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='formentry',
+            index=models.Index(fields=['form_schema', 'created_at', 'id'], name='forms_forme_form_sc_df4e52_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.3 on 2026-10-17 00:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_entry_rollups(apps, schema_editor):
+    """Aggregate existing entries into the daily rollups"""
+    from forms.rollups import rebuild_rollups
+
+    rebuild_rollups(
+        entry_model=apps.get_model('forms', 'FormEntry'),
+        rollup_model=apps.get_model('forms', 'EntryDailyRollup'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_rename_organizations_name_idx_organizatio_name_5cd1d4_idx_and_more'),
+        ('forms', '0022_formentry_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EntryDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('entries', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('verified', models.IntegerField(default=0)),
+                ('pending_unverified', models.IntegerField(default=0)),
+                ('completed_out_of_tat', models.IntegerField(default=0)),
+                ('timed_entries', models.IntegerField(default=0, help_text='Completed entries with a TAT duration')),
+                ('tat_seconds', models.FloatField(default=0, help_text='Sum of the TAT durations of timed_entries')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('form_schema', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='forms.dynamicformschema')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.organization')),
+            ],
+            options={
+                'db_table': 'forms_entry_daily_rollup',
+                'indexes': [models.Index(fields=['organization', 'day'], name='forms_entry_organiz_cdbb8a_idx'), models.Index(fields=['form_schema', 'day'], name='forms_entry_form_sc_461886_idx'), models.Index(fields=['employee', 'day'], name='forms_entry_employe_3f90e5_idx')],
+                'unique_together': {('organization', 'form_schema', 'employee', 'day')},
+            },
+        ),
+        migrations.RunPython(backfill_entry_rollups, migrations.RunPython.noop),
+    ]
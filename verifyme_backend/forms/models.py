@@ -1,16 +1,32 @@
+from django.conf import settings
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.postgres.fields import JSONField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 import uuid
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import timedelta
 import json
 from utils.storage import get_file_upload_path
-from django.db import connection
+from .fingerprint import compute_fingerprint
+from .search import SEARCH_SOURCE_FIELDS, refresh_search_vectors, search_vector_expression
+from .indexed_fields import indexed_fields, sync_entry, sync_schema
+from .schema_cache import get_compiled_schema, invalidate_compiled_schema
+from .rollups import COUNTERS as ROLLUP_COUNTERS, rebuild_rollups
+from django.db import connection, transaction
 
 User = get_user_model()
 
+# How far an explicitly set entry_id/case_id may move its counter ahead
+ENTRY_SEQUENCE_MAX_JUMP = getattr(settings, 'ENTRY_SEQUENCE_MAX_JUMP', 100000)
+
+
+class SequenceOutOfRange(ValueError):
+    """Raised when an explicit entry_id/case_id is out of range for its counter"""
+
+
 def create_form_schema_manager():
     """Create a custom manager for DynamicFormSchema"""
     class FormSchemaManager(models.Manager):
@@ -29,6 +45,86 @@ def create_form_entry_manager():
     
     return FormEntryManager()
 
+def create_entry_sequence_manager():
+    """Create a custom manager for EntrySequence"""
+    class EntrySequenceManager(models.Manager):
+        def _prep_organization_id(self, organization_id):
+            """Adapt an organization pk for the raw SQL below"""
+            field = self.model._meta.get_field('organization').target_field
+            return field.get_db_prep_value(organization_id, connection)
+
+        def next_value(self, organization_id, name):
+            """Allocate the next value of an organization counter.
+
+            The counter row is bumped with a single UPDATE ... RETURNING, so the
+            row lock is held for one statement (or until the surrounding
+            transaction commits) instead of locking every entry of the tenant.
+            """
+            table = self.model._meta.db_table
+            sql = f"""
+                UPDATE {table}
+                SET last_value = last_value + 1, updated_at = %s
+                WHERE organization_id = %s AND name = %s
+                RETURNING last_value
+            """
+            params = [timezone.now(), self._prep_organization_id(organization_id), name]
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                row = cursor.fetchone()
+                if row is None:
+                    # First allocation for this organization: seed the counter from
+                    # existing entries, then retry the bump.
+                    self.seed(organization_id, name)
+                    cursor.execute(sql, params)
+                    row = cursor.fetchone()
+            return row[0]
+
+        def seed(self, organization_id, name):
+            """Create the counter row if missing, starting at the current max value"""
+            table = self.model._meta.db_table
+            current = FormEntry.objects.filter(organization_id=organization_id).aggregate(
+                max_id=models.Max(name)
+            )['max_id'] or 0
+            with connection.cursor() as cursor:
+                cursor.execute(f"""
+                    INSERT INTO {table} (organization_id, name, last_value, updated_at)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (organization_id, name) DO NOTHING
+                """, [self._prep_organization_id(organization_id), name, current, timezone.now()])
+
+        def advance_to(self, organization_id, name, value):
+            """Move a counter forward so the next allocation is above `value`.
+
+            Raises SequenceOutOfRange when `value` is more than
+            ENTRY_SEQUENCE_MAX_JUMP past the counter, so one explicit value
+            can't run the counter up to the column's limit.
+            """
+            max_value = connection.ops.integer_field_range('PositiveIntegerField')[1]
+            if value < 1 or value >= max_value:
+                raise SequenceOutOfRange(f"{name} must be between 1 and {max_value - 1}")
+            table = self.model._meta.db_table
+            sql = f"""
+                UPDATE {table}
+                SET last_value = GREATEST(last_value, %s), updated_at = %s
+                WHERE organization_id = %s AND name = %s AND %s <= last_value + %s
+            """
+            params = [
+                value, timezone.now(), self._prep_organization_id(organization_id), name,
+                value, ENTRY_SEQUENCE_MAX_JUMP,
+            ]
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                if cursor.rowcount == 0:
+                    # Either the counter doesn't exist yet or `value` is too far ahead
+                    self.seed(organization_id, name)
+                    cursor.execute(sql, params)
+                    if cursor.rowcount == 0:
+                        raise SequenceOutOfRange(
+                            f"{name} {value} is more than {ENTRY_SEQUENCE_MAX_JUMP} past the last allocated value"
+                        )
+
+    return EntrySequenceManager()
+
 class DynamicFormSchema(models.Model):
     """Dynamic form schema model"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -39,6 +135,7 @@ class DynamicFormSchema(models.Model):
     version = models.PositiveIntegerField(default=1)
     max_fields = models.PositiveIntegerField(default=120, validators=[MinValueValidator(1), MaxValueValidator(120)])
     tat_hours_limit = models.PositiveIntegerField(default=24, help_text="TAT hours limit for this form schema")
+    identity_fields = models.JSONField(default=list, blank=True, help_text="Field names that identify a repeat case; empty means all submitted fields")
     is_active = models.BooleanField(default=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_schemas', null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -62,6 +159,114 @@ class DynamicFormSchema(models.Model):
         """Return the number of fields in the schema"""
         return len(self.fields_definition) if self.fields_definition else 0
 
+    def save(self, *args, **kwargs):
+        # Detect TAT limit / identity field changes so materialized entry
+        # deadlines and fingerprints can follow
+        limit_changed = identity_changed = name_changed = indexed_changed = False
+        previous = None
+        if not self._state.adding:
+            previous = DynamicFormSchema.objects.filter(pk=self.pk).values(
+                'tat_hours_limit', 'identity_fields', 'name', 'fields_definition', 'version'
+            ).first()
+            if previous is not None:
+                limit_changed = previous['tat_hours_limit'] != self.tat_hours_limit
+                identity_changed = (previous['identity_fields'] or []) != (self.identity_fields or [])
+                name_changed = previous['name'] != self.name
+                indexed_changed = indexed_fields(previous['fields_definition']) != indexed_fields(self.fields_definition)
+                # Compiled definitions are cached per (id, version), so any
+                # change to the fields must come with a new version
+                if previous['fields_definition'] != self.fields_definition and previous['version'] == self.version:
+                    self.version = previous['version'] + 1
+                    if kwargs.get('update_fields') is not None:
+                        kwargs['update_fields'] = set(kwargs['update_fields']) | {'version'}
+
+        super().save(*args, **kwargs)
+
+        if previous is not None and previous['version'] != self.version:
+            invalidate_compiled_schema(self.pk, previous['version'])
+
+        if limit_changed:
+            self.sync_tat_deadlines()
+        if identity_changed:
+            self.sync_fingerprints()
+        if name_changed:
+            # The schema name is part of every entry's search document
+            refresh_search_vectors(form_schema_id=self.pk)
+        if indexed_changed:
+            sync_schema(self)
+
+    def sync_tat_deadlines(self):
+        """Recompute tat_deadline for every entry of this schema in one UPDATE"""
+        updated = FormEntry.objects.filter(form_schema=self).update(
+            tat_deadline=models.F('tat_start_time') + timedelta(hours=self.tat_hours_limit)
+        )
+        # The UPDATE bypasses the rollup signals and moves completed-late counts
+        rebuild_rollups(form_schema_id=self.pk)
+        return updated
+
+    def sync_fingerprints(self, batch_size=1000):
+        """Recompute the repeat-case fingerprint of every entry of this schema"""
+        updated = 0
+        batch = []
+        entries = FormEntry.objects.filter(form_schema=self).only('id', 'form_schema_id', 'form_data', 'fingerprint')
+        for entry in entries.select_related(None).iterator(chunk_size=batch_size):
+            fingerprint = compute_fingerprint(self.pk, entry.form_data, self.identity_fields)
+            if fingerprint != entry.fingerprint:
+                entry.fingerprint = fingerprint
+                batch.append(entry)
+            if len(batch) >= batch_size:
+                FormEntry.objects.bulk_update(batch, ['fingerprint'])
+                updated += len(batch)
+                batch = []
+        if batch:
+            FormEntry.objects.bulk_update(batch, ['fingerprint'])
+            updated += len(batch)
+        return updated
+
+def create_entry_rollup_manager():
+    """Create a custom manager for EntryDailyRollup"""
+    class EntryRollupManager(models.Manager):
+        def apply(self, key, deltas):
+            """Add counter deltas to one (organization, schema, employee, day) row.
+
+            Adding an entry inserts the row if needed (INSERT ... ON CONFLICT
+            DO UPDATE); other changes only UPDATE, since the row the entry was
+            counted in exists. Both are single atomic statements, so
+            concurrent entry writes never lose counts.
+            """
+            deltas = {name: value for name, value in deltas.items() if value}
+            if not deltas:
+                return
+            table = self.model._meta.db_table
+            organization_id, form_schema_id, employee_id, day = key
+            key_values = [
+                self.model._meta.get_field(name).get_db_prep_value(value, connection)
+                for name, value in (
+                    ('organization', organization_id), ('form_schema', form_schema_id),
+                    ('employee', employee_id), ('day', day),
+                )
+            ]
+            names = list(deltas)
+            now = timezone.now()
+            with connection.cursor() as cursor:
+                if deltas.get('entries', 0) > 0:
+                    cursor.execute(f"""
+                        INSERT INTO {table} (organization_id, form_schema_id, employee_id, day,
+                                             {', '.join(ROLLUP_COUNTERS)}, updated_at)
+                        VALUES (%s, %s, %s, %s, {', '.join(['%s'] * len(ROLLUP_COUNTERS))}, %s)
+                        ON CONFLICT (organization_id, form_schema_id, employee_id, day) DO UPDATE SET
+                            {', '.join(f'{name} = {table}.{name} + EXCLUDED.{name}' for name in names)},
+                            updated_at = EXCLUDED.updated_at
+                    """, key_values + [deltas.get(name, 0) for name in ROLLUP_COUNTERS] + [now])
+                else:
+                    cursor.execute(f"""
+                        UPDATE {table}
+                        SET {', '.join(f'{name} = {name} + %s' for name in names)}, updated_at = %s
+                        WHERE organization_id = %s AND form_schema_id = %s AND employee_id = %s AND day = %s
+                    """, [deltas[name] for name in names] + [now] + key_values)
+
+    return EntryRollupManager()
+
 class FormEntry(models.Model):
     """Form entry model"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -76,6 +281,9 @@ class FormEntry(models.Model):
     verification_notes = models.TextField(blank=True)
     tat_start_time = models.DateTimeField(auto_now_add=True)
     tat_completion_time = models.DateTimeField(null=True, blank=True)
+    tat_deadline = models.DateTimeField(null=True, blank=True, help_text="tat_start_time + schema TAT limit, kept in sync on save")
+    search_vector = SearchVectorField(null=True, editable=False, help_text="Full-text search document, see forms/search.py")
+    fingerprint = models.CharField(max_length=64, null=True, blank=True, editable=False, help_text="Hash of the schema identity fields, used for repeat-case detection")
     verified_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='verified_entries')
     verified_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -83,6 +291,11 @@ class FormEntry(models.Model):
 
     objects = create_form_entry_manager()
 
+    # Per-organization counters allocated through EntrySequence
+    COUNTERS = ('entry_id', 'case_id')
+    # Fields tat_deadline, fingerprint and the indexed field values are derived from
+    SCHEMA_INPUTS = ('form_data', 'form_schema_id', 'tat_start_time')
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
@@ -92,51 +305,105 @@ class FormEntry(models.Model):
             models.Index(fields=['created_at']),
             models.Index(fields=['case_id']),
             models.Index(fields=['entry_id']),
+            models.Index(fields=['organization', 'is_completed', 'tat_deadline']),
+            models.Index(fields=['organization', 'form_schema', 'fingerprint']),
+            GinIndex(fields=['search_vector']),
+            # Keyset pagination orderings, see forms/pagination.py
+            models.Index(fields=['organization', 'case_id', 'id']),
+            models.Index(fields=['organization', 'created_at', 'id']),
+            models.Index(fields=['employee', 'created_at', 'id']),
+            models.Index(fields=['form_schema', 'created_at', 'id']),
         ]
         unique_together = [('organization', 'entry_id')]
 
     def __str__(self):
         return f"Entry {self.entry_id} (Case {self.case_id}) - {self.organization.name}"
 
-    def save(self, *args, **kwargs):
-        # Always set entry_id if not set
-        if not self.entry_id and self.organization:
-            from django.db import transaction
-            with transaction.atomic():
-                # Use select_for_update to prevent race conditions
-                last = FormEntry.objects.filter(organization=self.organization).select_for_update().aggregate(
-                    max_id=models.Max('entry_id')
-                )['max_id'] or 0
-                candidate = last + 1
-                # Double-check to ensure uniqueness
-                while FormEntry.objects.filter(organization=self.organization, entry_id=candidate).exists():
-                    candidate += 1
-                self.entry_id = candidate
-
-        # Set case_id if not already set and organization is available
-        if not self.case_id and self.organization:
-            try:
-                # Generate a unique case_id for the organization
-                last_case = FormEntry.objects.filter(organization=self.organization).aggregate(
-                    max_id=models.Max('case_id')
-                )['max_id'] or 0
-                candidate_case_id = last_case + 1
-                while FormEntry.objects.filter(organization=self.organization, case_id=candidate_case_id).exists():
-                    candidate_case_id += 1
-                self.case_id = candidate_case_id
-            except Exception:
-                import time, random
-                timestamp = int(time.time() * 1000) % 1000000
-                random_num = random.randint(100, 999)
-                self.case_id = timestamp + random_num
-                while FormEntry.objects.filter(
-                    organization=self.organization,
-                    case_id=self.case_id
-                ).exists():
-                    random_num = random.randint(100, 999)
-                    self.case_id = timestamp + random_num
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        entry = super().from_db(db, field_names, values)
+        # Values as loaded, so save() can tell which fields were changed
+        entry._loaded_values = loaded = dict(zip(field_names, values))
+        if isinstance(loaded.get('form_data'), dict):
+            # A copy, so form_data['key'] = value counts as a change too
+            loaded['form_data'] = dict(loaded['form_data'])
+        return entry
+
+    def schema_inputs_changed(self, update_fields=None):
+        """Whether a save writes any of SCHEMA_INPUTS with a value other than the loaded one"""
+        if self._state.adding:
+            return True
+        names = set(self.SCHEMA_INPUTS)
+        if update_fields is not None:
+            # update_fields may name the foreign key either way
+            names &= {'form_schema_id' if name == 'form_schema' else name for name in update_fields}
+        names -= self.get_deferred_fields()
+        loaded = getattr(self, '_loaded_values', {})
+        return any(name not in loaded or loaded[name] != getattr(self, name) for name in names)
 
-        super().save(*args, **kwargs)
+    def save(self, *args, **kwargs):
+        # Allocate entry_id/case_id from the per-organization counters; an
+        # explicit value (a client-supplied case_id) moves the counter past it
+        # so it is never handed out again
+        if self.organization_id:
+            loaded = getattr(self, '_loaded_values', {})
+            deferred = self.get_deferred_fields()
+            for name in self.COUNTERS:
+                if name in deferred:
+                    continue
+                value = getattr(self, name)
+                if not value:
+                    value = EntrySequence.objects.next_value(self.organization_id, name)
+                    setattr(self, name, value)
+                elif loaded.get(name) != value:
+                    EntrySequence.objects.advance_to(self.organization_id, name, value)
+                loaded[name] = value
+            self._loaded_values = loaded
+
+        # Materialize the TAT deadline; tat_start_time is only filled by
+        # auto_now_add during the insert, so new rows start from now. Saves
+        # that leave the schema inputs alone don't load the schema at all
+        update_fields = kwargs.get('update_fields')
+        schema_inputs_changed = bool(self.form_schema_id) and self.schema_inputs_changed(update_fields)
+        if schema_inputs_changed:
+            tat_start = self.tat_start_time or timezone.now()
+            self.tat_deadline = tat_start + timedelta(hours=self.form_schema.tat_hours_limit)
+            self.fingerprint = compute_fingerprint(
+                self.form_schema_id, self.form_data, self.form_schema.identity_fields
+            )
+            if update_fields is not None:
+                kwargs['update_fields'] = update_fields = set(update_fields) | {'tat_deadline', 'fingerprint'}
+
+        # The full-text search document is computed in the same write
+        vector = None
+        if update_fields is None or SEARCH_SOURCE_FIELDS.intersection(update_fields):
+            vector = search_vector_expression(self, update=not self._state.adding)
+            if vector is not None:
+                self.search_vector = vector
+                if update_fields is not None:
+                    kwargs['update_fields'] = set(update_fields) | {'search_vector'}
+
+        # The rollup signals lock the stored row in pre_save and apply the
+        # change in post_save (forms/signals.py); one transaction keeps
+        # concurrent saves of the entry from counting from the same state
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+        if vector is not None:
+            # Leave the expression behind; the stored document is loaded on access
+            self.__dict__.pop('search_vector', None)
+
+        loaded = getattr(self, '_loaded_values', {})
+        for name in set(self.SCHEMA_INPUTS) - self.get_deferred_fields():
+            value = getattr(self, name)
+            loaded[name] = dict(value) if isinstance(value, dict) else value
+        self._loaded_values = loaded
+
+        # Keep the indexed field values in step with the saved row
+        if schema_inputs_changed:
+            fields = get_compiled_schema(self.form_schema).indexed_fields
+            if fields:
+                sync_entry(self, fields)
 
     @property
     def tat_duration(self):
@@ -150,6 +417,8 @@ class FormEntry(models.Model):
     def is_out_of_tat(self):
         """Check if case is out of TAT using schema-specific limit"""
         if self.tat_duration is not None:
+            if self.tat_deadline:
+                return self.tat_completion_time > self.tat_deadline
             # Use schema-specific TAT limit
             tat_limit = self.form_schema.tat_hours_limit
             return self.tat_duration > tat_limit
@@ -164,6 +433,8 @@ class FormEntry(models.Model):
     def check_tat_status(self):
         """Check if entry is out of TAT"""
         if not self.is_completed:
+            if self.tat_deadline:
+                return timezone.now() > self.tat_deadline
             duration = timezone.now() - self.tat_start_time
             hours = duration.total_seconds() / 3600
             # Use schema-specific TAT limit
@@ -186,6 +457,76 @@ class FormEntry(models.Model):
         )
         return file_attachment
 
+class FormEntryIndexedValue(models.Model):
+    """Typed copy of a schema-declared indexed form_data field, see forms/indexed_fields.py"""
+    entry = models.ForeignKey(FormEntry, on_delete=models.CASCADE, related_name='indexed_values')
+    organization = models.ForeignKey('accounts.Organization', on_delete=models.CASCADE, related_name='+')
+    form_schema = models.ForeignKey(DynamicFormSchema, on_delete=models.CASCADE, related_name='+')
+    field_name = models.CharField(max_length=255)
+    value_text = models.TextField(help_text="Whitespace-collapsed, lowercased value")
+    value_number = models.DecimalField(max_digits=20, decimal_places=4, null=True, blank=True)
+    value_date = models.DateField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'forms_entry_indexed_value'
+        unique_together = [('entry', 'field_name')]
+        indexes = [
+            # value_text is free text (can exceed btree row limits), so it only
+            # gets the trigram index, which serves both equality and substring
+            models.Index(fields=['organization', 'field_name', 'value_number']),
+            models.Index(fields=['organization', 'field_name', 'value_date']),
+            models.Index(fields=['form_schema']),
+            GinIndex(fields=['value_text'], name='forms_idxval_text_trgm', opclasses=['gin_trgm_ops']),
+        ]
+
+    def __str__(self):
+        return f"{self.field_name}={self.value_text}"
+
+class EntrySequence(models.Model):
+    """Per-organization counter backing FormEntry.entry_id and FormEntry.case_id"""
+    organization = models.ForeignKey('accounts.Organization', on_delete=models.CASCADE, related_name='entry_sequences')
+    name = models.CharField(max_length=32, help_text="Counter name, e.g. entry_id or case_id")
+    last_value = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = create_entry_sequence_manager()
+
+    class Meta:
+        db_table = 'forms_entry_sequence'
+        unique_together = [('organization', 'name')]
+
+    def __str__(self):
+        return f"{self.name} = {self.last_value} ({self.organization_id})"
+
+class EntryDailyRollup(models.Model):
+    """Entry counters per organization, schema, employee and local day, see forms/rollups.py"""
+    organization = models.ForeignKey('accounts.Organization', on_delete=models.CASCADE, related_name='+')
+    form_schema = models.ForeignKey(DynamicFormSchema, on_delete=models.CASCADE, related_name='+')
+    employee = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    day = models.DateField()
+    entries = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    verified = models.IntegerField(default=0)
+    pending_unverified = models.IntegerField(default=0)
+    completed_out_of_tat = models.IntegerField(default=0)
+    timed_entries = models.IntegerField(default=0, help_text="Completed entries with a TAT duration")
+    tat_seconds = models.FloatField(default=0, help_text="Sum of the TAT durations of timed_entries")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = create_entry_rollup_manager()
+
+    class Meta:
+        db_table = 'forms_entry_daily_rollup'
+        unique_together = [('organization', 'form_schema', 'employee', 'day')]
+        indexes = [
+            models.Index(fields=['organization', 'day']),
+            models.Index(fields=['form_schema', 'day']),
+            models.Index(fields=['employee', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.form_schema_id}/{self.employee_id}: {self.entries} entries"
+
 class FileAttachment(models.Model):
     """File attachment model for form entries"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
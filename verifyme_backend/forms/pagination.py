@@ -0,0 +1,282 @@
+"""
+Keyset (cursor) pagination for form entry lists.
+
+Offset pagination re-reads every skipped row and needs a COUNT(*) per page.
+Keyset pagination remembers the sort key of the last row instead and asks
+for rows strictly after it, so page 1000 costs the same as page 1 when the
+ordering is backed by an index:
+
+    (case_id, id)         forms_formentry (organization, case_id, id)
+    (-created_at, -id)    forms_formentry (organization, created_at, id)
+
+"After (v, x)" is written as the sargable `key >= v AND (key > v OR id > x)`,
+a range on the index. A nullable key (case_id) sorts its NULLs last ascending
+and first descending, as Postgres does, and they are read as a separate
+range (`key IS NULL`, ordered by id) once the non-NULL range runs out.
+
+Cursors are opaque urlsafe-base64 JSON blobs holding the ordering, the key
+values of the boundary row and the direction; clients only pass them back.
+A cursor that can't be used is a 400.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from math import ceil
+
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator as DjangoPaginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+# Supported orderings, keyed by the name clients use in ?ordering=
+KEYSET_ORDERINGS = {
+    'case_id': ('case_id', 'id'),
+    '-case_id': ('-case_id', '-id'),
+    'created_at': ('created_at', 'id'),
+    '-created_at': ('-created_at', '-id'),
+}
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    """Raised for cursors that cannot be decoded or don't match the ordering"""
+
+
+def wants_cursor(params):
+    """Whether a request asked for cursor pagination (a cursor, or pagination=cursor)"""
+    return 'cursor' in params or params.get('pagination') == 'cursor'
+
+
+def page_size_from(params, default=DEFAULT_PAGE_SIZE):
+    try:
+        page_size = int(params.get('page_size', default))
+    except (TypeError, ValueError):
+        page_size = default
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+
+def encode_cursor(ordering, values, reverse=False):
+    payload = {'o': ordering, 'v': [_dump(value) for value in values]}
+    if reverse:
+        payload['r'] = 1
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, ordering):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        values = payload['v']
+    except (binascii.Error, ValueError, KeyError, TypeError, UnicodeError):
+        raise InvalidCursor('Invalid cursor')
+    if payload.get('o') != ordering or len(values) != len(KEYSET_ORDERINGS[ordering]):
+        raise InvalidCursor('Cursor does not match the requested ordering')
+    return [_load(value) for value in values], bool(payload.get('r'))
+
+
+def _dump(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    return str(value)
+
+
+def _load(value):
+    if isinstance(value, dict) and 'dt' in value:
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+
+def _after_ranges(keys, values, nullable):
+    """Conditions for the rows strictly after `values` in the order of `keys`.
+
+    Each condition is one index range, and the ranges are listed in the order
+    their rows sort, so they can be read one after another.
+    """
+    (first, second), (value, tie) = keys, values
+    name, tie_name = first.lstrip('-'), second.lstrip('-')
+    descending = first.startswith('-')
+    tie_after = Q(**{f"{tie_name}__{'lt' if second.startswith('-') else 'gt'}": tie})
+
+    if value is None:
+        # Inside the NULL block: the rest of it, then (descending) every non-NULL row
+        ranges = [Q(**{f'{name}__isnull': True}) & tie_after]
+        if descending:
+            ranges.append(Q(**{f'{name}__isnull': False}))
+        return ranges
+
+    bound, after = ('lte', 'lt') if descending else ('gte', 'gt')
+    ranges = [Q(**{f'{name}__{bound}': value}) & (Q(**{f'{name}__{after}': value}) | tie_after)]
+    if nullable and not descending:
+        ranges.append(Q(**{f'{name}__isnull': True}))
+    return ranges
+
+
+def _reverse(keys):
+    return tuple(key[1:] if key.startswith('-') else f'-{key}' for key in keys)
+
+
+def paginate_keyset(queryset, ordering, page_size, cursor=None):
+    """Return (rows, next_cursor, previous_cursor) for one page of `queryset`"""
+    if ordering not in KEYSET_ORDERINGS:
+        raise InvalidCursor(f"Unsupported ordering for cursor pagination: {ordering}")
+    keys = KEYSET_ORDERINGS[ordering]
+    names = [key.lstrip('-') for key in keys]
+
+    reverse = False
+    if cursor:
+        values, reverse = decode_cursor(cursor, ordering)
+        query_keys = _reverse(keys) if reverse else keys
+        nullable = queryset.model._meta.get_field(names[0]).null
+        ranges = _after_ranges(query_keys, values, nullable)
+    else:
+        query_keys = keys
+        ranges = [Q()]
+
+    rows = []
+    for condition in ranges:
+        rows.extend(queryset.filter(condition).order_by(*query_keys)[:page_size + 1 - len(rows)])
+        if len(rows) > page_size:
+            break
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if reverse:
+        rows.reverse()
+
+    def key_of(row):
+        return [getattr(row, name) for name in names]
+
+    next_cursor = previous_cursor = None
+    if rows:
+        if has_more or reverse:
+            next_cursor = encode_cursor(ordering, key_of(rows[-1]))
+        if cursor and (has_more or not reverse):
+            previous_cursor = encode_cursor(ordering, key_of(rows[0]), reverse=True)
+    return rows, next_cursor, previous_cursor
+
+
+def keyset_payload(rows_data, next_cursor, previous_cursor, page_size):
+    """Response body shared by every cursor-paginated endpoint"""
+    return {
+        'next_cursor': next_cursor,
+        'previous_cursor': previous_cursor,
+        'page_size': page_size,
+        'results': rows_data,
+    }
+
+
+class ProbedPage(Page):
+    """Page whose has_next() comes from fetching one row past it rather than from the count"""
+
+    def __init__(self, *args, has_next=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class CountServicePaginator(DjangoPaginator):
+    """Django paginator whose count comes from forms/counts.py (cached or estimated).
+
+    An estimated count is only reported, never trusted: whether a page exists
+    and whether another follows it are decided by the rows themselves.
+    """
+
+    def __init__(self, *args, organization_id=None, filter_hash=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Counts are cached under this organization's data version (None: all organizations)
+        self.organization_id = organization_id
+        # and under the compiled filter hash when the view has one (else the SQL's fingerprint)
+        self.filter_hash = filter_hash
+
+    @cached_property
+    def count_result(self):
+        from .counts import count_entries
+        return count_entries(self.object_list, self.filter_hash, organization_id=self.organization_id)
+
+    @cached_property
+    def count(self):
+        return self.count_result.value
+
+    @cached_property
+    def num_pages(self):
+        """Pages by the exact count; with an estimated count only ?page=last and the browsable API ask"""
+        count = self.count
+        if not self.count_result.exact:
+            from .counts import count_entries
+            count = count_entries(
+                self.object_list, self.filter_hash, organization_id=self.organization_id, exact=True
+            ).value
+        if count == 0 and not self.allow_empty_first_page:
+            return 0
+        return ceil(max(1, count - self.orphans) / self.per_page)
+
+    def validate_number(self, number):
+        if self.count_result.exact:
+            return super().validate_number(number)
+        # page() checks the page against its rows
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number):
+        if self.count_result.exact:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        return ProbedPage(rows[:self.per_page], number, self, has_next=len(rows) > self.per_page)
+
+
+class FormEntryPagination(PageNumberPagination):
+    """Page numbers by default; keyset pages when the request passes ?cursor= or ?pagination=cursor"""
+
+    def django_paginator_class(self, object_list, per_page):
+        """CountServicePaginator counting under the requesting user's organization, like the other entry counts"""
+        user = self.request.user
+        organization_id = None if user.role == 'SUPER_ADMIN' else user.organization_id
+        get_filter_hash = getattr(self.view, 'get_count_filter_hash', None)
+        return CountServicePaginator(
+            object_list, per_page, organization_id=organization_id,
+            filter_hash=get_filter_hash() if get_filter_hash else None,
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.view = view
+        params = request.query_params
+        self.keyset = wants_cursor(params)
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        ordering = params.get('ordering') or '-created_at'
+        self.page_size_value = page_size_from(params, self.page_size or DEFAULT_PAGE_SIZE)
+        try:
+            rows, self.next_cursor, self.previous_cursor = paginate_keyset(
+                queryset, ordering, self.page_size_value, params.get('cursor') or None
+            )
+        except InvalidCursor as e:
+            raise ValidationError({'error': str(e)})
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            response = super().get_paginated_response(data)
+            response.data['count_exact'] = self.page.paginator.count_result.exact
+            return response
+        return Response(keyset_payload(data, self.next_cursor, self.previous_cursor, self.page_size_value))
@@ -0,0 +1,272 @@
+"""
+Daily rollups of form entry metrics.
+
+EntryDailyRollup keeps one row per (organization, schema, employee, day) with
+additive counters: entries, completed, verified, pending-unverified,
+completed-out-of-TAT, and the number and total duration of timed
+completions (for average TAT). Days are local dates in settings.TIME_ZONE.
+
+Rows are maintained incrementally by the FormEntry signals in
+forms/signals.py: pre_save remembers an entry's previous contribution,
+post_save applies the difference, post_delete subtracts it. FormEntry.save()
+runs both in one transaction and the stored row is read FOR UPDATE, so
+concurrent saves of an entry apply their changes one after the other. Writes that
+bypass signals (queryset.update(), raw SQL) must call rebuild_rollups() for
+what they touched; the rebuild_entry_rollups command does it for backfills.
+
+Pending entries turn out of TAT as time passes, so that part of the
+out-of-TAT count is always read live (an indexed query on
+organization, is_completed, tat_deadline). Periods that don't start or end
+on a day boundary are completed with raw counts of the partial days, so
+rollup answers match the raw queries exactly.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .statistics import TAT_DURATION, TIMED_ENTRY_Q, conditional_counts
+
+ROLLUPS_ENABLED = getattr(settings, 'FORM_ENTRY_ROLLUPS', True)
+
+REBUILD_BATCH_SIZE = 1000
+
+# FormEntry columns a rollup contribution depends on
+ROLLUP_COLUMNS = (
+    'organization_id', 'form_schema_id', 'employee_id', 'created_at', 'is_completed',
+    'is_verified', 'tat_start_time', 'tat_completion_time', 'tat_deadline',
+)
+
+COMPLETED_OUT_OF_TAT_Q = Q(is_completed=True, tat_completion_time__gt=F('tat_deadline'))
+
+# Rollup counter -> the FormEntry predicate it counts
+COUNTER_FILTERS = {
+    'entries': None,
+    'completed': Q(is_completed=True),
+    'verified': Q(is_verified=True),
+    'pending_unverified': Q(is_completed=False, is_verified=False),
+    'completed_out_of_tat': COMPLETED_OUT_OF_TAT_Q,
+    'timed_entries': TIMED_ENTRY_Q,
+}
+COUNTERS = tuple(COUNTER_FILTERS) + ('tat_seconds',)
+
+# The `status` filter values rollups can answer, as counters
+STATUS_COUNTERS = {None: 'entries', 'completed': 'completed', 'verified': 'verified', 'pending': 'pending_unverified'}
+
+# Normalized filter keys (see forms/filter_compiler.py) rollups can answer
+ROLLUP_FILTER_KEYS = {'organization', 'form_schema', 'status'}
+
+
+def rollup_day(value):
+    """Local date a creation time is rolled up under"""
+    return timezone.localtime(value, timezone.get_default_timezone()).date()
+
+
+def day_start(day):
+    """Aware datetime of a rollup day's local midnight"""
+    return timezone.make_aware(datetime.combine(day, time.min), timezone.get_default_timezone())
+
+
+def contribution(row):
+    """(key, counters) an entry adds to the rollups, from a FormEntry or a dict of ROLLUP_COLUMNS"""
+    if not isinstance(row, dict):
+        row = {column: getattr(row, column) for column in ROLLUP_COLUMNS}
+    if row['created_at'] is None or not row['organization_id']:
+        return None
+    key = (row['organization_id'], row['form_schema_id'], row['employee_id'], rollup_day(row['created_at']))
+    completed = bool(row['is_completed'])
+    completion, start, deadline = row['tat_completion_time'], row['tat_start_time'], row['tat_deadline']
+    timed = completed and completion is not None and start is not None and completion != start
+    counters = {
+        'entries': 1,
+        'completed': int(completed),
+        'verified': int(bool(row['is_verified'])),
+        'pending_unverified': int(not completed and not row['is_verified']),
+        'completed_out_of_tat': int(completed and completion is not None and deadline is not None and completion > deadline),
+        'timed_entries': int(timed),
+        'tat_seconds': (completion - start).total_seconds() if timed else 0.0,
+    }
+    return key, counters
+
+
+def previous_contribution(entry):
+    """Contribution of an entry's stored row, None for new entries.
+
+    The row stays locked until the surrounding transaction ends.
+    """
+    from .models import FormEntry
+
+    if entry._state.adding or not entry.pk:
+        return None
+    row = FormEntry.objects.select_for_update().filter(pk=entry.pk).values(*ROLLUP_COLUMNS).first()
+    return contribution(row) if row else None
+
+
+def apply_change(before, after):
+    """Move an entry's counts from its previous contribution to its current one"""
+    from .models import EntryDailyRollup
+
+    if before == after:
+        return
+    if before and after and before[0] == after[0]:
+        key = before[0]
+        EntryDailyRollup.objects.apply(key, {name: after[1][name] - before[1][name] for name in COUNTERS})
+        return
+    if before:
+        EntryDailyRollup.objects.apply(before[0], {name: -value for name, value in before[1].items()})
+    if after:
+        EntryDailyRollup.objects.apply(*after)
+
+
+def _rollup_rows(entries):
+    """Rollup rows aggregated from a FormEntry queryset"""
+    aggregates = {
+        name: Count('pk', filter=condition) if condition is not None else Count('pk')
+        for name, condition in COUNTER_FILTERS.items()
+    }
+    aggregates['tat_duration'] = Sum(TAT_DURATION, filter=TIMED_ENTRY_Q)
+    groups = entries.order_by().annotate(
+        day=TruncDate('created_at', tzinfo=timezone.get_default_timezone())
+    ).values('organization_id', 'form_schema_id', 'employee_id', 'day').annotate(**aggregates)
+    for group in groups.iterator(chunk_size=REBUILD_BATCH_SIZE):
+        duration = group.pop('tat_duration')
+        group['tat_seconds'] = duration.total_seconds() if duration else 0.0
+        yield group
+
+
+def rebuild_rollups(organization_id=None, form_schema_id=None, entry_model=None, rollup_model=None):
+    """Recompute the rollups of all entries, or of one organization / schema. Returns the row count.
+
+    entry_model / rollup_model default to the live models; migrations pass
+    their historical ones.
+    """
+    if entry_model is None or rollup_model is None:
+        from .models import EntryDailyRollup, FormEntry
+        entry_model, rollup_model = FormEntry, EntryDailyRollup
+
+    scope = {}
+    if organization_id:
+        scope['organization_id'] = organization_id
+    if form_schema_id:
+        scope['form_schema_id'] = form_schema_id
+
+    created = 0
+    with transaction.atomic():
+        rollup_model.objects.filter(**scope).delete()
+        batch = []
+        for group in _rollup_rows(entry_model.objects.filter(**scope)):
+            batch.append(rollup_model(**group))
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                rollup_model.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        if batch:
+            rollup_model.objects.bulk_create(batch)
+            created += len(batch)
+    return created
+
+
+class RollupScope:
+    """Entries of an organization (None for all), optionally one schema / employee / status"""
+
+    def __init__(self, organization_id=None, form_schema_id=None, employee_id=None, status=None):
+        self.organization_id = organization_id
+        self.form_schema_id = form_schema_id
+        self.employee_id = employee_id
+        self.counter = STATUS_COUNTERS[status]
+
+    @classmethod
+    def for_filter(cls, compiled):
+        """Scope answering a compiled entry filter, or None when rollups can't answer it"""
+        normalized = compiled.normalized
+        if not ROLLUPS_ENABLED or set(normalized) - ROLLUP_FILTER_KEYS:
+            return None
+        return cls(normalized.get('organization'), normalized.get('form_schema'), status=normalized.get('status'))
+
+    def _lookups(self):
+        lookups = {}
+        if self.organization_id:
+            lookups['organization_id'] = self.organization_id
+        if self.form_schema_id:
+            lookups['form_schema_id'] = self.form_schema_id
+        if self.employee_id:
+            lookups['employee_id'] = self.employee_id
+        return lookups
+
+    def rollups(self):
+        from .models import EntryDailyRollup
+
+        return EntryDailyRollup.objects.filter(**self._lookups()).order_by()
+
+    def entries(self):
+        """The same entries as raw FormEntry rows"""
+        from .models import FormEntry
+
+        entries = FormEntry.objects.filter(**self._lookups()).select_related(None).order_by()
+        condition = COUNTER_FILTERS[self.counter]
+        return entries.filter(condition) if condition is not None else entries
+
+    def statistics(self, now=None, out_of_tat=True):
+        """entry_statistics()-style counters and average TAT hours, from rollups.
+
+        out_of_tat adds completed-late entries from the rollups and overdue
+        pending entries from a live indexed query.
+        """
+        totals = self.rollups().aggregate(**{name: Sum(name) for name in COUNTERS})
+        totals = {name: value or 0 for name, value in totals.items()}
+        stats = {
+            'total': totals['entries'],
+            'completed': totals['completed'],
+            'verified': totals['verified'],
+            'pending': totals['entries'] - totals['completed'],
+            'pending_unverified': totals['pending_unverified'],
+            'average_tat_hours': (
+                totals['tat_seconds'] / totals['timed_entries'] / 3600 if totals['timed_entries'] else None
+            ),
+        }
+        if out_of_tat:
+            now = now or timezone.now()
+            overdue = self.entries().filter(is_completed=False, tat_deadline__lt=now).count()
+            stats['out_of_tat'] = totals['completed_out_of_tat'] + overdue
+        return stats
+
+    def count_created(self, periods):
+        """{name: entries created in [start, end]} for periods of name -> (start, end or None).
+
+        Whole days come from the rollups (one query), partial first and last
+        days from raw entries (one conditional count).
+        """
+        whole_days = {}
+        edges = {}
+        for name, (start, end) in periods.items():
+            # Half-open [start, end_before) with whole days [first_day, last_day)
+            end_before = end + timedelta(microseconds=1) if end is not None else None
+            first_day = rollup_day(start) if start is not None else None
+            if first_day is not None and day_start(first_day) < start:
+                first_day += timedelta(days=1)
+            last_day = rollup_day(end_before) if end_before is not None else None
+            if first_day is not None and last_day is not None and first_day >= last_day:
+                # No whole day inside the period
+                edges[name] = Q(created_at__gte=start, created_at__lt=end_before)
+                continue
+
+            days = []
+            edge = []
+            if first_day is not None:
+                days.append(Q(day__gte=first_day))
+                edge.append(Q(created_at__gte=start, created_at__lt=day_start(first_day)))
+            if last_day is not None:
+                days.append(Q(day__lt=last_day))
+                edge.append(Q(created_at__gte=day_start(last_day), created_at__lt=end_before))
+            whole_days[name] = Q(*days) if days else None
+            if edge:
+                edges[name] = Q(*edge, _connector=Q.OR)
+
+        totals = self.rollups().aggregate(**{
+            name: Sum(self.counter, filter=condition) for name, condition in whole_days.items()
+        }) if whole_days else {}
+        partial = conditional_counts(self.entries(), edges) if edges else {}
+        return {name: (totals.get(name) or 0) + partial.get(name, 0) for name in periods}
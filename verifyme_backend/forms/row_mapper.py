@@ -0,0 +1,275 @@
+"""
+Fast read path for form entry lists.
+
+FormEntrySerializer runs DRF's field machinery for every row: a dozen
+SerializerMethodFields, nested serializers, and tat_duration computed twice.
+EntryRowMapper produces the same representation for an EntryFieldset
+straight from values_list() tuples: the columns each field needs are
+selected once, TAT and status are computed once per row, nested employees
+and schemas are serialized once per distinct id, and file URLs come from the
+page-level FileUrlResolver.
+
+The output must stay identical to the serializer's; the
+benchmark_entry_serialization command checks that before timing both.
+DRF serializers remain in use for writes and single-entry responses.
+"""
+from collections import namedtuple
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .file_urls import FileUrlResolver, resolve_form_data
+from .schema_cache import get_compiled_schema_by_id
+
+# Columns always selected: the keyset pagination keys
+KEY_COLUMNS = ('id', 'case_id', 'created_at')
+
+# values_list() columns each representation field reads
+FIELD_COLUMNS = {
+    'id': (),
+    'entry_id': ('entry_id',),
+    'case_id': (),
+    'display_case_id': (),
+    'employee': ('employee_id', 'employee__email', 'employee__username', 'employee__first_name', 'employee__last_name'),
+    'organization_name': ('organization__name',),
+    'employee_name': ('employee__first_name', 'employee__last_name'),
+    'form_schema': ('form_schema_id',),
+    'form_schema_name': ('form_schema__name',),
+    'form_schema_details': ('form_schema_id',),
+    'form_data': ('form_data',),
+    'filtered_form_data': ('form_data', 'form_schema_id', 'form_schema__version'),
+    'is_completed': ('is_completed',),
+    'is_verified': ('is_verified',),
+    'verification_notes': ('verification_notes',),
+    'verified_by_name': ('verified_by_id', 'verified_by__first_name', 'verified_by__last_name'),
+    'tat_start_time': ('tat_start_time',),
+    'tat_completion_time': ('tat_completion_time',),
+    'tat_duration_hours': ('tat_start_time', 'tat_completion_time'),
+    'tat_limit_hours': ('form_schema__tat_hours_limit',),
+    'is_out_of_tat': ('tat_start_time', 'tat_completion_time', 'tat_deadline', 'form_schema__tat_hours_limit'),
+    'status': ('is_completed', 'is_verified'),
+    'created_at': (),
+    'updated_at': ('updated_at',),
+    'employee_id': ('employee_id',),
+    'form_schema_id': ('form_schema_id',),
+}
+
+FAST_ENTRY_ROWS = getattr(settings, 'FORM_ENTRY_FAST_ROWS', True)
+
+# Rows fetched and mapped at a time when a whole queryset is streamed
+STREAM_CHUNK_SIZE = getattr(settings, 'FORM_ENTRY_STREAM_CHUNK_SIZE', 500)
+
+_EntryRef = namedtuple('_EntryRef', 'pk')
+_SKIP = object()
+_drf_datetime = serializers.DateTimeField()
+
+
+def _full_name(first_name, last_name):
+    return f"{first_name} {last_name}".strip()
+
+
+class EntryRowMapper:
+    """Maps values_list() rows of FormEntry to the representation of an EntryFieldset"""
+
+    def __init__(self, fieldset, context=None):
+        self.fieldset = fieldset
+        self.context = context if context is not None else {}
+        self.names = list(fieldset.names)
+        self.slim = fieldset.is_slim
+        columns = list(KEY_COLUMNS)
+        for name in self.names:
+            columns.extend(FIELD_COLUMNS[name])
+        self.columns = list(dict.fromkeys(columns))
+        self.index = {column: position for position, column in enumerate(self.columns)}
+
+    def values(self, queryset, named=False):
+        """The queryset as rows of exactly the needed columns (named rows for keyset pagination)"""
+        return queryset.values_list(*self.columns, named=named)
+
+    def _datetime_formatter(self):
+        if api_settings.DATETIME_FORMAT != ISO_8601:
+            return _drf_datetime.to_representation
+        current = timezone.get_current_timezone() if settings.USE_TZ else None
+
+        def to_iso(value):
+            if not value:
+                return None
+            if current is not None and timezone.is_aware(value):
+                value = value.astimezone(current)
+            value = value.isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+        return to_iso
+
+    def _nested_lookups(self, rows):
+        """Nested objects serialized once per distinct id, as the full serializer would"""
+        from .models import DynamicFormSchema
+        from .serializers import UserSerializer, cached_schema_representations
+        from accounts.models import User
+
+        employees = schemas = None
+        if 'employee' in self.names and not self.slim:
+            column = self.index['employee_id']
+            ids = {row[column] for row in rows}
+            employees = {
+                user.pk: UserSerializer(user, context=self.context).data
+                for user in User.objects.filter(pk__in=ids).select_related('organization')
+            }
+        if 'form_schema_details' in self.names:
+            column = self.index['form_schema_id']
+            ids = {row[column] for row in rows}
+            loaded = list(DynamicFormSchema.objects.filter(pk__in=ids).select_related('organization', 'created_by'))
+            schemas = dict(zip(
+                [schema.pk for schema in loaded],
+                cached_schema_representations(loaded, self.context),
+            ))
+        return employees, schemas
+
+    def _getters(self, rows):
+        """One function per output field, taking (row, tat_duration_hours)"""
+        index = self.index
+        to_iso = self._datetime_formatter()
+        employees, schemas = self._nested_lookups(rows)
+
+        def column(name):
+            position = index[name]
+            return lambda row, duration: row[position]
+
+        def full_name(first, last):
+            first, last = index[first], index[last]
+            return lambda row, duration: _full_name(row[first], row[last])
+
+        def as_str(name):
+            position = index[name]
+            return lambda row, duration: str(row[position]) if row[position] is not None else None
+
+        def as_iso(name):
+            position = index[name]
+            return lambda row, duration: to_iso(row[position])
+
+        i_case = index['case_id']
+        # Built lazily: only the selected fields' columns are in the rows
+        simple = {
+            'id': lambda: as_str('id'),
+            'display_case_id': lambda: lambda row, duration: row[i_case] if row[i_case] is not None else "N/A",
+            'organization_name': lambda: column('organization__name'),
+            'employee_name': lambda: full_name('employee__first_name', 'employee__last_name'),
+            'form_schema': lambda: column('form_schema_id'),
+            'form_schema_name': lambda: column('form_schema__name'),
+            'tat_start_time': lambda: as_iso('tat_start_time'),
+            'tat_completion_time': lambda: as_iso('tat_completion_time'),
+            'created_at': lambda: as_iso('created_at'),
+            'updated_at': lambda: as_iso('updated_at'),
+            'tat_duration_hours': lambda: lambda row, duration: round(duration, 2) if duration else None,
+            'employee_id': lambda: as_str('employee_id'),
+            'form_schema_id': lambda: as_str('form_schema_id'),
+        }
+        for name in ('entry_id', 'case_id', 'form_data', 'is_completed', 'is_verified', 'verification_notes'):
+            simple[name] = lambda name=name: column(name)
+        getters = {name: simple[name]() for name in self.names if name in simple}
+
+        if 'employee' in self.names:
+            i_employee = index['employee_id']
+            if employees is not None:
+                getters['employee'] = lambda row, duration: employees.get(row[i_employee])
+            else:
+                i_email, i_username = index['employee__email'], index['employee__username']
+                i_first, i_last = index['employee__first_name'], index['employee__last_name']
+                getters['employee'] = lambda row, duration: {
+                    'id': str(row[i_employee]),
+                    'email': row[i_email],
+                    'username': row[i_username],
+                    'first_name': row[i_first],
+                    'last_name': row[i_last],
+                    'full_name': _full_name(row[i_first], row[i_last]),
+                }
+        if 'form_schema_details' in self.names:
+            i_schema = index['form_schema_id']
+            getters['form_schema_details'] = lambda row, duration: schemas.get(row[i_schema])
+        if 'filtered_form_data' in self.names:
+            getters['filtered_form_data'] = self._filtered_form_data_getter(rows)
+        if 'verified_by_name' in self.names:
+            i_verifier = index['verified_by_id']
+            verifier_name = full_name('verified_by__first_name', 'verified_by__last_name')
+            # The serializer skips the key when nobody verified the entry
+            getters['verified_by_name'] = (
+                lambda row, duration: verifier_name(row, duration) if row[i_verifier] is not None else _SKIP
+            )
+        if 'tat_limit_hours' in self.names or 'is_out_of_tat' in self.names:
+            i_limit = index['form_schema__tat_hours_limit']
+            getters['tat_limit_hours'] = lambda row, duration: row[i_limit] or 24
+        if 'is_out_of_tat' in self.names:
+            i_completion, i_deadline = index['tat_completion_time'], index['tat_deadline']
+
+            def is_out_of_tat(row, duration):
+                if duration is None:
+                    return False
+                if row[i_deadline]:
+                    return row[i_completion] > row[i_deadline]
+                return duration > row[i_limit]
+            getters['is_out_of_tat'] = is_out_of_tat
+        if 'status' in self.names:
+            i_completed, i_verified = index['is_completed'], index['is_verified']
+            getters['status'] = lambda row, duration: (
+                'verified' if row[i_verified] else 'completed' if row[i_completed] else 'pending'
+            )
+        return [(name, getters[name]) for name in self.names]
+
+    def _filtered_form_data_getter(self, rows):
+        index = self.index
+        i_id, i_data = index['id'], index['form_data']
+        i_schema, i_version = index['form_schema_id'], index['form_schema__version']
+        resolver = FileUrlResolver([_EntryRef(row[i_id]) for row in rows])
+        compiled = {}
+
+        def filtered_form_data(row, duration):
+            form_data = row[i_data]
+            if not form_data or not row[i_schema]:
+                return form_data
+            key = (row[i_schema], row[i_version])
+            if key not in compiled:
+                compiled[key] = get_compiled_schema_by_id(*key).field_names
+            urls_by_id, urls_by_field = resolver.for_entry(_EntryRef(row[i_id]))
+            return resolve_form_data(form_data, compiled[key], urls_by_id, urls_by_field)
+        return filtered_form_data
+
+    def map(self, rows):
+        """Representations for a page of rows, in order"""
+        rows = list(rows)
+        if not rows:
+            return []
+        getters = self._getters(rows)
+        needs_duration = any(name in self.names for name in ('tat_duration_hours', 'is_out_of_tat'))
+        if needs_duration:
+            i_start, i_completion = self.index['tat_start_time'], self.index['tat_completion_time']
+
+        results = []
+        for row in rows:
+            duration = None
+            if needs_duration and row[i_completion] and row[i_start]:
+                duration = (row[i_completion] - row[i_start]).total_seconds() / 3600
+            data = {}
+            for name, getter in getters:
+                value = getter(row, duration)
+                if value is not _SKIP:
+                    data[name] = value
+            results.append(data)
+        return results
+
+    def chunks(self, queryset, chunk_size=STREAM_CHUNK_SIZE):
+        """Representations of a whole queryset, one list per chunk of rows.
+
+        Rows come from a server-side cursor, so only one chunk (and its file
+        URLs and nested objects) is in memory at a time.
+        """
+        batch = []
+        for row in self.values(queryset).iterator(chunk_size=chunk_size):
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                yield self.map(batch)
+                batch = []
+        if batch:
+            yield self.map(batch)
@@ -0,0 +1,132 @@
+"""
+Compiled schema definitions.
+
+DynamicFormSchema.fields_definition is a JSON list that used to be walked on
+every serialized entry, export row loop and filter call. get_compiled_schema()
+parses it once into a CompiledSchema (active fields, name -> definition map,
+file, unique and indexed fields) and keeps it in a small in-process LRU and in
+the shared cache.
+
+Entries are keyed on (schema id, version). DynamicFormSchema.save() bumps the
+version whenever fields_definition changes, so mutate_fields, the update
+serializer and the admin all move readers to a fresh key; stale keys simply
+age out.
+"""
+import threading
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from .indexed_fields import indexed_fields
+
+FILE_FIELD_TYPES = {'IMAGE_UPLOAD', 'DOCUMENT_UPLOAD', 'FILE', 'IMAGE', 'DOCUMENT'}
+
+LOCAL_CACHE_SIZE = 512
+SHARED_CACHE_TIMEOUT = 60 * 60 * 24
+
+_local = OrderedDict()
+_local_lock = threading.Lock()
+
+
+class CompiledSchema:
+    """Read-only, pre-parsed view of a schema's fields_definition"""
+
+    __slots__ = (
+        'schema_id', 'version', 'fields', 'active_fields', 'field_map',
+        'field_names', 'active_names', 'file_fields', 'unique_fields', 'indexed_fields',
+    )
+
+    def __init__(self, schema_id, version, fields_definition):
+        fields = tuple(
+            field for field in fields_definition or []
+            if isinstance(field, dict) and field.get('name')
+        )
+        self.schema_id = str(schema_id)
+        self.version = version
+        self.fields = fields
+        self.active_fields = tuple(field for field in fields if field.get('is_active', True) is not False)
+        self.field_map = {field['name']: field for field in fields}
+        self.field_names = frozenset(self.field_map)
+        self.active_names = tuple(field['name'] for field in self.active_fields)
+        self.file_fields = frozenset(
+            field['name'] for field in fields
+            if str(field.get('field_type') or '').upper() in FILE_FIELD_TYPES
+        )
+        self.unique_fields = frozenset(field['name'] for field in fields if field.get('is_unique'))
+        self.indexed_fields = indexed_fields(fields)
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return f"<CompiledSchema {self.schema_id} v{self.version}: {len(self.fields)} fields>"
+
+
+def _cache_key(schema_id, version):
+    return f'forms:compiled_schema:{schema_id}:{version}'
+
+
+def get_compiled_schema(schema):
+    """CompiledSchema for a DynamicFormSchema instance.
+
+    Only schema.pk and schema.version are read on a cache hit, so callers can
+    load schemas with .only('id', 'version') and leave fields_definition deferred.
+    """
+    return _get_compiled(schema.pk, schema.version, lambda: schema.fields_definition)
+
+
+def get_compiled_schema_by_id(schema_id, version):
+    """CompiledSchema for a schema known only by id and version (e.g. from values() rows)"""
+    from .models import DynamicFormSchema
+
+    def load_definition():
+        return DynamicFormSchema.objects.filter(pk=schema_id).values_list('fields_definition', flat=True).first()
+
+    return _get_compiled(schema_id, version, load_definition)
+
+
+def _get_compiled(schema_id, version, load_definition):
+    key = _cache_key(schema_id, version)
+    with _local_lock:
+        compiled = _local.get(key)
+        if compiled is not None:
+            _local.move_to_end(key)
+            return compiled
+
+    compiled = cache.get(key)
+    if compiled is None:
+        compiled = CompiledSchema(schema_id, version, load_definition())
+        cache.set(key, compiled, SHARED_CACHE_TIMEOUT)
+
+    with _local_lock:
+        _local[key] = compiled
+        _local.move_to_end(key)
+        while len(_local) > LOCAL_CACHE_SIZE:
+            _local.popitem(last=False)
+    return compiled
+
+
+def invalidate_compiled_schema(schema_id, version=None):
+    """Drop cached compilations of a schema (all versions locally, `version` in the shared cache)"""
+    prefix = _cache_key(schema_id, '')
+    with _local_lock:
+        for key in [key for key in _local if key.startswith(prefix)]:
+            del _local[key]
+    if version is not None:
+        cache.delete(_cache_key(schema_id, version))
+
+
+def union_field_names(schemas):
+    """All field names declared by an iterable of schemas (each distinct schema compiled once)"""
+    names = set()
+    seen = set()
+    for schema in schemas:
+        if schema is None or schema.pk in seen:
+            continue
+        seen.add(schema.pk)
+        names |= get_compiled_schema(schema).field_names
+    return names
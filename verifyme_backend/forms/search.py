@@ -0,0 +1,202 @@
+"""
+Full-text search over form entries.
+
+FormEntry.search_vector is a tsvector backed by a GIN index. FormEntry.save()
+computes it in the entry's own INSERT/UPDATE (search_vector_expression(),
+which keeps the stored document when none of its sources change), and
+refresh_search_vectors() rebuilds it in bulk when schema or employee names
+change. It is built from:
+
+    A  entry_id / case_id
+    B  employee name and email, schema name, form_data values
+    C  verification_notes
+
+search_queryset() turns the user's search text into a prefix tsquery, filters
+on the index and annotates a search_rank for ordering. The tsquery only
+matches word prefixes, so text with other characters (an email, a
+hyphenated reference) also matches with the old icontains scan, and digits
+match anywhere in entry_id / case_id (partial IDs). On databases without
+tsvector support (local SQLite) the icontains scan is all there is.
+"""
+import json
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+SEARCH_CONFIG = 'simple'
+
+# Same columns as the legacy icontains search, used when tsvector is unavailable
+FALLBACK_FIELDS = (
+    'employee__first_name', 'employee__last_name', 'employee__email',
+    'form_schema__name', 'verification_notes', 'form_data',
+)
+
+_REFRESH_SQL = """
+    UPDATE {entry_table} AS fe
+    SET search_vector =
+        setweight(to_tsvector('{config}', concat_ws(' ', fe.entry_id, fe.case_id)), 'A') ||
+        setweight(to_tsvector('{config}', concat_ws(' ', u.first_name, u.last_name, u.email, s.name)), 'B') ||
+        setweight(jsonb_to_tsvector('{config}', fe.form_data, '["string", "numeric", "boolean"]'), 'B') ||
+        setweight(to_tsvector('{config}', coalesce(fe.verification_notes, '')), 'C')
+    FROM {user_table} AS u, {schema_table} AS s
+    WHERE u.id = fe.employee_id AND s.id = fe.form_schema_id AND {where}
+"""
+
+# The same document from one entry's values, for its own INSERT/UPDATE
+_VECTOR_SQL = """
+    setweight(to_tsvector('{config}', concat_ws(' ', %s::bigint, %s::bigint)), 'A') ||
+    setweight(to_tsvector('{config}', coalesce((
+        SELECT concat_ws(' ', u.first_name, u.last_name, u.email, s.name)
+        FROM {user_table} AS u, {schema_table} AS s
+        WHERE u.id = %s AND s.id = %s
+    ), '')), 'B') ||
+    setweight(jsonb_to_tsvector('{config}', %s::jsonb, '["string", "numeric", "boolean"]'), 'B') ||
+    setweight(to_tsvector('{config}', coalesce(%s, '')), 'C')
+"""
+
+# FormEntry fields the document is built from (names and attnames, as save(update_fields=) takes either)
+SEARCH_SOURCE_FIELDS = frozenset({
+    'entry_id', 'case_id', 'employee', 'employee_id', 'form_schema', 'form_schema_id',
+    'form_data', 'verification_notes',
+})
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_NON_WORD_RE = re.compile(r'[^\w\s]', re.UNICODE)
+
+
+def search_supported():
+    """Whether the default database can maintain and query the tsvector column"""
+    return connection.vendor == 'postgresql'
+
+
+def refresh_search_vectors(entry_ids=None, form_schema_id=None, employee_id=None):
+    """Rebuild search_vector for the matching entries with one UPDATE ... FROM.
+
+    With no arguments every entry is rebuilt. Returns the number of rows updated.
+    """
+    from .models import DynamicFormSchema, FormEntry, User
+
+    if not search_supported():
+        return 0
+
+    if entry_ids is not None:
+        entry_ids = [str(entry_id) for entry_id in entry_ids]
+        if not entry_ids:
+            return 0
+        where, params = 'fe.id = ANY(%s::uuid[])', [entry_ids]
+    elif form_schema_id is not None:
+        where, params = 'fe.form_schema_id = %s', [str(form_schema_id)]
+    elif employee_id is not None:
+        where, params = 'fe.employee_id = %s', [str(employee_id)]
+    else:
+        where, params = 'TRUE', []
+
+    with connection.cursor() as cursor:
+        cursor.execute(_REFRESH_SQL.format(
+            config=SEARCH_CONFIG,
+            entry_table=FormEntry._meta.db_table,
+            user_table=User._meta.db_table,
+            schema_table=DynamicFormSchema._meta.db_table,
+            where=where,
+        ), params)
+        return cursor.rowcount
+
+
+def search_vector_expression(entry, update=False):
+    """The entry's search document as an expression for its own INSERT/UPDATE; None without tsvector support.
+
+    For an UPDATE the stored document is kept, without rebuilding it, when
+    none of its source columns change.
+    """
+    from .models import DynamicFormSchema, FormEntry, User
+
+    if not search_supported():
+        return None
+
+    def db_id(value):
+        return None if value is None else str(value)
+
+    sources = [
+        entry.entry_id, entry.case_id, db_id(entry.employee_id), db_id(entry.form_schema_id),
+        json.dumps(entry.form_data, cls=DjangoJSONEncoder), entry.verification_notes,
+    ]
+    sql = _VECTOR_SQL.format(
+        config=SEARCH_CONFIG,
+        user_table=User._meta.db_table,
+        schema_table=DynamicFormSchema._meta.db_table,
+    )
+    params = list(sources)
+    if update:
+        columns = [FormEntry._meta.get_field(name).column for name in (
+            'entry_id', 'case_id', 'employee', 'form_schema', 'form_data', 'verification_notes'
+        )]
+        unchanged = ' AND '.join(
+            f"{column} IS NOT DISTINCT FROM %s{'::jsonb' if column == 'form_data' else ''}" for column in columns
+        )
+        sql = f"CASE WHEN search_vector IS NOT NULL AND {unchanged} THEN search_vector ELSE ({sql}) END"
+        params = sources + params
+    return RawSQL(sql, params, output_field=SearchVectorField())
+
+
+def build_search_query(search_term):
+    """Prefix-matching tsquery for free text: every word must match the start of a token"""
+    tokens = _TOKEN_RE.findall(search_term or '')
+    if not tokens:
+        return None
+    raw = ' & '.join(f"{token.lower()}:*" for token in tokens)
+    return SearchQuery(raw, config=SEARCH_CONFIG, search_type='raw')
+
+
+def search_q(search_term):
+    """The search filter as a Q object, so it composes with other filters"""
+    search_term = (search_term or '').strip()
+    if not search_term:
+        return Q()
+
+    if not search_supported():
+        search_filter = substring_q(search_term)
+        if search_term.isdigit():
+            search_filter |= Q(case_id=int(search_term)) | Q(entry_id=int(search_term))
+        return search_filter
+
+    query = build_search_query(search_term)
+    search_filter = Q(search_vector=query) if query is not None else Q()
+    if _NON_WORD_RE.search(search_term):
+        # Emails and references are single lexemes the word-prefix query can't reach
+        search_filter |= substring_q(search_term)
+    if search_term.isdigit():
+        search_filter |= Q(case_id__contains=search_term) | Q(entry_id__contains=search_term)
+    return search_filter
+
+
+def substring_q(search_term):
+    """The legacy icontains scan over FALLBACK_FIELDS"""
+    search_filter = Q()
+    for field in FALLBACK_FIELDS:
+        search_filter |= Q(**{f'{field}__icontains': search_term})
+    return search_filter
+
+
+def annotate_search_rank(queryset, search_term):
+    """Add a search_rank annotation for ordering (no-op without tsvector support)"""
+    query = build_search_query(search_term) if search_supported() else None
+    if query is None:
+        return queryset
+    return queryset.annotate(search_rank=SearchRank('search_vector', query))
+
+
+def search_queryset(queryset, search_term):
+    """Filter a FormEntry queryset by search text and annotate search_rank"""
+    return annotate_search_rank(queryset.filter(search_q(search_term)), search_term)
+
+
+class FormEntrySearchFilter(filters.SearchFilter):
+    """DRF ?search= backend for form entries, routed through search_queryset()"""
+
+    def filter_queryset(self, request, queryset, view):
+        return search_queryset(queryset, request.query_params.get(self.search_param, ''))
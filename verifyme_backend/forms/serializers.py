@@ -5,8 +5,18 @@ from accounts.serializers import UserSerializer, OrganizationSerializer
 from accounts.models import User, Organization
 from django.conf import settings
 from utils.storage import S3FileManager
+from .file_urls import FileUrlResolver, resolve_form_data
+from .schema_cache import get_compiled_schema
 from django.utils import timezone
 
+def validate_identity_field_names(value):
+    """Shared validation for DynamicFormSchema.identity_fields"""
+    if value in (None, ''):
+        return []
+    if not isinstance(value, list) or not all(isinstance(name, str) and name for name in value):
+        raise serializers.ValidationError("identity_fields must be a list of field names")
+    return list(dict.fromkeys(value))
+
 class DynamicFormSchemaSerializer(serializers.ModelSerializer):
     """Serializer for DynamicFormSchema model"""
     organization_name = serializers.CharField(source='organization.name', read_only=True)
@@ -18,7 +28,7 @@ class DynamicFormSchemaSerializer(serializers.ModelSerializer):
         model = DynamicFormSchema
         fields = [
             'id', 'name', 'description', 'fields_definition', 'version', 'max_fields', 'tat_hours_limit',
-            'organization', 'organization_name', 'created_by', 'created_by_name',
+            'identity_fields', 'organization', 'organization_name', 'created_by', 'created_by_name',
             'is_active', 'fields_count', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'version', 'created_at', 'updated_at']
@@ -32,10 +42,7 @@ class DynamicFormSchemaSerializer(serializers.ModelSerializer):
         
         # For employees, only return active fields
         if user and user.role == 'EMPLOYEE':
-            active_fields = [
-                field for field in obj.fields_definition 
-                if isinstance(field, dict) and field.get('is_active', True) is not False
-            ]
+            active_fields = list(get_compiled_schema(obj).active_fields)
             print(f"🔍 Employee {user.email} - Filtered {len(obj.fields_definition)} fields to {len(active_fields)} active fields")
             return active_fields
         
@@ -44,14 +51,8 @@ class DynamicFormSchemaSerializer(serializers.ModelSerializer):
     
     def get_fields_count(self, obj):
         """Get the number of active fields in the schema"""
-        if obj.fields_definition:
-            # Count only active fields
-            active_fields = [
-                field for field in obj.fields_definition 
-                if isinstance(field, dict) and field.get('is_active', True) is not False
-            ]
-            return len(active_fields)
-        return 0
+        # Count only active fields
+        return len(get_compiled_schema(obj).active_fields)
 
 class DynamicFormSchemaCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating DynamicFormSchema"""
@@ -60,8 +61,12 @@ class DynamicFormSchemaCreateSerializer(serializers.ModelSerializer):
         model = DynamicFormSchema
         fields = [
             'name', 'description', 'fields_definition', 'max_fields', 'tat_hours_limit',
-            'organization', 'is_active'
+            'identity_fields', 'organization', 'is_active'
         ]
+    
+    def validate_identity_fields(self, value):
+        """Identity fields must be a list of field names"""
+        return validate_identity_field_names(value)
 
 class DynamicFormSchemaUpdateSerializer(serializers.ModelSerializer):
     """Serializer for updating DynamicFormSchema - restricts field modifications"""
@@ -70,9 +75,13 @@ class DynamicFormSchemaUpdateSerializer(serializers.ModelSerializer):
         model = DynamicFormSchema
         fields = [
             'name', 'description', 'fields_definition', 'max_fields', 'tat_hours_limit',
-            'is_active'
+            'identity_fields', 'is_active'
         ]
     
+    def validate_identity_fields(self, value):
+        """Identity fields must be a list of field names"""
+        return validate_identity_field_names(value)
+    
     def validate_fields_definition(self, value):
         """Validate that field modifications are not allowed, only reordering"""
         if not self.instance:
@@ -119,6 +128,15 @@ class DynamicFormSchemaUpdateSerializer(serializers.ModelSerializer):
         
         return value
 
+class FormEntryListSerializer(serializers.ListSerializer):
+    """Resolves the file URLs of a whole page of entries before serializing it"""
+    
+    def to_representation(self, data):
+        from django.db.models.manager import BaseManager
+        entries = list(data.all() if isinstance(data, BaseManager) else data)
+        self.context['file_url_resolver'] = FileUrlResolver(entries)
+        return super().to_representation(entries)
+
 class FormEntrySerializer(serializers.ModelSerializer):
     """Serializer for FormEntry model"""
     employee = UserSerializer(read_only=True)
@@ -138,12 +156,24 @@ class FormEntrySerializer(serializers.ModelSerializer):
     class Meta:
         model = FormEntry
         fields = [
-            'id', 'entry_id', 'case_id', 'display_case_id', 'employee', 'organization_name', 'employee_name', 'form_schema_name',
-            'form_schema_details', 'form_data', 'filtered_form_data', 'is_completed', 'is_verified',
+            'id', 'entry_id', 'case_id', 'display_case_id', 'employee', 'organization_name', 'employee_name', 'form_schema',
+            'form_schema_name', 'form_schema_details', 'form_data', 'filtered_form_data', 'is_completed', 'is_verified',
             'verification_notes', 'verified_by_name', 'tat_start_time', 'tat_completion_time', 'tat_duration_hours',
             'tat_limit_hours', 'is_out_of_tat', 'status', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'entry_id', 'case_id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'entry_id', 'case_id', 'form_schema', 'created_at', 'updated_at']
+        list_serializer_class = FormEntryListSerializer
+    
+    def __init__(self, *args, fields=None, **kwargs):
+        """`fields` restricts the representation to a subset of Meta.fields (sparse fieldsets)
+        and may add the plain reference ids used by include mode"""
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+            for name in fields:
+                if name in ENTRY_REFERENCE_FIELDS and name not in self.fields:
+                    self.fields[name] = serializers.UUIDField(read_only=True)
     
     def get_display_case_id(self, obj):
         """Get properly formatted case ID for display"""
@@ -155,47 +185,16 @@ class FormEntrySerializer(serializers.ModelSerializer):
             return obj.form_data
         
         # Get schema field names
-        schema_fields = set()
-        if obj.form_schema.fields_definition:
-            for field in obj.form_schema.fields_definition:
-                if isinstance(field, dict) and 'name' in field:
-                    schema_fields.add(field['name'])
+        schema_fields = get_compiled_schema(obj.form_schema).field_names
         
-        # Filter form_data to only include schema-defined fields
-        filtered_data = {}
-        for key, value in obj.form_data.items():
-            if key in schema_fields:
-                # Check if this is a file ID (UUID format)
-                if isinstance(value, str) and len(value) == 36 and '-' in value:
-                    # This might be a file ID, try to get the S3 URL
-                    from forms.models import FormFieldFile
-                    try:
-                        field_file = FormFieldFile.objects.get(id=value, form_entry=obj)
-                        # Use stored S3 URL if available, otherwise use file URL
-                        file_url = field_file.s3_url or field_file.file.url if field_file.file else None
-                        if file_url:
-                            filtered_data[key] = file_url
-                        else:
-                            # Keep the file ID if no URL found
-                            filtered_data[key] = value
-                    except FormFieldFile.DoesNotExist:
-                        # Not a file ID, keep the original value
-                        filtered_data[key] = value
-                else:
-                    # Regular value, keep as is
-                    filtered_data[key] = value
-        
-        # Add file URLs for file fields that might not be in form_data
-        from forms.models import FormFieldFile
-        form_field_files = FormFieldFile.objects.filter(form_entry=obj)
-        for field_file in form_field_files:
-            if field_file.field_name in schema_fields and field_file.field_name not in filtered_data:
-                # Use stored S3 URL if available, otherwise use file URL
-                file_url = field_file.s3_url or field_file.file.url if field_file.file else None
-                if file_url:
-                    filtered_data[field_file.field_name] = file_url
+        # File URLs come from the page-level resolver (one query per page)
+        resolver = self.context.get('file_url_resolver')
+        if resolver is None:
+            resolver = FileUrlResolver([obj])
+        urls_by_id, urls_by_field = resolver.for_entry(obj)
         
-        return filtered_data
+        # Filter form_data to only include schema-defined fields
+        return resolve_form_data(obj.form_data, schema_fields, urls_by_id, urls_by_field)
     
     def get_tat_duration_hours(self, obj):
         """Get TAT duration in hours"""
@@ -220,6 +219,217 @@ class FormEntrySerializer(serializers.ModelSerializer):
         """Check if entry is out of TAT using schema-specific limit"""
         return obj.is_out_of_tat
 
+class EmployeeSummarySerializer(serializers.ModelSerializer):
+    """Just enough of the employee for entry lists"""
+    full_name = serializers.ReadOnlyField(source='get_full_name')
+    
+    class Meta:
+        model = User
+        fields = ['id', 'email', 'username', 'first_name', 'last_name', 'full_name']
+        read_only_fields = fields
+
+class FormEntrySlimSerializer(FormEntrySerializer):
+    """Default list representation: no nested schema, compact employee, no organization"""
+    employee = EmployeeSummarySerializer(read_only=True)
+    
+    class Meta(FormEntrySerializer.Meta):
+        fields = [
+            'id', 'entry_id', 'case_id', 'display_case_id', 'employee', 'employee_name', 'form_schema',
+            'form_schema_name', 'form_data', 'filtered_form_data', 'is_completed', 'is_verified',
+            'verified_by_name', 'tat_start_time', 'tat_completion_time', 'tat_duration_hours',
+            'tat_limit_hours', 'is_out_of_tat', 'status', 'created_at', 'updated_at'
+        ]
+
+# Plain id fields rows carry instead of nested objects in include mode
+ENTRY_REFERENCE_FIELDS = ('employee_id', 'form_schema_id')
+
+# include= name -> (nested fields it replaces, reference field, key in `included`)
+ENTRY_INCLUDES = {
+    'employee': (('employee',), 'employee_id', 'employees'),
+    'form_schema': (('form_schema', 'form_schema_details'), 'form_schema_id', 'form_schemas'),
+}
+
+# Columns each representation field reads, for only(); None means the whole
+# related rows are needed (nested full serializers)
+ENTRY_FIELD_COLUMNS = {
+    'id': (),
+    'entry_id': ('entry_id',),
+    'case_id': ('case_id',),
+    'display_case_id': ('case_id',),
+    'employee': None,
+    'organization_name': ('organization__name',),
+    'employee_name': ('employee__first_name', 'employee__last_name'),
+    'form_schema': ('form_schema_id',),
+    'form_schema_name': ('form_schema__name',),
+    'form_schema_details': None,
+    'form_data': ('form_data',),
+    # fields_definition comes from forms/schema_cache.py, keyed on the version
+    'filtered_form_data': ('form_data', 'form_schema__id', 'form_schema__version'),
+    'is_completed': ('is_completed',),
+    'is_verified': ('is_verified',),
+    'verification_notes': ('verification_notes',),
+    'verified_by_name': ('verified_by__first_name', 'verified_by__last_name'),
+    'tat_start_time': ('tat_start_time',),
+    'tat_completion_time': ('tat_completion_time',),
+    'tat_duration_hours': ('tat_start_time', 'tat_completion_time'),
+    'tat_limit_hours': ('form_schema__tat_hours_limit',),
+    'is_out_of_tat': ('tat_start_time', 'tat_completion_time', 'tat_deadline', 'form_schema__tat_hours_limit'),
+    'status': ('is_completed', 'is_verified'),
+    'created_at': ('created_at',),
+    'updated_at': ('updated_at',),
+    'employee_id': ('employee_id',),
+    'form_schema_id': ('form_schema_id',),
+}
+
+SLIM_EMPLOYEE_COLUMNS = tuple(
+    f'employee__{name}' for name in ('id', 'email', 'username', 'first_name', 'last_name')
+)
+
+# Related rows loaded for the full representation
+FULL_ENTRY_RELATED = (
+    'employee__organization', 'organization', 'form_schema__organization',
+    'form_schema__created_by', 'verified_by',
+)
+
+class EntryFieldset:
+    """Which FormEntry fields a response carries, and how to load only those"""
+    
+    def __init__(self, names, serializer_class, include=()):
+        self.names = names
+        self.serializer_class = serializer_class
+        self.include = include
+    
+    @property
+    def is_slim(self):
+        return self.serializer_class is FormEntrySlimSerializer
+    
+    def columns(self):
+        """only() paths for the selected fields, or None when whole rows are needed"""
+        columns = set()
+        for name in self.names:
+            field_columns = ENTRY_FIELD_COLUMNS[name]
+            if field_columns is None and name == 'employee' and self.is_slim:
+                field_columns = SLIM_EMPLOYEE_COLUMNS
+            if field_columns is None:
+                return None
+            columns.update(field_columns)
+        return columns
+    
+    def queryset(self, queryset):
+        """select_related/only() for exactly the selected fields"""
+        columns = self.columns()
+        if columns is None:
+            return queryset.select_related(*FULL_ENTRY_RELATED)
+        related = {column.rsplit('__', 1)[0] for column in columns if '__' in column}
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        # Keyset pagination reads the ordering keys of every row
+        return queryset.only('id', 'case_id', 'created_at', *columns)
+    
+    def serializer(self, *args, **kwargs):
+        return self.serializer_class(*args, fields=self.names, **kwargs)
+    
+    def included(self, rows_data, context):
+        """Top-level `included` block for serialized rows, or None outside include mode"""
+        if not self.include:
+            return None
+        return build_included(rows_data, self.include, context)
+
+def _field_list(value):
+    if value in (None, ''):
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    return [str(name).strip() for name in value if str(name).strip()]
+
+def entry_fieldset(params, slim=True):
+    """Resolve ?fields= / ?exclude= / ?include= (query string or request body) into an EntryFieldset.
+    
+    The default is the slim list representation (or the full one with slim=False);
+    fields=all selects the full one. Asking for a field only the full
+    representation has switches to it. include=form_schema,employee replaces
+    the nested objects with form_schema_id / employee_id and side-loads each
+    referenced schema and user once, see build_included().
+    """
+    full_names = FormEntrySerializer.Meta.fields
+    slim_names = FormEntrySlimSerializer.Meta.fields
+    known_names = list(full_names) + list(ENTRY_REFERENCE_FIELDS)
+    requested = _field_list(params.get('fields'))
+    excluded = _field_list(params.get('exclude')) or []
+    include = _field_list(params.get('include')) or []
+    
+    unknown_includes = sorted(set(include) - set(ENTRY_INCLUDES))
+    if unknown_includes:
+        raise serializers.ValidationError({'include': f"Unknown includes: {', '.join(unknown_includes)}"})
+    
+    if requested == ['all']:
+        names, slim = list(full_names), False
+    elif requested:
+        names = requested
+    else:
+        names = list(slim_names if slim else full_names)
+    
+    unknown = sorted(set(names + excluded) - set(known_names))
+    if unknown:
+        raise serializers.ValidationError({'fields': f"Unknown fields: {', '.join(unknown)}"})
+    
+    selected = set(names) - set(excluded)
+    for name in include:
+        nested, reference, _ = ENTRY_INCLUDES[name]
+        selected -= set(nested)
+        selected.add(reference)
+    if requested and requested != ['all']:
+        slim = selected <= set(slim_names) | set(ENTRY_REFERENCE_FIELDS)
+    names = [name for name in known_names if name in selected]
+    include = tuple(name for name in ENTRY_INCLUDES if name in include)
+    return EntryFieldset(names, FormEntrySlimSerializer if slim else FormEntrySerializer, include)
+
+SCHEMA_REPRESENTATION_TIMEOUT = 60 * 60
+
+def cached_schema_representations(schemas, context):
+    """DynamicFormSchemaSerializer data for schemas, cached per (id, version, updated_at).
+    
+    The representation differs for employees (inactive fields hidden), so the
+    role is part of the key as well.
+    """
+    from django.core.cache import cache
+    
+    request = context.get('request')
+    employee_view = bool(request and getattr(request.user, 'role', None) == 'EMPLOYEE')
+    keys = {
+        schema.pk: f'forms:schema_repr:{schema.pk}:{schema.version}:{schema.updated_at.timestamp()}:{int(employee_view)}'
+        for schema in schemas
+    }
+    cached = cache.get_many(list(keys.values()))
+    
+    representations = []
+    fresh = {}
+    for schema in schemas:
+        data = cached.get(keys[schema.pk])
+        if data is None:
+            data = DynamicFormSchemaSerializer(schema, context=context).data
+            fresh[keys[schema.pk]] = data
+        representations.append(data)
+    if fresh:
+        cache.set_many(fresh, SCHEMA_REPRESENTATION_TIMEOUT)
+    return representations
+
+def build_included(rows_data, include, context):
+    """Each schema / employee referenced by serialized entry rows, exactly once"""
+    included = {}
+    if 'form_schema' in include:
+        schema_ids = {row['form_schema_id'] for row in rows_data if row.get('form_schema_id')}
+        schemas = DynamicFormSchema.objects.filter(pk__in=schema_ids).select_related(
+            'organization', 'created_by'
+        ).order_by('name')
+        included['form_schemas'] = cached_schema_representations(list(schemas), context)
+    if 'employee' in include:
+        employee_ids = {row['employee_id'] for row in rows_data if row.get('employee_id')}
+        employees = User.objects.filter(pk__in=employee_ids).select_related('organization').order_by('first_name', 'last_name')
+        included['employees'] = UserSerializer(employees, many=True, context=context).data
+    return included
+
 class FormEntryCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating FormEntry"""
     
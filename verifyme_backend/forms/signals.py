@@ -0,0 +1,125 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+from django.contrib.auth import get_user_model
+from .models import DynamicFormSchema, FormEntry
+from .search import refresh_search_vectors
+from .data_version import bump_data_version
+from .rollups import apply_change, contribution, previous_contribution
+from utils.events import publish
+import logging
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+# Employee fields that are part of the entry search document
+SEARCH_USER_FIELDS = ('first_name', 'last_name', 'email')
+
+def _search_fields(user):
+    # Read from __dict__ so deferred fields are not loaded
+    return {field: user.__dict__.get(field) for field in SEARCH_USER_FIELDS}
+
+@receiver(post_init, sender=User)
+def remember_search_fields(sender, instance, **kwargs):
+    """Remember the indexed name fields as loaded, so post_save can tell whether they changed"""
+    instance._search_fields_before = _search_fields(instance)
+
+@receiver(post_save, sender=User)
+def refresh_employee_search_vectors(sender, instance, created, update_fields=None, **kwargs):
+    """Rebuild the search documents of an employee's entries after a rename"""
+    before = getattr(instance, '_search_fields_before', None)
+    after = _search_fields(instance)
+    instance._search_fields_before = after
+    if created or before is None:
+        return
+    if update_fields is not None and not set(SEARCH_USER_FIELDS).intersection(update_fields):
+        # e.g. the last_login write at login
+        return
+    if before != after:
+        updated = refresh_search_vectors(employee_id=instance.pk)
+        logger.info(f"Refreshed search vectors for {updated} entries of {instance.email}")
+        # Employee names are filterable, so cached counts are stale too
+        bump_data_version(instance.organization_id)
+
+
+@receiver(post_save, sender=FormEntry)
+@receiver(post_delete, sender=FormEntry)
+def bump_entry_data_version(sender, instance, **kwargs):
+    """Invalidate cached counts of the entry's organization"""
+    bump_data_version(instance.organization_id)
+
+@receiver(post_save, sender=DynamicFormSchema)
+@receiver(post_delete, sender=DynamicFormSchema)
+def bump_schema_data_version(sender, instance, **kwargs):
+    """Schema edits can change TAT deadlines, fingerprints and search documents"""
+    bump_data_version(instance.organization_id)
+
+@receiver(pre_save, sender=FormEntry)
+def remember_rollup_contribution(sender, instance, raw=False, **kwargs):
+    """Remember what the stored entry counts in the daily rollups"""
+    if not raw:
+        instance._rollup_before = previous_contribution(instance)
+
+@receiver(post_save, sender=FormEntry)
+def update_entry_rollups(sender, instance, raw=False, **kwargs):
+    """Move the entry's counts in the daily rollups to its saved state"""
+    if not raw:
+        apply_change(getattr(instance, '_rollup_before', None), contribution(instance))
+
+@receiver(post_delete, sender=FormEntry)
+def remove_entry_rollups(sender, instance, **kwargs):
+    """Take a deleted entry out of the daily rollups"""
+    apply_change(contribution(instance), None)
+
+# Dashboard counters an entry moves, from its rollup contribution
+EVENT_COUNTERS = {'total': 'entries', 'completed': 'completed', 'verified': 'verified'}
+
+def entry_event_data(instance, before, after):
+    """Event payload of an entry: identity and how it moves the dashboard counters"""
+    before = before[1] if before else {}
+    after = after[1] if after else {}
+    delta = {
+        name: after.get(counter, 0) - before.get(counter, 0)
+        for name, counter in EVENT_COUNTERS.items()
+    }
+    delta['pending'] = delta['total'] - delta['completed']
+    return {
+        'id': instance.pk,
+        'case_id': instance.case_id,
+        'form_schema': instance.form_schema_id,
+        'employee': instance.employee_id,
+        'created_at': instance.created_at,
+        'delta': {name: value for name, value in delta.items() if value},
+    }
+
+@receiver(post_save, sender=FormEntry)
+def publish_entry_events(sender, instance, created, raw=False, **kwargs):
+    """Tell dashboards about new, completed, verified and late entries"""
+    if raw:
+        return
+    before = getattr(instance, '_rollup_before', None)
+    after = contribution(instance)
+    data = entry_event_data(instance, before, after)
+    was = before[1] if before else {}
+    now = after[1] if after else {}
+
+    events = []
+    if created:
+        events.append('entry.created')
+    if now.get('completed') and not was.get('completed'):
+        events.append('entry.completed')
+        if now.get('completed_out_of_tat'):
+            events.append('entry.tat_breached')
+    if now.get('verified') and not was.get('verified'):
+        events.append('entry.verified')
+    if not events and data['delta']:
+        # e.g. reopened or unverified
+        events.append('entry.updated')
+    for name in events:
+        publish(instance.organization_id, name, data, user_id=instance.employee_id)
+
+@receiver(post_delete, sender=FormEntry)
+def publish_entry_deleted(sender, instance, **kwargs):
+    """Tell dashboards an entry is gone"""
+    data = entry_event_data(instance, contribution(instance), None)
+    publish(instance.organization_id, 'entry.deleted', data, user_id=instance.employee_id)
@@ -0,0 +1,82 @@
+"""
+Shared aggregation layer for statistics endpoints and export summary sheets.
+
+Dashboards used to ask for every counter with its own COUNT(*) and averaged
+TAT durations by loading completed entries into Python. conditional_counts()
+computes any set of counters in one query with COUNT(...) FILTER (WHERE ...),
+and entry_statistics() adds the repeat-case count and TAT duration aggregates
+(average, fastest, slowest) to the same query.
+"""
+from datetime import timedelta
+
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max, Min, Q
+
+from .tat import out_of_tat_q
+
+# Counters of entry_statistics(); None counts every row
+ENTRY_COUNTERS = {
+    'total': None,
+    'completed': Q(is_completed=True),
+    'verified': Q(is_verified=True),
+    'pending': Q(is_completed=False),
+    'pending_unverified': Q(is_completed=False, is_verified=False),
+}
+
+# Completed entries with a TAT duration, as FormEntry.tat_duration is truthy for them
+TIMED_ENTRY_Q = (
+    Q(is_completed=True, tat_completion_time__isnull=False, tat_start_time__isnull=False) &
+    ~Q(tat_completion_time=F('tat_start_time'))
+)
+
+TAT_DURATION = ExpressionWrapper(F('tat_completion_time') - F('tat_start_time'), output_field=DurationField())
+
+
+def count_aggregates(counters):
+    """Count() aggregates for a mapping of name -> Q (None for all rows)"""
+    return {
+        name: Count('pk', filter=condition) if condition is not None else Count('pk')
+        for name, condition in counters.items()
+    }
+
+
+def conditional_counts(queryset, counters):
+    """{name: count} for a mapping of name -> Q (None for all rows), in one query"""
+    return queryset.order_by().aggregate(**count_aggregates(counters))
+
+
+def _hours(value):
+    if value is None:
+        return None
+    if isinstance(value, timedelta):
+        return value.total_seconds() / 3600
+    # Backends without a native interval type return microseconds
+    return value / 3600 / 1e6
+
+
+def entry_statistics(queryset, counters=None, now=None, repeats=True, durations=True):
+    """Counters, repeat cases and TAT durations (hours) of a FormEntry queryset in one query.
+
+    Returns the counters of `counters` (default ENTRY_COUNTERS) plus
+    `out_of_tat`, and, when asked for, `repeat_cases` and
+    `average_tat_hours` / `fastest_tat_hours` / `slowest_tat_hours`
+    (None when no entry has a duration).
+    """
+    counters = dict(ENTRY_COUNTERS if counters is None else counters)
+    counters['out_of_tat'] = out_of_tat_q(now)
+    aggregates = count_aggregates(counters)
+    if repeats:
+        # A group of n matching entries contributes n - 1 repeats (see fingerprint.count_repeat_cases)
+        aggregates['fingerprinted'] = Count('pk', filter=Q(fingerprint__isnull=False))
+        aggregates['fingerprint_groups'] = Count('fingerprint', distinct=True)
+    if durations:
+        aggregates['average_tat'] = Avg(TAT_DURATION, filter=TIMED_ENTRY_Q)
+        aggregates['fastest_tat'] = Min(TAT_DURATION, filter=TIMED_ENTRY_Q)
+        aggregates['slowest_tat'] = Max(TAT_DURATION, filter=TIMED_ENTRY_Q)
+
+    values = queryset.order_by().aggregate(**aggregates)
+    if repeats:
+        values['repeat_cases'] = values.pop('fingerprinted') - values.pop('fingerprint_groups')
+    if durations:
+        for name in ('average', 'fastest', 'slowest'):
+            values[f'{name}_tat_hours'] = _hours(values.pop(f'{name}_tat'))
+    return values
@@ -0,0 +1,35 @@
+"""
+SQL predicates for Turn Around Time (TAT) filtering.
+
+Both predicates read the materialized FormEntry.tat_deadline column, so
+"Out of TAT" / "Within TAT" filters and counts run as plain indexed SQL
+instead of calling check_tat_status() on every row in Python.
+"""
+from django.db.models import F, Q
+from django.utils import timezone
+
+
+def out_of_tat_q(now=None):
+    """Entries past their deadline: pending and overdue, or completed late"""
+    now = now or timezone.now()
+    return (
+        Q(is_completed=False, tat_deadline__lt=now) |
+        Q(is_completed=True, tat_completion_time__gt=F('tat_deadline'))
+    )
+
+
+def within_tat_q(now=None):
+    """Exact complement of out_of_tat_q() for entries with a deadline"""
+    now = now or timezone.now()
+    return (
+        Q(is_completed=False, tat_deadline__gte=now) |
+        Q(is_completed=True, tat_completion_time__isnull=True) |
+        Q(is_completed=True, tat_completion_time__lte=F('tat_deadline'))
+    )
+
+
+def tat_filter_q(is_out_of_tat, now=None):
+    """Predicate for an is_out_of_tat filter value (bool or 'true'/'false' string)"""
+    if isinstance(is_out_of_tat, str):
+        is_out_of_tat = is_out_of_tat.lower() == 'true'
+    return out_of_tat_q(now) if is_out_of_tat else within_tat_q(now)
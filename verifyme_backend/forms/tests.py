@@ -1,3 +1,620 @@
+import importlib
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.apps import apps
+from django.core.paginator import EmptyPage
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from accounts.models import Organization, User
+from logs.models import AuditLog
+from utils.events import LocalEventBroker, channel_for, get_broker, use_broker
+from .models import (
+    ENTRY_SEQUENCE_MAX_JUMP, DynamicFormSchema, FormEntry, FormEntryIndexedValue, FormFieldFile, SequenceOutOfRange,
+)
+from .counts import CountResult, count_entries
+from .filter_compiler import compile_filters
+from .pagination import KEYSET_ORDERINGS, CountServicePaginator, paginate_keyset
+from .row_mapper import EntryRowMapper
+from .rollups import RollupScope
+from .search import search_queryset
+from .serializers import entry_fieldset
+from .statistics import entry_statistics
+from .tat import out_of_tat_q, within_tat_q
+
+
+class EntryRowMapperTests(TestCase):
+    """EntryRowMapper must produce exactly what FormEntrySerializer does for the same fieldset"""
+
+    # (request parameters, slim default), as the list endpoints resolve them
+    MODES = {
+        'slim': ({}, True),
+        'full': ({'fields': 'all'}, True),
+        'sparse': ({'fields': 'id,case_id,status,is_out_of_tat,tat_duration_hours,verified_by_name'}, True),
+        'include': ({'fields': 'all', 'include': 'form_schema,employee'}, True),
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='row-mapper', display_name='Row Mapper', email='rows@example.com', phone='+919999999999'
+        )
+        cls.admin = User.objects.create_user(
+            email='admin@example.com', password='x', username='admin', first_name='Ada', last_name='Min',
+            organization=cls.organization, role='ADMIN',
+        )
+        cls.employee = User.objects.create_user(
+            email='employee@example.com', password='x', username='employee', first_name='Emp', last_name='',
+            organization=cls.organization, role='EMPLOYEE',
+        )
+        cls.schema = DynamicFormSchema.objects.create(
+            organization=cls.organization, name='Residence', created_by=cls.admin, tat_hours_limit=4,
+            fields_definition=[
+                {'name': 'applicant_name', 'display_name': 'Applicant', 'field_type': 'STRING'},
+                {'name': 'loan_amount', 'display_name': 'Amount', 'field_type': 'NUMERIC'},
+                {'name': 'photo', 'display_name': 'Photo', 'field_type': 'IMAGE_UPLOAD'},
+                {'name': 'old_field', 'display_name': 'Old', 'field_type': 'STRING', 'is_active': False},
+            ],
+        )
+
+        start = timezone.now() - timedelta(hours=10)
+        # Pending, with no form data
+        FormEntry.objects.create(organization=cls.organization, employee=cls.employee, form_schema=cls.schema)
+        # Completed late, verified, with an uploaded file and a field the schema no longer has
+        verified = FormEntry.objects.create(
+            organization=cls.organization, employee=cls.employee, form_schema=cls.schema,
+            form_data={'applicant_name': 'Ravi', 'loan_amount': 250000, 'removed': 'x', 'old_field': 'y'},
+            is_completed=True, is_verified=True, verified_by=cls.admin, verification_notes='Checked',
+        )
+        photo = FormFieldFile.objects.create(
+            form_entry=verified, field_name='photo', file='uploads/photo.jpg', s3_url='https://files.example.com/photo.jpg',
+            original_filename='photo.jpg', file_type='image/jpeg', file_size=1024, uploaded_by=cls.employee, is_temporary=False,
+        )
+        FormEntry.objects.filter(pk=verified.pk).update(
+            form_data=dict(verified.form_data, photo=str(photo.pk)),
+            tat_start_time=start, tat_deadline=start + timedelta(hours=4),
+            tat_completion_time=start + timedelta(hours=6, minutes=20),
+        )
+        # Completed in time, not verified; no deadline, so the schema limit applies
+        on_time = FormEntry.objects.create(
+            organization=cls.organization, employee=cls.admin, form_schema=cls.schema,
+            form_data={'applicant_name': 'Meera'}, is_completed=True,
+        )
+        FormEntry.objects.filter(pk=on_time.pk).update(
+            tat_start_time=start, tat_completion_time=start + timedelta(hours=1), tat_deadline=None,
+        )
+
+    def context_for(self, user):
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=user)
+        request.user = user
+        return {'request': Request(request)}
+
+    def assert_same_rows(self, mode, user):
+        params, slim = self.MODES[mode]
+        fieldset = entry_fieldset(params, slim=slim)
+        context = self.context_for(user)
+        entries = FormEntry.objects.filter(organization=self.organization).order_by('-created_at', '-id')
+
+        expected = fieldset.serializer(list(fieldset.queryset(entries)), many=True, context=context).data
+        mapper = EntryRowMapper(fieldset, context)
+        actual = mapper.map(mapper.values(entries))
+
+        renderer = JSONRenderer()
+        expected, actual = json.loads(renderer.render(expected)), json.loads(renderer.render(actual))
+        self.assertEqual(len(actual), 3)
+        self.assertEqual(actual, expected)
+        self.assertEqual(fieldset.included(actual, context), fieldset.included(expected, context))
+
+    def test_slim(self):
+        self.assert_same_rows('slim', self.admin)
+
+    def test_full(self):
+        self.assert_same_rows('full', self.admin)
+
+    def test_full_for_employee(self):
+        # Employees get schema details without inactive fields
+        self.assert_same_rows('full', self.employee)
+
+    def test_sparse_fieldset(self):
+        self.assert_same_rows('sparse', self.admin)
+
+    def test_include(self):
+        self.assert_same_rows('include', self.admin)
+
+
+class EntrySearchTests(TestCase):
+    """Free-text search: word prefixes through the tsvector, emails and partial ids by substring"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='search', display_name='Search', email='search@example.com', phone='+919999999999'
+        )
+        cls.employee = User.objects.create_user(
+            email='ravi.k@field.example.com', password='x', username='ravi', first_name='Ravi', last_name='Kumar',
+            organization=cls.organization, role='EMPLOYEE',
+        )
+        cls.other = User.objects.create_user(
+            email='meera@office.example.com', password='x', username='meera', first_name='Meera', last_name='Shah',
+            organization=cls.organization, role='EMPLOYEE',
+        )
+        cls.schema = DynamicFormSchema.objects.create(
+            organization=cls.organization, name='Residence',
+            fields_definition=[{'name': 'reference', 'display_name': 'Reference', 'field_type': 'STRING'}],
+        )
+        cls.entry = FormEntry.objects.create(
+            organization=cls.organization, employee=cls.employee, form_schema=cls.schema,
+            form_data={'reference': 'REF-2024-0077'}, case_id=48213,
+        )
+        cls.other_entry = FormEntry.objects.create(
+            organization=cls.organization, employee=cls.other, form_schema=cls.schema,
+            form_data={'reference': 'Walk-in'}, verification_notes='Neighbour confirmed',
+        )
+
+    def search(self, text):
+        return set(search_queryset(FormEntry.objects.filter(organization=self.organization), text))
+
+    def test_word_prefix(self):
+        self.assertEqual(self.search('Rav'), {self.entry})
+        self.assertEqual(self.search('neighb'), {self.other_entry})
+
+    def test_email(self):
+        self.assertEqual(self.search('ravi.k@field.example.com'), {self.entry})
+        self.assertEqual(self.search('@office.example'), {self.other_entry})
+
+    def test_reference_with_punctuation(self):
+        self.assertEqual(self.search('REF-2024'), {self.entry})
+
+    def test_partial_id(self):
+        self.assertEqual(self.search('8213'), {self.entry})
+        self.assertEqual(self.search('4821'), {self.entry, self.other_entry})
+        self.assertEqual(self.search('48213'), {self.entry})
+
+    def test_saved_changes_are_searchable(self):
+        self.entry.form_data = {'reference': 'Quokka lane'}
+        self.entry.save()
+        self.assertEqual(self.search('quok'), {self.entry})
+        self.assertEqual(self.search('REF-2024'), set())
+
+    def test_migration_backfill(self):
+        FormEntry.objects.filter(organization=self.organization).update(search_vector=None)
+        migration = importlib.import_module('forms.migrations.0020_formentry_search_vector')
+        with connection.schema_editor(atomic=False) as schema_editor:
+            migration.backfill_search_vectors(apps, schema_editor)
+        self.assertFalse(FormEntry.objects.filter(organization=self.organization, search_vector=None).exists())
+        self.assertEqual(self.search('Rav'), {self.entry})
+
+
+class CompiledFilterHashTests(TestCase):
+    """Filters relative to now hash differently once the time they mean has moved on"""
+
+    def hash_at(self, payload, now):
+        return compile_filters(payload, now=now).hash
+
+    def test_absolute_filter_ignores_the_clock(self):
+        now = timezone.now()
+        payload = {'status': 'completed', 'start_date': '2024-01-01'}
+        self.assertEqual(self.hash_at(payload, now), self.hash_at(payload, now + timedelta(days=3)))
+
+    def test_today_changes_at_midnight(self):
+        midnight = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        payload = {'date_range': 'today'}
+        self.assertEqual(self.hash_at(payload, midnight + timedelta(hours=1)), self.hash_at(payload, midnight + timedelta(hours=20)))
+        self.assertNotEqual(self.hash_at(payload, midnight - timedelta(minutes=1)), self.hash_at(payload, midnight))
+
+    def test_rolling_ranges_and_tat_change_every_minute(self):
+        now = timezone.localtime().replace(second=0, microsecond=0)
+        for payload in ({'date_range': 'last_7_days'}, {'isOutOfTat': 'true'}):
+            with self.subTest(payload=payload):
+                self.assertEqual(self.hash_at(payload, now), self.hash_at(payload, now + timedelta(seconds=30)))
+                self.assertNotEqual(self.hash_at(payload, now), self.hash_at(payload, now + timedelta(minutes=1)))
+
+
+class CountServicePaginatorTests(TestCase):
+    """Page existence never depends on an estimated count"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='pages', display_name='Pages', email='pages@example.com', phone='+919999999999'
+        )
+        cls.employee = User.objects.create_user(
+            email='pages@field.example.com', password='x', username='pages', first_name='Page', last_name='',
+            organization=cls.organization, role='EMPLOYEE',
+        )
+        schema = DynamicFormSchema.objects.create(organization=cls.organization, name='Residence', fields_definition=[])
+        for _ in range(25):
+            FormEntry.objects.create(organization=cls.organization, employee=cls.employee, form_schema=schema)
+
+    def paginator(self):
+        entries = FormEntry.objects.filter(organization=self.organization).order_by('case_id')
+        return CountServicePaginator(entries, 10, organization_id=self.organization.pk)
+
+    def test_exact_count(self):
+        paginator = self.paginator()
+        self.assertTrue(paginator.count_result.exact)
+        self.assertEqual(paginator.count, 25)
+        self.assertFalse(paginator.page(3).has_next())
+        with self.assertRaises(EmptyPage):
+            paginator.page(4)
+
+    def estimated(self, value):
+        return mock.patch.object(CountServicePaginator, 'count_result', CountResult(value, exact=False))
+
+    def test_overestimate(self):
+        paginator = self.paginator()
+        with self.estimated(1_000_000):
+            self.assertEqual(paginator.count, 1_000_000)
+            self.assertTrue(paginator.page(2).has_next())
+            last = paginator.page(3)
+            self.assertEqual(len(last.object_list), 5)
+            self.assertFalse(last.has_next())
+            with self.assertRaises(EmptyPage):
+                paginator.page(4)
+            self.assertEqual(paginator.num_pages, 3)
+
+    def test_underestimate(self):
+        paginator = self.paginator()
+        with self.estimated(12):
+            # The estimate would have cut the list after two rows of page 2
+            self.assertEqual(len(paginator.page(2).object_list), 10)
+            self.assertTrue(paginator.page(2).has_next())
+            self.assertEqual(len(paginator.page(3).object_list), 5)
+
+
+class EntrySequenceTests(TestCase):
+    """entry_id/case_id come from per-organization counters that explicit values only move forward a bounded step"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='sequence', display_name='Sequence', email='sequence@example.com', phone='+919999999999'
+        )
+        cls.employee = User.objects.create_user(
+            email='sequence@field.example.com', password='x', username='sequence', first_name='Seq', last_name='',
+            organization=cls.organization, role='EMPLOYEE',
+        )
+        cls.schema = DynamicFormSchema.objects.create(organization=cls.organization, name='Residence', fields_definition=[])
+
+    def create(self, **kwargs):
+        return FormEntry.objects.create(organization=self.organization, employee=self.employee, form_schema=self.schema, **kwargs)
+
+    def test_consecutive_values(self):
+        first, second = self.create(), self.create()
+        self.assertEqual((second.entry_id, second.case_id), (first.entry_id + 1, first.case_id + 1))
+
+    def test_explicit_case_id_moves_the_counter(self):
+        first = self.create()
+        explicit = self.create(case_id=first.case_id + 50)
+        self.assertEqual(self.create().case_id, explicit.case_id + 1)
+
+    def test_explicit_case_id_too_far_ahead(self):
+        first = self.create()
+        with self.assertRaises(SequenceOutOfRange):
+            self.create(case_id=first.case_id + ENTRY_SEQUENCE_MAX_JUMP + 1)
+        with self.assertRaises(SequenceOutOfRange):
+            self.create(case_id=2 ** 31)
+        self.assertEqual(self.create().case_id, first.case_id + 1)
+
+
+class EventPublishingTests(TestCase):
+    """Dashboard events leave only after the write that caused them commits"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='events', display_name='Events', email='events@example.com', phone='+919999999999'
+        )
+        cls.employee = User.objects.create_user(
+            email='events@field.example.com', password='x', username='events', first_name='Eve', last_name='Nt',
+            organization=cls.organization, role='EMPLOYEE',
+        )
+        cls.schema = DynamicFormSchema.objects.create(organization=cls.organization, name='Residence', fields_definition=[])
+
+    def setUp(self):
+        previous = get_broker()
+        self.addCleanup(use_broker, previous)
+        self.broker = LocalEventBroker()
+        use_broker(self.broker)
+
+    def published(self):
+        events, _, _ = self.broker.read(channel_for(self.organization.pk), 0, 0)
+        return [(event.name, json.loads(event.data)) for event in events]
+
+    def create_entry(self):
+        return FormEntry.objects.create(organization=self.organization, employee=self.employee, form_schema=self.schema)
+
+    def test_entry_event_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            entry = self.create_entry()
+            self.assertEqual(self.published(), [])
+        self.assertTrue(callbacks)
+        [(name, data)] = self.published()
+        self.assertEqual(name, 'entry.created')
+        self.assertEqual((data['id'], data['delta']), (str(entry.pk), {'total': 1, 'pending': 1}))
+
+    def test_rolled_back_entry_is_not_published(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.create_entry()
+                raise RuntimeError
+        self.assertEqual(self.published(), [])
+
+    def test_activity_event_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            log = AuditLog.log_activity(
+                self.employee, 'LOGIN', 'Logged in', user_agent='tests', organization=self.organization
+            )
+            self.assertEqual(self.published(), [])
+        [(name, data)] = self.published()
+        self.assertEqual((name, data['id'], data['user_name']), ('activity.login', str(log.pk), 'Eve Nt'))
+
+
+class EntrySaveTests(TestCase):
+    """Saves that don't touch form_data, form_schema or tat_start_time skip the schema-derived work"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='saves', display_name='Saves', email='saves@example.com', phone='+919999999999'
+        )
+        cls.employee = User.objects.create_user(
+            email='saves@field.example.com', password='x', username='saves', first_name='Sav', last_name='',
+            organization=cls.organization, role='EMPLOYEE',
+        )
+        cls.schema = DynamicFormSchema.objects.create(
+            organization=cls.organization, name='Residence', tat_hours_limit=4,
+            fields_definition=[{'name': 'location', 'display_name': 'Location', 'field_type': 'STRING', 'is_indexed': True}],
+        )
+        cls.entry = FormEntry.objects.create(
+            organization=cls.organization, employee=cls.employee, form_schema=cls.schema, form_data={'location': 'Pune'},
+        )
+
+    def load(self):
+        # Without the manager's select_related, so reading form_schema would query
+        return FormEntry.objects.select_related(None).get(pk=self.entry.pk)
+
+    def tables_written_or_read(self, entry, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            entry.save(**kwargs)
+        # The entry's own UPDATE reads the schema name for its search document
+        sql = ' '.join(
+            query['sql'] for query in queries.captured_queries
+            if not query['sql'].startswith('UPDATE "forms_formentry"')
+        )
+        return {table for table in ('forms_dynamicformschema', 'forms_entry_indexed_value') if table in sql}
+
+    def indexed(self):
+        return list(FormEntryIndexedValue.objects.filter(entry_id=self.entry.pk).values_list('value_text', flat=True))
+
+    def test_unrelated_update_fields(self):
+        entry = self.load()
+        entry.is_verified = True
+        self.assertEqual(self.tables_written_or_read(entry, update_fields=['is_verified']), set())
+
+    def test_unrelated_full_save(self):
+        entry = self.load()
+        entry.verification_notes = 'Seen'
+        self.assertEqual(self.tables_written_or_read(entry), set())
+
+    def test_form_data_change(self):
+        entry = self.load()
+        fingerprint = entry.fingerprint
+        entry.form_data['location'] = 'Nashik'
+        self.assertEqual(
+            self.tables_written_or_read(entry, update_fields=['form_data']),
+            {'forms_dynamicformschema', 'forms_entry_indexed_value'},
+        )
+        entry = self.load()
+        self.assertEqual(self.indexed(), ['nashik'])
+        self.assertNotEqual(entry.fingerprint, fingerprint)
+        # Saved values are the new baseline
+        entry.is_completed = True
+        self.assertEqual(self.tables_written_or_read(entry), set())
+
+    def test_tat_start_change(self):
+        entry = self.load()
+        entry.tat_start_time = entry.tat_start_time - timedelta(hours=2)
+        entry.save(update_fields=['tat_start_time'])
+        self.assertEqual(self.load().tat_deadline, entry.tat_start_time + timedelta(hours=4))
+
+
+class TatFilterTests(TestCase):
+    """The SQL TAT predicates agree with FormEntry.check_tat_status()"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='tat', display_name='TAT', email='tat@example.com', phone='+919999999999'
+        )
+        cls.admin = User.objects.create_user(
+            email='tat@office.example.com', password='x', username='tat', first_name='Tat', last_name='',
+            organization=cls.organization, role='ADMIN',
+        )
+        cls.schema = DynamicFormSchema.objects.create(
+            organization=cls.organization, name='Residence', tat_hours_limit=4, fields_definition=[],
+        )
+        now = timezone.now()
+        cls.entries = {}
+        for name, started_hours_ago, completed_after_hours in (
+            ('overdue', 5, None),
+            ('pending', 1, None),
+            ('late', 10, 6),
+            ('on_time', 10, 1),
+        ):
+            entry = FormEntry.objects.create(organization=cls.organization, employee=cls.admin, form_schema=cls.schema)
+            # Moving the start through save() moves the deadline with it
+            entry.tat_start_time = now - timedelta(hours=started_hours_ago)
+            entry.save()
+            if completed_after_hours is not None:
+                entry.is_completed = True
+                entry.tat_completion_time = entry.tat_start_time + timedelta(hours=completed_after_hours)
+                entry.save()
+            cls.entries[name] = entry
+
+    def matching(self, condition):
+        entries = FormEntry.objects.filter(organization=self.organization).filter(condition)
+        return {entry.pk for entry in entries}
+
+    def test_predicates_match_check_tat_status(self):
+        late = {entry.pk for entry in self.entries.values() if FormEntry.objects.get(pk=entry.pk).check_tat_status()}
+        self.assertEqual(late, {self.entries['overdue'].pk, self.entries['late'].pk})
+        self.assertEqual(self.matching(out_of_tat_q()), late)
+        self.assertEqual(self.matching(within_tat_q()), {entry.pk for entry in self.entries.values()} - late)
+
+    def test_list_filter(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get('/api/forms/api/entries/', {'isOutOfTat': 'true'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {row['id'] for row in response.data['results']},
+            {str(self.entries['overdue'].pk), str(self.entries['late'].pk)},
+        )
+
+
+class KeysetPaginationTests(TestCase):
+    """Walking cursors forward and back visits every entry once, in order"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='keyset', display_name='Keyset', email='keyset@example.com', phone='+919999999999'
+        )
+        cls.employee = User.objects.create_user(
+            email='keyset@field.example.com', password='x', username='keyset', first_name='Key', last_name='',
+            organization=cls.organization, role='EMPLOYEE',
+        )
+        schema = DynamicFormSchema.objects.create(organization=cls.organization, name='Residence', fields_definition=[])
+        entries = [
+            FormEntry.objects.create(organization=cls.organization, employee=cls.employee, form_schema=schema)
+            for _ in range(8)
+        ]
+        # Ties on created_at and entries without a case_id
+        FormEntry.objects.filter(pk__in=[entry.pk for entry in entries[2:5]]).update(created_at=entries[2].created_at)
+        FormEntry.objects.filter(pk__in=[entries[1].pk, entries[6].pk]).update(case_id=None)
+
+    def walk(self, queryset, ordering, page_size=3):
+        pages, cursors = [], []
+        cursor = None
+        while True:
+            rows, next_cursor, previous_cursor = paginate_keyset(queryset, ordering, page_size, cursor)
+            pages.append([row.pk for row in rows])
+            cursors.append(previous_cursor)
+            if next_cursor is None:
+                return pages, cursors
+            cursor = next_cursor
+
+    def test_round_trip(self):
+        queryset = FormEntry.objects.filter(organization=self.organization)
+        for ordering, keys in KEYSET_ORDERINGS.items():
+            with self.subTest(ordering=ordering):
+                pages, previous_cursors = self.walk(queryset, ordering)
+                expected = list(queryset.order_by(*keys).values_list('pk', flat=True))
+                self.assertEqual([pk for page in pages for pk in page], expected)
+                self.assertIsNone(previous_cursors[0])
+
+                # Back from the last page, one page at a time
+                for index in range(len(pages) - 1, 0, -1):
+                    rows, next_cursor, _ = paginate_keyset(queryset, ordering, 3, previous_cursors[index])
+                    self.assertEqual([row.pk for row in rows], pages[index - 1])
+                    self.assertIsNotNone(next_cursor)
+
+
+class RollupCountTests(TestCase):
+    """Dashboard counters from the daily rollups equal exact counts of the entries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='rollups', display_name='Rollups', email='rollups@example.com', phone='+919999999999'
+        )
+        cls.employee = User.objects.create_user(
+            email='rollups@field.example.com', password='x', username='rollups', first_name='Roll', last_name='',
+            organization=cls.organization, role='EMPLOYEE',
+        )
+        schema = DynamicFormSchema.objects.create(
+            organization=cls.organization, name='Residence', tat_hours_limit=4, fields_definition=[],
+        )
+        other = DynamicFormSchema.objects.create(organization=cls.organization, name='Office', fields_definition=[])
+        now = timezone.now()
+        entries = [
+            FormEntry.objects.create(organization=cls.organization, employee=cls.employee, form_schema=schema)
+            for _ in range(6)
+        ]
+        # Overdue, completed late, completed and verified, reopened, moved, deleted
+        entries[0].tat_start_time = now - timedelta(hours=5)
+        entries[0].save()
+        entries[1].tat_start_time = now - timedelta(hours=9)
+        entries[1].save()
+        entries[1].is_completed = True
+        entries[1].tat_completion_time = now
+        entries[1].save()
+        entries[2].mark_completed()
+        entries[2].is_verified = True
+        entries[2].save(update_fields=['is_verified'])
+        entries[3].mark_completed()
+        entries[3].is_completed = False
+        entries[3].save()
+        entries[4].form_schema = other
+        entries[4].save()
+        entries[5].delete()
+
+    def test_statistics(self):
+        entries = FormEntry.objects.filter(organization=self.organization)
+        expected = entry_statistics(entries, repeats=False)
+        actual = RollupScope(self.organization.pk).statistics()
+        for name in ('total', 'completed', 'verified', 'pending', 'pending_unverified', 'out_of_tat'):
+            self.assertEqual(actual[name], expected[name], name)
+        self.assertAlmostEqual(actual['average_tat_hours'], expected['average_tat_hours'], places=6)
+        self.assertEqual(actual['total'], count_entries(entries, exact=True).value)
+        self.assertEqual((actual['total'], actual['out_of_tat']), (5, 2))
+
+
+class ExportPermissionTests(TestCase):
+    """Entry exports need the user's password and only contain their organization's entries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='exports', display_name='Exports', email='exports@example.com', phone='+919999999999'
+        )
+        cls.employee = User.objects.create_user(
+            email='exports@field.example.com', password='secret', username='exports', first_name='Ex', last_name='',
+            organization=cls.organization, role='EMPLOYEE',
+        )
+        schema = DynamicFormSchema.objects.create(organization=cls.organization, name='Residence', fields_definition=[])
+        cls.entry = FormEntry.objects.create(organization=cls.organization, employee=cls.employee, form_schema=schema)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.employee)
+
+    def export(self, **data):
+        return self.client.post('/api/forms/api/export/', {'format': 'json', **data}, format='json')
+
+    def test_password_required(self):
+        self.assertEqual(self.export().status_code, 400)
+        self.assertEqual(self.export(password='wrong').status_code, 401)
+        self.assertEqual(
+            self.client.post('/api/reports/api/exports/', {'export_type': 'FORM_DATA', 'format': 'CSV'}, format='json').status_code,
+            400,
+        )
+
+    def test_organization_scope(self):
+        response = self.export(password='secret')
+        self.assertEqual(response.status_code, 200)
+        rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([row['id'] for row in rows], [str(self.entry.pk)])
 
-# Create your tests here.
+    def test_unauthenticated(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.export(password='secret').status_code, 401)
@@ -8,7 +8,8 @@ from .views import (
     FormFieldFileViewSet, 
     FormEntryExportView,
     FormEntryUploadView,
-    EnhancedFormEntryExportView
+    EnhancedFormEntryExportView,
+    EventStreamView
 )
 
 # Create router and register viewsets
@@ -53,4 +54,7 @@ urlpatterns = [
     
     # File upload
     path('api/upload/', FormEntryUploadView.as_view(), name='file-upload'),
+    
+    # Server-sent dashboard events
+    path('api/events/', EventStreamView.as_view(), name='event-stream'),
 ] 
\ No newline at end of file
@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from forms.data_version import ACTIVITY, bump_data_version
+from utils.events import publish
+from .models import AuditLog
+
+@receiver(post_save, sender=AuditLog)
+@receiver(post_delete, sender=AuditLog)
+def bump_audit_activity_version(sender, instance, **kwargs):
+    """Invalidate cached activity statistics of the log's organization"""
+    bump_data_version(instance.organization_id, ACTIVITY)
+
+# Audit actions dashboards show as live activity
+ACTIVITY_EVENTS = {'LOGIN': 'activity.login', 'LOGOUT': 'activity.logout', 'USER_CREATE': 'activity.user_created'}
+
+@receiver(post_save, sender=AuditLog)
+def publish_activity_event(sender, instance, created, raw=False, **kwargs):
+    """Push logins, logouts and new users to dashboards, shaped like real_time_analytics' recent_activities"""
+    name = ACTIVITY_EVENTS.get(instance.action)
+    if not created or raw or name is None:
+        return
+
+    def data():
+        # Built after the commit: the user and organization loads stay out of the login's transaction
+        user = instance.user
+        organization = instance.organization
+        return {
+            'id': str(instance.id),
+            'action': instance.action,
+            'user_name': f"{user.first_name} {user.last_name}" if user else "Unknown User",
+            'user_role': user.role if user else "Unknown",
+            'organization_name': organization.name if organization else "System",
+            'timestamp': instance.timestamp.isoformat(),
+            'ip_address': instance.ip_address,
+            'details': instance.details,
+        }
+
+    publish(instance.organization_id, name, data, user_id=instance.user_id)
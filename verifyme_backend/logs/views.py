@@ -11,6 +11,7 @@ from datetime import timedelta
 from .models import AuditLog
 from .serializers import AuditLogSerializer, AuditLogStatisticsSerializer
 from accounts.permissions import IsOrganizationAdmin
+from forms.data_version import ACTIVITY, cached_statistics
 
 class AuditLogViewSet(viewsets.ModelViewSet):
     """ViewSet for AuditLog management"""
@@ -58,145 +59,161 @@ class AuditLogViewSet(viewsets.ModelViewSet):
     def employee_analytics(self, request):
         """Get employee activity analytics for real-time dashboard"""
         user = request.user
+        organization_id = None if user.role == 'SUPER_ADMIN' else user.organization_id
         
-        if user.role == 'SUPER_ADMIN':
-            # Super admin gets all statistics
-            # Count actual employees (not just audit logs)
-            from accounts.models import User
-            employees_created_total = User.objects.filter(role='EMPLOYEE').count()
+        def compute():
+            if user.role == 'SUPER_ADMIN':
+                # Super admin gets all statistics
+                # Count actual employees (not just audit logs)
+                from accounts.models import User
+                employees_created_total = User.objects.filter(role='EMPLOYEE').count()
             
-            # Login activities (all time)
-            login_activities_total = AuditLog.objects.filter(
-                action='LOGIN'
-            ).count()
+                # Login activities (all time)
+                login_activities_total = AuditLog.objects.filter(
+                    action='LOGIN'
+                ).count()
             
-            # Logout activities (all time)
-            logout_activities_total = AuditLog.objects.filter(
-                action='LOGOUT'
-            ).count()
+                # Logout activities (all time)
+                logout_activities_total = AuditLog.objects.filter(
+                    action='LOGOUT'
+                ).count()
             
-            # Total unique users who have logged in
-            unique_users_total = AuditLog.objects.filter(
-                action='LOGIN'
-            ).values('user').distinct().count()
+                # Total unique users who have logged in
+                unique_users_total = AuditLog.objects.filter(
+                    action='LOGIN'
+                ).values('user').distinct().count()
             
-            # Recent employee activities (last 10)
-            recent_activities = AuditLog.objects.filter(
-                action__in=['LOGIN', 'LOGOUT', 'USER_CREATE']
-            ).select_related('user', 'organization').order_by('-timestamp')[:10]
+                # Recent employee activities (last 10)
+                recent_activities = AuditLog.objects.filter(
+                    action__in=['LOGIN', 'LOGOUT', 'USER_CREATE']
+                ).select_related('user', 'organization').order_by('-timestamp')[:10]
             
-        else:
-            # Admin/Employee gets organization-specific statistics
-            org = user.organization
+            else:
+                # Admin/Employee gets organization-specific statistics
+                org = user.organization
             
-            # Count actual employees in the organization
-            from accounts.models import User
-            employees_created_total = User.objects.filter(
-                organization=org,
-                role='EMPLOYEE'
-            ).count()
+                # Count actual employees in the organization
+                from accounts.models import User
+                employees_created_total = User.objects.filter(
+                    organization=org,
+                    role='EMPLOYEE'
+                ).count()
             
-            # Login activities (all time)
-            login_activities_total = AuditLog.objects.filter(
-                organization=org,
-                action='LOGIN'
-            ).count()
+                # Login activities (all time)
+                login_activities_total = AuditLog.objects.filter(
+                    organization=org,
+                    action='LOGIN'
+                ).count()
             
-            # Logout activities (all time)
-            logout_activities_total = AuditLog.objects.filter(
-                organization=org,
-                action='LOGOUT'
-            ).count()
+                # Logout activities (all time)
+                logout_activities_total = AuditLog.objects.filter(
+                    organization=org,
+                    action='LOGOUT'
+                ).count()
             
-            # Total unique users who have logged in
-            unique_users_total = AuditLog.objects.filter(
-                organization=org,
-                action='LOGIN'
-            ).values('user').distinct().count()
+                # Total unique users who have logged in
+                unique_users_total = AuditLog.objects.filter(
+                    organization=org,
+                    action='LOGIN'
+                ).values('user').distinct().count()
             
-            # Recent employee activities (last 10)
-            recent_activities = AuditLog.objects.filter(
-                organization=org,
-                action__in=['LOGIN', 'LOGOUT', 'USER_CREATE']
-            ).select_related('user', 'organization').order_by('-timestamp')[:10]
+                # Recent employee activities (last 10)
+                recent_activities = AuditLog.objects.filter(
+                    organization=org,
+                    action__in=['LOGIN', 'LOGOUT', 'USER_CREATE']
+                ).select_related('user', 'organization').order_by('-timestamp')[:10]
         
-        data = {
-            'employees_created_total': employees_created_total,
-            'login_activities_total': login_activities_total,
-            'logout_activities_total': logout_activities_total,
-            'unique_users_total': unique_users_total,
-            'total_activities_total': login_activities_total + logout_activities_total,
-            'recent_activities': AuditLogSerializer(recent_activities, many=True, context={'request': request}).data
-        }
+            data = {
+                'employees_created_total': employees_created_total,
+                'login_activities_total': login_activities_total,
+                'logout_activities_total': logout_activities_total,
+                'unique_users_total': unique_users_total,
+                'total_activities_total': login_activities_total + logout_activities_total,
+                'recent_activities': AuditLogSerializer(recent_activities, many=True, context={'request': request}).data
+            }
         
-        return Response(data)
+            return data
+        
+        # Cached until the organization's users or audit logs change
+        return Response(cached_statistics(
+            'employee_analytics', organization_id, compute, scopes=(ACTIVITY,)
+        ))
     
     @action(detail=False, methods=['get'])
     def statistics(self, request):
         """Get audit log statistics"""
         user = request.user
+        organization_id = None if user.role == 'SUPER_ADMIN' else user.organization_id
         
-        if user.role == 'SUPER_ADMIN':
-            # Super admin gets all statistics
-            total_logs = AuditLog.objects.count()
-            today_logs = AuditLog.objects.filter(
-                timestamp__date=timezone.now().date()
-            ).count()
-            this_week_logs = AuditLog.objects.filter(
-                timestamp__gte=timezone.now() - timedelta(days=7)
-            ).count()
-            this_month_logs = AuditLog.objects.filter(
-                timestamp__gte=timezone.now() - timedelta(days=30)
-            ).count()
+        def compute():
+            if user.role == 'SUPER_ADMIN':
+                # Super admin gets all statistics
+                total_logs = AuditLog.objects.count()
+                today_logs = AuditLog.objects.filter(
+                    timestamp__date=timezone.now().date()
+                ).count()
+                this_week_logs = AuditLog.objects.filter(
+                    timestamp__gte=timezone.now() - timedelta(days=7)
+                ).count()
+                this_month_logs = AuditLog.objects.filter(
+                    timestamp__gte=timezone.now() - timedelta(days=30)
+                ).count()
             
-            # Action breakdown
-            action_stats = AuditLog.objects.values('action').annotate(
-                count=Count('id')
-            ).order_by('-count')[:5]
+                # Action breakdown
+                action_stats = AuditLog.objects.values('action').annotate(
+                    count=Count('id')
+                ).order_by('-count')[:5]
             
-            # Recent logs
-            recent_logs = AuditLog.objects.order_by('-timestamp')[:10]
+                # Recent logs
+                recent_logs = AuditLog.objects.order_by('-timestamp')[:10]
             
-        else:
-            # Admin/Employee gets organization-specific statistics
-            org = user.organization
-            total_logs = AuditLog.objects.filter(organization=org).count()
-            today_logs = AuditLog.objects.filter(
-                organization=org,
-                timestamp__date=timezone.now().date()
-            ).count()
-            this_week_logs = AuditLog.objects.filter(
-                organization=org,
-                timestamp__gte=timezone.now() - timedelta(days=7)
-            ).count()
-            this_month_logs = AuditLog.objects.filter(
-                organization=org,
-                timestamp__gte=timezone.now() - timedelta(days=30)
-            ).count()
+            else:
+                # Admin/Employee gets organization-specific statistics
+                org = user.organization
+                total_logs = AuditLog.objects.filter(organization=org).count()
+                today_logs = AuditLog.objects.filter(
+                    organization=org,
+                    timestamp__date=timezone.now().date()
+                ).count()
+                this_week_logs = AuditLog.objects.filter(
+                    organization=org,
+                    timestamp__gte=timezone.now() - timedelta(days=7)
+                ).count()
+                this_month_logs = AuditLog.objects.filter(
+                    organization=org,
+                    timestamp__gte=timezone.now() - timedelta(days=30)
+                ).count()
             
-            # Action breakdown for organization
-            action_stats = AuditLog.objects.filter(
-                organization=org
-            ).values('action').annotate(
-                count=Count('id')
-            ).order_by('-count')[:5]
+                # Action breakdown for organization
+                action_stats = AuditLog.objects.filter(
+                    organization=org
+                ).values('action').annotate(
+                    count=Count('id')
+                ).order_by('-count')[:5]
             
-            # Recent logs for organization
-            recent_logs = AuditLog.objects.filter(
-                organization=org
-            ).order_by('-timestamp')[:10]
+                # Recent logs for organization
+                recent_logs = AuditLog.objects.filter(
+                    organization=org
+                ).order_by('-timestamp')[:10]
         
-        data = {
-            'total_logs': total_logs,
-            'today_logs': today_logs,
-            'this_week_logs': this_week_logs,
-            'this_month_logs': this_month_logs,
-            'action_breakdown': list(action_stats),
-            'recent_logs': AuditLogSerializer(recent_logs, many=True, context={'request': request}).data
-        }
+            data = {
+                'total_logs': total_logs,
+                'today_logs': today_logs,
+                'this_week_logs': this_week_logs,
+                'this_month_logs': this_month_logs,
+                'action_breakdown': list(action_stats),
+                'recent_logs': recent_logs
+            }
         
-        serializer = AuditLogStatisticsSerializer(data)
-        return Response(serializer.data)
+            serializer = AuditLogStatisticsSerializer(data, context={'request': request})
+            return serializer.data
+        
+        # Cached until the organization's audit logs change; the day is part of
+        # the key so today's count starts over at midnight
+        return Response(cached_statistics(
+            'audit_statistics', organization_id, compute, scopes=(ACTIVITY,),
+            parts=(timezone.now().date(),)
+        ))
     
     @action(detail=False, methods=['get'])
     def my_logs(self, request):
@@ -4,7 +4,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Count, Q
+from django.db.models import Count, Max, Q
 from django.shortcuts import get_object_or_404
 
 from .models import (
@@ -18,8 +18,9 @@ from .serializers import (
 )
 from accounts.permissions import IsOrganizationAdmin, IsSuperAdmin
 from accounts.models import Organization
+from utils.conditional import ConditionalGetMixin, instance_validators, latest
 
-class StateViewSet(viewsets.ModelViewSet):
+class StateViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for State management"""
     
     queryset = State.objects.all()
@@ -87,7 +88,7 @@ class StateViewSet(viewsets.ModelViewSet):
             'total_count': cities.count()
         })
 
-class CityViewSet(viewsets.ModelViewSet):
+class CityViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for City management"""
     
     queryset = City.objects.all()
@@ -131,8 +132,21 @@ class CityViewSet(viewsets.ModelViewSet):
             if org_master_data:
                 return org_master_data.cities.filter(is_active=True)
             return City.objects.none()
+    
+    def get_list_validators(self, queryset):
+        """Validators of the list, which also shows each city's state name and code"""
+        values = queryset.order_by().aggregate(
+            count=Count('pk'), modified=Max('updated_at'), state_modified=Max('state__updated_at')
+        )
+        parts = (values['count'], values['modified'], values['state_modified'])
+        return parts, latest(values['modified'], values['state_modified'])
+    
+    def get_object_validators(self, instance):
+        state_modified = instance.state.updated_at
+        parts, modified = instance_validators(instance, state_modified)
+        return parts, latest(modified, state_modified)
 
-class BankViewSet(viewsets.ModelViewSet):
+class BankViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for Bank management"""
     
     queryset = Bank.objects.all()
@@ -194,7 +208,7 @@ class BankViewSet(viewsets.ModelViewSet):
         
         return Response(bank_types)
 
-class NBFCViewSet(viewsets.ModelViewSet):
+class NBFCViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for NBFC management"""
     
     queryset = NBFC.objects.all()
@@ -256,7 +270,7 @@ class NBFCViewSet(viewsets.ModelViewSet):
         
         return Response(nbfc_types)
 
-class ProductTypeViewSet(viewsets.ModelViewSet):
+class ProductTypeViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for Product Type management"""
     
     queryset = ProductType.objects.all()
@@ -301,7 +315,7 @@ class ProductTypeViewSet(viewsets.ModelViewSet):
                 return org_master_data.product_types.filter(is_active=True)
             return ProductType.objects.none()
 
-class CaseStatusViewSet(viewsets.ModelViewSet):
+class CaseStatusViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for Case Status management"""
     
     queryset = CaseStatus.objects.all()
@@ -0,0 +1,279 @@
+"""
+Background export jobs.
+
+Form entry exports run outside the request: the export views (with
+`"async": true`), ExportViewSet.create and ReportViewSet.generate create an
+Export row and enqueue it. A worker builds the file with the same writers as
+the synchronous exports (forms/views.py), saves it to the default storage and
+completes the row. Progress is saved on the row as rows are written, which
+publishes export.progress events (reports/signals.py), and
+ExportViewSet.download hands out a URL for the file.
+
+The queue is pluggable through settings.EXPORT_QUEUE (a dotted path):
+
+    ThreadExportQueue     a small thread pool in the web process (development)
+    ImmediateExportQueue  runs the job in the caller once its transaction
+                          commits (tests, scripts)
+    DatabaseExportQueue   leaves PENDING rows for `manage.py run_exports`
+                          worker processes, which claim them with SKIP LOCKED
+
+Export.filters holds the job: {'filters': ..., 'options': ..., 'layout': ...,
+'all_organizations': ...}. Exports of the thread queue that were still pending
+when their process stopped are picked up by `run_exports --once`.
+"""
+import importlib
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.utils import timezone
+
+from utils.storage import get_report_upload_path
+from .models import Export
+
+logger = logging.getLogger(__name__)
+
+EXPORT_WORKER_THREADS = getattr(settings, 'EXPORT_WORKER_THREADS', 2)
+# Progress is saved (an UPDATE and an event) every this many percentage points
+EXPORT_PROGRESS_STEP = 5
+# A PROCESSING export older than this lost its worker
+EXPORT_JOB_TIMEOUT = getattr(settings, 'EXPORT_JOB_TIMEOUT', 60 * 60)
+
+EXPORT_FORMATS = {
+    'EXCEL': ('excel', 'xlsx'),
+    'PDF': ('pdf', 'pdf'),
+    'CSV': ('csv', 'csv'),
+    'JSON': ('json', 'json'),
+    'PARQUET': ('parquet', 'parquet'),
+    'FEATHER': ('feather', 'feather'),
+}
+
+# Writers of each layout; both export views take the same job
+EXPORT_LAYOUTS = {
+    'standard': 'forms.views.FormEntryExportView',
+    'enhanced': 'forms.views.EnhancedFormEntryExportView',
+}
+
+
+class ExportCancelled(Exception):
+    """The export was cancelled while it was being written"""
+
+
+class ExportProgress:
+    """Counts the rows an export has written and saves progress on its row"""
+
+    def __init__(self, export, total, step=EXPORT_PROGRESS_STEP):
+        self.export = export
+        self.total = total
+        self.step = step
+        self.processed = 0
+        self._saved = export.progress
+
+    def track(self, rows, size=None):
+        """Yield rows, counting size(row) records for each (one by default)"""
+        for row in rows:
+            yield row
+            self.advance(size(row) if size else 1)
+
+    def advance(self, count=1):
+        self.processed += count
+        # 100 is left for when the file is saved
+        progress = min(99, self.processed * 100 // self.total) if self.total else 99
+        if progress - self._saved >= self.step:
+            self.save(progress)
+
+    def save(self, progress):
+        if Export.objects.filter(pk=self.export.pk, status='CANCELLED').exists():
+            raise ExportCancelled()
+        self.export.progress = progress
+        self.export.processed_records = min(self.processed, self.total)
+        self.export.save(update_fields=['progress', 'processed_records'])
+        self._saved = progress
+
+
+def export_job(filters=None, options=None, layout='standard', all_organizations=False, file_name=None):
+    """Export.filters for a form entry export"""
+    if layout not in EXPORT_LAYOUTS:
+        raise ValueError(f"Unknown export layout: {layout}")
+    job = {
+        'filters': filters or {},
+        'options': options or {},
+        'layout': layout,
+        'all_organizations': all_organizations,
+    }
+    if file_name:
+        job['file_name'] = file_name
+    return job
+
+
+def _writer(export):
+    module, _, name = EXPORT_LAYOUTS[export.filters.get('layout', 'standard')].rpartition('.')
+    view = getattr(importlib.import_module(module), name)()
+    # Writers only use the request for absolute URLs
+    view.request = None
+    return view
+
+
+def run_export(export):
+    """Write an export's file to storage and complete the row"""
+    if export.export_type not in ('FORM_DATA', 'CUSTOM'):
+        raise ValueError(f"{export.get_export_type_display()} is not supported by background exports")
+    view_format, extension = EXPORT_FORMATS[export.format]
+    job = export.filters or {}
+    view = _writer(export)
+
+    filters = job.get('filters', {})
+    organization = None if job.get('all_organizations') else export.organization
+    entries = view.get_filtered_entries(filters, organization)
+    export.total_records = entries.count()
+    export.save(update_fields=['total_records'])
+
+    view.progress = ExportProgress(export, export.total_records)
+    timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
+    file_name = job.get('file_name') or f"form_entries_{view.get_date_range_text(filters)}_{timestamp}"
+    response = getattr(view, f'export_to_{view_format}')(entries, job.get('options', {}), file_name)
+
+    # Spooled to disk, so large files don't sit in the worker's memory
+    with tempfile.TemporaryFile() as artifact:
+        try:
+            for chunk in response:
+                artifact.write(chunk)
+        finally:
+            response.close()
+        file_size = artifact.tell()
+        artifact.seek(0)
+        export.file_name = f'{file_name}.{extension}'
+        file_path = default_storage.save(get_report_upload_path(export, export.file_name), File(artifact))
+
+    export.processed_records = export.total_records
+    export.complete_processing(file_path=file_path, file_size=file_size)
+    logger.info(f"Export {export.pk} completed: {export.total_records} records, {file_size} bytes at {file_path}")
+    return export
+
+
+def claim_export(export_id=None):
+    """Mark a PENDING export (the oldest, or export_id) as processing; None when there is none to take"""
+    with transaction.atomic():
+        pending = Export.objects.select_for_update(skip_locked=True).filter(status='PENDING')
+        if export_id is not None:
+            pending = pending.filter(pk=export_id)
+        export = pending.order_by('created_at').first()
+        if export is None:
+            return None
+        export.start_processing()
+    return export
+
+
+def process_export(export_id=None):
+    """Claim and run one export, recording a failure on the row; the export, or None if nothing was claimed"""
+    export = claim_export(export_id)
+    if export is None:
+        return None
+    try:
+        run_export(export)
+    except ExportCancelled:
+        logger.info(f"Export {export.pk} was cancelled")
+    except Exception as e:
+        logger.exception(f"Export {export.pk} failed")
+        export.error_details = {'type': type(e).__name__}
+        export.fail_processing(str(e))
+    return export
+
+
+def fail_stale_exports(timeout=EXPORT_JOB_TIMEOUT):
+    """Fail exports still PROCESSING long after they started (their worker died); returns how many"""
+    stale = Export.objects.filter(status='PROCESSING', started_at__lt=timezone.now() - timedelta(seconds=timeout))
+    count = 0
+    for export in stale:
+        export.fail_processing('Export worker stopped before finishing')
+        count += 1
+    return count
+
+
+class ThreadExportQueue:
+    """Runs exports on a thread pool in this process"""
+
+    def __init__(self, workers=EXPORT_WORKER_THREADS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='export')
+
+    def submit(self, export_id):
+        self.executor.submit(_run_in_thread, export_id)
+
+
+def _run_in_thread(export_id):
+    try:
+        process_export(export_id)
+    finally:
+        # The pool thread's own connections
+        connections.close_all()
+
+
+class ImmediateExportQueue:
+    """Runs an export in the calling thread"""
+
+    def submit(self, export_id):
+        process_export(export_id)
+
+
+class DatabaseExportQueue:
+    """Leaves exports PENDING for `manage.py run_exports` workers"""
+
+    def submit(self, export_id):
+        logger.debug(f"Export {export_id} queued for run_exports")
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_export_queue():
+    """The configured queue (settings.EXPORT_QUEUE), created once per process"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                path = getattr(settings, 'EXPORT_QUEUE', 'reports.export_jobs.ThreadExportQueue')
+                module, _, name = path.rpartition('.')
+                _queue = getattr(importlib.import_module(module), name)()
+    return _queue
+
+
+def use_export_queue(queue):
+    """Replace the queue (e.g. an ImmediateExportQueue in tests)"""
+    global _queue
+    _queue = queue
+
+
+def enqueue_export(export):
+    """Hand an export to the queue once the transaction that created it commits"""
+    export_id = export.pk
+    transaction.on_commit(lambda: get_export_queue().submit(export_id))
+    return export
+
+
+def start_entry_export(user, export_format, filters=None, options=None, layout='standard', file_name=None):
+    """Create and enqueue a form entry export for a user; export_format is a view format ('excel', 'pdf', ...).
+
+    Raises ValueError for an unknown format or a super admin without an organization.
+    """
+    codes = {view_format: code for code, (view_format, _) in EXPORT_FORMATS.items()}
+    if export_format not in codes:
+        raise ValueError('Unsupported export format')
+    if user.organization_id is None:
+        # Export rows belong to an organization
+        raise ValueError('Background exports need a user with an organization')
+    export = Export.objects.create(
+        export_type='FORM_DATA',
+        format=codes[export_format],
+        organization_id=user.organization_id,
+        created_by=user,
+        filters=export_job(filters, options, layout, all_organizations=user.role == 'SUPER_ADMIN',
+                           file_name=file_name),
+    )
+    return enqueue_export(export)
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from reports.export_jobs import EXPORT_JOB_TIMEOUT, fail_stale_exports, process_export
+
+
+class Command(BaseCommand):
+    help = 'Run pending exports (the worker process of DatabaseExportQueue)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run the exports pending now, then exit')
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help='Seconds to wait between checks when nothing is pending (default 2)')
+        parser.add_argument('--stale-after', type=int, default=EXPORT_JOB_TIMEOUT,
+                            help=f'Fail exports processing for longer than this many seconds (default {EXPORT_JOB_TIMEOUT})')
+
+    def handle(self, *args, **options):
+        stale = fail_stale_exports(options['stale_after'])
+        if stale:
+            self.stdout.write(self.style.WARNING(f'Failed {stale} exports left processing by a stopped worker'))
+
+        processed = 0
+        self.stdout.write('Waiting for exports...' if not options['once'] else 'Running pending exports...')
+        while True:
+            close_old_connections()
+            export = process_export()
+            if export is not None:
+                processed += 1
+                self.stdout.write(f'Export {export.pk}: {export.status.lower()}')
+                continue
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Ran {processed} exports'))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-17 01:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_alter_analytics_organization'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='export',
+            name='format',
+            field=models.CharField(choices=[('EXCEL', 'Excel (.xlsx)'), ('PDF', 'PDF'), ('CSV', 'CSV'), ('JSON', 'JSON'), ('PARQUET', 'Parquet'), ('FEATHER', 'Arrow IPC (Feather)')], default='EXCEL', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='format',
+            field=models.CharField(choices=[('EXCEL', 'Excel (.xlsx)'), ('PDF', 'PDF'), ('CSV', 'CSV'), ('JSON', 'JSON'), ('PARQUET', 'Parquet'), ('FEATHER', 'Arrow IPC (Feather)')], default='EXCEL', max_length=10),
+        ),
+    ]
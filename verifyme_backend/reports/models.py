@@ -61,6 +61,8 @@ class Report(models.Model):
         ('PDF', 'PDF'),
         ('CSV', 'CSV'),
         ('JSON', 'JSON'),
+        ('PARQUET', 'Parquet'),
+        ('FEATHER', 'Arrow IPC (Feather)'),
     ]
     
     # Basic Information
@@ -167,6 +169,8 @@ class Export(models.Model):
         ('PDF', 'PDF'),
         ('CSV', 'CSV'),
         ('JSON', 'JSON'),
+        ('PARQUET', 'Parquet'),
+        ('FEATHER', 'Arrow IPC (Feather)'),
     ]
     
     # Basic Information
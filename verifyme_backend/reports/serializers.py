@@ -4,6 +4,7 @@ from django.utils import timezone
 from datetime import timedelta
 
 from .models import Report, Export, Analytics, Dashboard
+from .export_jobs import export_job
 from accounts.serializers import UserSerializer, OrganizationSerializer
 
 
@@ -106,6 +107,16 @@ class ExportCreateSerializer(serializers.ModelSerializer):
         model = Export
         fields = ['export_type', 'format', 'filters']
     
+    def validate_filters(self, value):
+        """Entry filters, or a whole export job ({'filters', 'options', 'layout'})"""
+        value = value or {}
+        if 'filters' not in value:
+            value = {'filters': value}
+        try:
+            return export_job(value.get('filters'), value.get('options'), value.get('layout', 'standard'))
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+    
     def create(self, validated_data):
         """Create export with organization and user"""
         request = self.context.get('request')
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from utils.events import publish
+from .models import Export
+
+@receiver(post_save, sender=Export)
+def publish_export_progress(sender, instance, raw=False, **kwargs):
+    """Push export status and progress to the requesting user's dashboard"""
+    if raw:
+        return
+    publish(instance.organization_id, 'export.progress', {
+        'id': instance.pk,
+        'status': instance.status,
+        'progress': instance.progress,
+        'processed_records': instance.processed_records,
+        'total_records': instance.total_records,
+        'file_name': instance.file_name,
+        'error_message': instance.error_message,
+    }, user_id=instance.created_by_id)
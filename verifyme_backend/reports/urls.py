@@ -17,12 +17,13 @@ urlpatterns = [
     
     # Report endpoints
     path('api/reports/statistics/', ReportViewSet.as_view({'get': 'statistics'}), name='report-statistics'),
-    path('api/reports/<int:pk>/generate/', ReportViewSet.as_view({'post': 'generate'}), name='report-generate'),
-    path('api/reports/<int:pk>/schedule/', ReportViewSet.as_view({'post': 'schedule'}), name='report-schedule'),
+    path('api/reports/<uuid:pk>/generate/', ReportViewSet.as_view({'post': 'generate'}), name='report-generate'),
+    path('api/reports/<uuid:pk>/schedule/', ReportViewSet.as_view({'post': 'schedule'}), name='report-schedule'),
     
     # Export endpoints
     path('api/exports/statistics/', ExportViewSet.as_view({'get': 'statistics'}), name='export-statistics'),
-    path('api/exports/<int:pk>/download/', ExportViewSet.as_view({'post': 'download'}), name='export-download'),
+    path('api/exports/<uuid:pk>/download/', ExportViewSet.as_view({'post': 'download'}), name='export-download'),
+    path('api/exports/<uuid:pk>/cancel/', ExportViewSet.as_view({'post': 'cancel'}), name='export-cancel'),
     
     # Analytics endpoints
     path('api/analytics/statistics/', AnalyticsViewSet.as_view({'get': 'statistics'}), name='analytics-statistics'),
@@ -30,5 +31,5 @@ urlpatterns = [
     
     # Dashboard endpoints
     path('api/dashboards/statistics/', DashboardViewSet.as_view({'get': 'statistics'}), name='dashboard-statistics'),
-    path('api/dashboards/<int:pk>/set-default/', DashboardViewSet.as_view({'post': 'set_default'}), name='dashboard-set-default'),
+    path('api/dashboards/<uuid:pk>/set-default/', DashboardViewSet.as_view({'post': 'set_default'}), name='dashboard-set-default'),
 ] 
\ No newline at end of file
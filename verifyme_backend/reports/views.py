@@ -1,11 +1,14 @@
 from django.shortcuts import render
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Count, Q, Avg, Sum
 from django.utils import timezone
+from django.utils.text import slugify
+from django.core.files.storage import default_storage
 from datetime import timedelta
 import json
 import os
@@ -28,7 +31,18 @@ from .serializers import (
     DashboardStatisticsSerializer
 )
 from accounts.permissions import IsOrganizationAdmin
+from forms.views import require_password_verification
 from utils.storage import S3FileManager
+from .export_jobs import enqueue_export, export_job
+
+# Period exported by ReportViewSet.generate when a report has no date filters
+REPORT_DATE_RANGES = {
+    'DAILY': 'today',
+    'WEEKLY': 'week',
+    'MONTHLY': 'month',
+    'QUARTERLY': 'quarter',
+    'YEARLY': 'year',
+}
 
 
 class ReportViewSet(viewsets.ModelViewSet):
@@ -135,6 +149,7 @@ class ReportViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
     
     @action(detail=True, methods=['post'])
+    @require_password_verification
     def generate(self, request, pk=None):
         """Generate a report"""
         report = self.get_object()
@@ -153,25 +168,32 @@ class ReportViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Create export for this report
+        # Report parameters are entry filters; the period defaults to the report type's
+        filters = dict(report.parameters.get('filters', report.parameters))
+        if 'date_range' not in filters and report.report_type in REPORT_DATE_RANGES:
+            filters['date_range'] = REPORT_DATE_RANGES[report.report_type]
+        
         export = Export.objects.create(
-            export_type='CUSTOM',
+            export_type='FORM_DATA',
             format=report.format,
             organization=report.organization,
             created_by=user,
-            filters=report.parameters
+            filters=export_job(
+                filters,
+                {'include_attachments': report.include_attachments},
+                layout='enhanced',
+                file_name=f"{slugify(report.name) or 'report'}_{timezone.now():%Y%m%d_%H%M%S}",
+            )
         )
+        enqueue_export(export)
         
-        # Start processing (in a real app, this would be a background task)
-        export.start_processing()
-        
-        # For now, just mark as completed
-        export.complete_processing()
+        report.last_generated = timezone.now()
+        report.save(update_fields=['last_generated'])
         
         return Response({
             'message': 'Report generation started',
             'export_id': export.id
-        })
+        }, status=status.HTTP_202_ACCEPTED)
     
     @action(detail=True, methods=['post'])
     def schedule(self, request, pk=None):
@@ -238,22 +260,32 @@ class ExportViewSet(viewsets.ModelViewSet):
         else:
             return Export.objects.filter(created_by=user)
     
+    @require_password_verification
+    def create(self, request, *args, **kwargs):
+        """Start a background export; like the entry export views it needs the user's password"""
+        return super().create(request, *args, **kwargs)
+    
     def perform_create(self, serializer):
         """Set organization and created_by for new exports"""
         user = self.request.user
         
         if user.role == 'SUPER_ADMIN':
-            # Super admin can create exports for any organization
-            pass
+            # Super admin exports cover every organization, but the row still belongs to theirs
+            if user.organization_id is None:
+                raise ValidationError({'error': 'Background exports need a user with an organization'})
+            job = dict(serializer.validated_data.get('filters') or {}, all_organizations=True)
+            export = serializer.save(created_by=user, filters=job)
         elif user.role == 'ADMIN':
             # Admin can only create exports in their organization
-            serializer.save(
+            export = serializer.save(
                 organization=user.organization,
                 created_by=user
             )
-            return
+        else:
+            export = serializer.save(created_by=user)
         
-        serializer.save(created_by=user)
+        # Built by the export queue (reports/export_jobs.py)
+        enqueue_export(export)
     
     @action(detail=False, methods=['get'])
     def statistics(self, request):
@@ -346,6 +378,9 @@ class ExportViewSet(viewsets.ModelViewSet):
         
         # Generate presigned URL for S3 file
         download_url = S3FileManager.get_presigned_url(export.file_path, expiration=3600)
+        if not download_url:
+            # Local storage (development): served from MEDIA_URL
+            download_url = request.build_absolute_uri(default_storage.url(export.file_path))
         
         return Response({
             'download_url': download_url,
@@ -353,6 +388,24 @@ class ExportViewSet(viewsets.ModelViewSet):
             'file_size': export.file_size,
             'expires_in': 3600
         })
+    
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """Cancel a pending or running export"""
+        export = self.get_object()
+        
+        if export.status not in ('PENDING', 'PROCESSING'):
+            return Response(
+                {'error': f'Export is already {export.status.lower()}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # A running job notices at its next progress update
+        export.status = 'CANCELLED'
+        export.completed_at = timezone.now()
+        export.save(update_fields=['status', 'completed_at'])
+        
+        return Response({'message': 'Export cancelled', 'export_id': export.id})
 
 
 class AnalyticsViewSet(viewsets.ModelViewSet):
@@ -448,6 +501,7 @@ class AnalyticsViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
     
     @action(detail=False, methods=['post'])
+    @require_password_verification
     def generate(self, request):
         """Generate analytics for a specific period"""
         user = self.request.user
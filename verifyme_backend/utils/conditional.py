@@ -0,0 +1,131 @@
+"""
+Conditional GET (ETag / Last-Modified) for read endpoints.
+
+Validators are computed from cheap data - a row's updated_at and version, or
+one aggregate (max(updated_at), count) over a list's queryset - and checked
+against If-None-Match / If-Modified-Since before the response is serialized,
+so an unchanged resource costs one small query and a 304.
+
+The ETag also covers the request path and query string (filters, ordering,
+pagination) and the requesting user, since representations differ by role.
+Responses are marked private/no-cache: clients may keep them but revalidate
+on every use.
+"""
+import calendar
+import hashlib
+
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+INTEGER_PK_TYPES = ('AutoField', 'BigAutoField', 'SmallAutoField', 'IntegerField', 'BigIntegerField')
+
+
+def latest(*values):
+    """Most recent of some datetimes, ignoring missing ones"""
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def queryset_validators(queryset, *extra):
+    """(etag parts, last modified) of a list from one aggregate query.
+
+    The row count catches deletions, and for integer keys the sum of keys
+    catches one row being swapped for another (e.g. a many-to-many change).
+    """
+    aggregates = {'count': Count('pk'), 'modified': Max('updated_at')}
+    if queryset.model._meta.pk.get_internal_type() in INTEGER_PK_TYPES:
+        aggregates['keys'] = Sum('pk')
+    values = queryset.order_by().aggregate(**aggregates)
+    parts = (values['count'], values.get('keys'), values['modified']) + extra
+    return parts, values['modified']
+
+
+def instance_validators(instance, *extra):
+    """(etag parts, last modified) of one row from its key, version and updated_at"""
+    modified = getattr(instance, 'updated_at', None)
+    parts = (instance.pk, getattr(instance, 'version', None), modified) + extra
+    return parts, modified
+
+
+def make_etag(request, parts):
+    """Strong ETag for a resource state as seen by this request's user"""
+    user = getattr(request, 'user', None)
+    source = repr((request.get_full_path(), getattr(user, 'pk', None)) + tuple(parts))
+    return quote_etag(hashlib.md5(source.encode('utf-8')).hexdigest())
+
+
+def _timestamp(value):
+    return calendar.timegm(value.utctimetuple()) if value is not None else None
+
+
+def set_validators(response, etag, last_modified=None):
+    """Add ETag / Last-Modified and revalidation headers to a successful or 304 response"""
+    if not (200 <= response.status_code < 300 or response.status_code == 304):
+        return response
+    if not response.has_header('ETag'):
+        response['ETag'] = etag
+    if last_modified is not None and not response.has_header('Last-Modified'):
+        response['Last-Modified'] = http_date(_timestamp(last_modified))
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Authorization', 'Cookie'))
+    return response
+
+
+def conditional_get(request, validators, respond):
+    """304 when the client's copy is current, otherwise respond() with validators set.
+
+    validators is the (parts, last modified) pair of queryset_validators() /
+    instance_validators(); respond builds the full response and is only
+    called when needed.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return respond()
+    parts, last_modified = validators
+    etag = make_etag(request, parts)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=_timestamp(last_modified))
+    if not_modified is not None:
+        return set_validators(not_modified, etag, last_modified)
+    return set_validators(respond(), etag, last_modified)
+
+
+class ConditionalGetMixin:
+    """ETag / Last-Modified support for a viewset's list and retrieve actions.
+
+    The list is validated with queryset_validators() over the filtered
+    queryset and a single object with instance_validators(); override
+    get_list_validators / get_object_validators when the representation
+    depends on more than that.
+    """
+
+    conditional_actions = ('list', 'retrieve')
+
+    def get_list_validators(self, queryset):
+        return queryset_validators(queryset)
+
+    def get_object_validators(self, instance):
+        return instance_validators(instance)
+
+    def list(self, request, *args, **kwargs):
+        if 'list' not in self.conditional_actions:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return conditional_get(request, self.get_list_validators(queryset), lambda: self.respond_list(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        if 'retrieve' not in self.conditional_actions:
+            return super().retrieve(request, *args, **kwargs)
+        instance = self.get_object()
+        return conditional_get(request, self.get_object_validators(instance), lambda: self.respond_retrieve(instance))
+
+    def respond_list(self, queryset):
+        """ListModelMixin.list for an already filtered queryset"""
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
+
+    def respond_retrieve(self, instance):
+        """RetrieveModelMixin.retrieve for an already loaded object"""
+        return Response(self.get_serializer(instance).data)
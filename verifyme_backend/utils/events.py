@@ -0,0 +1,317 @@
+"""
+Server-sent events for real-time dashboards.
+
+Model signals publish small events (an entry was created or completed, a user
+logged in, an export moved on) to their organization's channel, and
+EventStreamView (forms/views.py) streams a channel to the browser as
+text/event-stream. Dashboards apply the events as deltas to what they loaded
+once instead of polling their statistics endpoints.
+
+The broker is pluggable through settings.EVENT_BROKER (a dotted path):
+
+    LocalEventBroker  in-process ring buffers, only reaching streams served by
+                      the same process (runserver, a single worker)
+    RedisEventBroker  Redis streams, so every worker sees every event
+
+Every event also goes to the ALL_ORGANIZATIONS channel for super admins.
+Events carry ids; a client reconnecting with Last-Event-ID gets what it
+missed, or a `resync` event telling it to refetch when that is gone.
+
+Streams are bounded (EVENT_STREAM_MAX_SECONDS) and hold no database
+connection while open; EventSource reconnects on its own after `retry`.
+Each open stream still holds a server thread, so a process serves at most
+EVENT_STREAM_MAX_STREAMS at once (EventStream); past that the view answers
+503 with Retry-After and the client reconnects later.
+"""
+import importlib
+import itertools
+import logging
+import threading
+import time
+import uuid
+from collections import deque, namedtuple
+
+from django.conf import settings
+from django.db import connections, transaction
+from rest_framework.renderers import BaseRenderer
+
+from .renderers import dumps
+
+logger = logging.getLogger(__name__)
+
+ALL_ORGANIZATIONS = 'all'
+
+EVENT_BUFFER_SIZE = getattr(settings, 'EVENT_BUFFER_SIZE', 1000)
+EVENT_STREAM_MAX_SECONDS = getattr(settings, 'EVENT_STREAM_MAX_SECONDS', 300)
+EVENT_STREAM_MAX_STREAMS = getattr(settings, 'EVENT_STREAM_MAX_STREAMS', 8)
+# Seconds a client turned away by the stream cap waits before reconnecting
+EVENT_STREAM_RETRY_AFTER = 30
+EVENT_HEARTBEAT_SECONDS = 15
+# EventSource reconnect delay after a stream ends
+EVENT_RETRY_MS = 2000
+
+Event = namedtuple('Event', 'id name data user')
+
+
+def channel_for(organization_id):
+    return f'events:{organization_id or ALL_ORGANIZATIONS}'
+
+
+class LocalEventBroker:
+    """In-process pub/sub over per-channel ring buffers"""
+
+    def __init__(self, buffer_size=EVENT_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        # Ids from another process (or before a restart) are recognized as foreign
+        self.token = uuid.uuid4().hex[:8]
+        self._sequences = {}
+        self._channels = {}
+        self._condition = threading.Condition()
+
+    def _parse(self, event_id):
+        token, _, sequence = str(event_id or '').partition('-')
+        return int(sequence) if token == self.token and sequence.isdigit() else None
+
+    def _buffer(self, channel):
+        return self._channels.setdefault(channel, deque(maxlen=self.buffer_size))
+
+    def _tail(self, buffer):
+        return self._parse(buffer[-1].id) if buffer else 0
+
+    def publish(self, channel, name, data, user=None):
+        with self._condition:
+            # Consecutive per channel, so a gap means the ring buffer dropped events
+            sequence = self._sequences.setdefault(channel, itertools.count(1))
+            event = Event(f'{self.token}-{next(sequence)}', name, data, user)
+            self._buffer(channel).append(event)
+            self._condition.notify_all()
+        return event.id
+
+    def cursor(self, channel, last_event_id=None):
+        """(cursor, missed) to read a channel from.
+
+        When last_event_id can't be resumed, missed is set and the cursor is
+        the tail: the client refetches its state, and replaying the rest on
+        top of that would count events twice.
+        """
+        with self._condition:
+            buffer = self._buffer(channel)
+            tail = self._tail(buffer)
+            if not last_event_id:
+                return tail, False
+            sequence = self._parse(last_event_id)
+            if sequence is None:
+                return tail, True
+            oldest = self._parse(buffer[0].id) if buffer else tail + 1
+            if sequence < oldest - 1 or sequence > tail:
+                return tail, True
+            return sequence, False
+
+    def read(self, channel, cursor, timeout):
+        """(events after cursor, new cursor, missed), waiting up to timeout seconds for one"""
+        with self._condition:
+            buffer = self._buffer(channel)
+            if self._tail(buffer) <= cursor:
+                self._condition.wait(timeout)
+            events = [event for event in buffer if self._parse(event.id) > cursor]
+            if events and self._parse(events[0].id) > cursor + 1:
+                # Dropped while the client was reading: it refetches and continues from here
+                return [], self._tail(buffer), True
+            return events, (self._parse(events[-1].id) if events else cursor), False
+
+
+class RedisEventBroker:
+    """Pub/sub over capped Redis streams, shared by every worker"""
+
+    def __init__(self, url=None, buffer_size=EVENT_BUFFER_SIZE):
+        import redis
+
+        self.buffer_size = buffer_size
+        self.client = redis.Redis.from_url(
+            url or getattr(settings, 'REDIS_URL', None) or 'redis://localhost:6379/0',
+            socket_connect_timeout=1,
+            # Reads block for up to a heartbeat
+            socket_timeout=EVENT_HEARTBEAT_SECONDS + 5,
+        )
+
+    @staticmethod
+    def _id(value):
+        value = value.decode() if isinstance(value, bytes) else str(value)
+        milliseconds, _, sequence = value.partition('-')
+        return int(milliseconds), int(sequence or 0)
+
+    def publish(self, channel, name, data, user=None):
+        fields = {'event': name, 'data': data, 'user': user or ''}
+        event_id = self.client.xadd(channel, fields, maxlen=self.buffer_size, approximate=True)
+        return event_id.decode() if isinstance(event_id, bytes) else event_id
+
+    def cursor(self, channel, last_event_id=None):
+        latest = self.client.xrevrange(channel, count=1)
+        tail = latest[0][0].decode() if latest else '0-0'
+        if not last_event_id:
+            return tail, False
+        try:
+            last = self._id(last_event_id)
+        except ValueError:
+            return tail, True
+        if last >= self._id(tail):
+            return tail, last > self._id(tail)
+        oldest = self.client.xrange(channel, count=1)
+        if self._id(oldest[0][0]) > last:
+            # Trimmed past the client's last event: it refetches and continues from here
+            return tail, True
+        return last_event_id, False
+
+    def read(self, channel, cursor, timeout):
+        response = self.client.xread({channel: cursor}, count=self.buffer_size, block=int(timeout * 1000))
+        events = []
+        for _, entries in response or ():
+            for event_id, fields in entries:
+                fields = {key.decode(): value.decode() for key, value in fields.items()}
+                events.append(Event(event_id.decode(), fields['event'], fields['data'], fields['user'] or None))
+        return events, (events[-1].id if events else cursor), False
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """The configured broker (settings.EVENT_BROKER), created once per process"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(settings, 'EVENT_BROKER', 'utils.events.LocalEventBroker')
+                module, _, name = path.rpartition('.')
+                _broker = getattr(importlib.import_module(module), name)()
+    return _broker
+
+
+def use_broker(broker):
+    """Replace the broker (e.g. a fresh LocalEventBroker in tests)"""
+    global _broker
+    _broker = broker
+
+
+def publish(organization_id, name, data, user_id=None):
+    """Send an event to an organization's channel and the super-admin one after the transaction commits.
+
+    `data` is a dict, or a callable returning one when building it needs
+    queries; either way it is encoded after the commit, so nothing but the
+    callback registration happens inside the write's transaction.
+    user_id is the employee an event concerns; employees only receive their own.
+    Failures are logged, never raised into the write that caused the event.
+    """
+    user = str(user_id) if user_id else None
+
+    def send():
+        try:
+            fields = data() if callable(data) else data
+            payload = dumps({'type': name, 'organization': organization_id, **fields}).decode('utf-8')
+        except Exception as e:
+            logger.warning(f"Could not build {name} event: {e}")
+            return
+        channels = {channel_for(ALL_ORGANIZATIONS)}
+        if organization_id:
+            channels.add(channel_for(organization_id))
+        for channel in channels:
+            try:
+                get_broker().publish(channel, name, payload, user)
+            except Exception as e:
+                logger.warning(f"Could not publish {name} to {channel}: {e}")
+
+    transaction.on_commit(send)
+
+
+def format_event(event=None, name=None, data=None, comment=None):
+    """One text/event-stream message"""
+    if comment is not None:
+        return f': {comment}\n\n'.encode('utf-8')
+    if event is not None:
+        lines = [f'id: {event.id}', f'event: {event.name}']
+        data = event.data
+    else:
+        lines = [f'event: {name}']
+    lines.extend(f'data: {line}' for line in (data or '').split('\n'))
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+def event_stream(organization_id, last_event_id=None, user_id=None, broker=None,
+                 max_seconds=EVENT_STREAM_MAX_SECONDS, heartbeat=EVENT_HEARTBEAT_SECONDS):
+    """Yield a channel as text/event-stream for max_seconds, then end so the client reconnects.
+
+    user_id limits the stream to events about that user (employees).
+    """
+    # The request's database connection isn't needed while the stream is open
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close()
+
+    broker = broker or get_broker()
+    channel = channel_for(organization_id)
+    user = str(user_id) if user_id else None
+    yield f'retry: {EVENT_RETRY_MS}\n\n'.encode('utf-8')
+
+    cursor, missed = broker.cursor(channel, last_event_id)
+    if missed:
+        yield format_event(name='resync', data='{}')
+    deadline = time.monotonic() + max_seconds
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        events, cursor, missed = broker.read(channel, cursor, min(heartbeat, remaining))
+        if missed:
+            yield format_event(name='resync', data='{}')
+        sent = False
+        for event in events:
+            if user is None or event.user == user:
+                yield format_event(event)
+                sent = True
+        if not sent:
+            # Keeps proxies from closing an idle connection
+            yield format_event(comment='keepalive')
+
+
+class StreamLimitReached(Exception):
+    """This process already serves EVENT_STREAM_MAX_STREAMS event streams"""
+
+
+_stream_slots = threading.BoundedSemaphore(EVENT_STREAM_MAX_STREAMS)
+
+
+class EventStream:
+    """event_stream() holding one of the process's stream slots until it is closed.
+
+    Raises StreamLimitReached when every slot is taken. StreamingHttpResponse
+    closes it when the response ends, including a stream that never started.
+    """
+
+    def __init__(self, *args, **kwargs):
+        if not _stream_slots.acquire(blocking=False):
+            raise StreamLimitReached(f"Already serving {EVENT_STREAM_MAX_STREAMS} event streams")
+        self._released = False
+        self._stream = event_stream(*args, **kwargs)
+
+    def __iter__(self):
+        return self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            if not self._released:
+                self._released = True
+                _stream_slots.release()
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets DRF accept `Accept: text/event-stream`; errors are sent as one `error` event"""
+
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_event(name='error', data=dumps(data).decode('utf-8'))
@@ -0,0 +1,152 @@
+"""
+Parallel rendering of long tabular PDF reports.
+
+reportlab lays a story out on one core, and one Table holding every row gets
+slower the longer it is. render_table_pdf() splits the rows into chunks,
+renders each chunk as its own PDF in a process pool and appends the parts, in
+order, into one document with pypdf. The caller plans everything a part needs
+(header, column widths, table style) once and sends it as plain data, so the
+workers don't need Django.
+
+A render that passes its timeout raises PDFRenderTimeout, and the pool's
+workers are terminated. Without pypdf (an optional dependency), with one
+worker or with a single chunk, the document is rendered in-process. So is
+it when the caller's pool_slots semaphore has no slot free, which caps the
+pools (and so the processes) a web process runs at once.
+
+Story items are tuples:
+
+    ('paragraph', text, style)          style: ParagraphStyle keywords, 'parent'
+                                        naming a sample style (default Normal)
+    ('spacer', height)
+    ('table', data, col_widths, style)  style: TableStyle commands
+
+Table cells are strings, or (text, url) tuples rendered as links.
+"""
+import io
+import itertools
+import multiprocessing
+import time
+from xml.sax.saxutils import escape, quoteattr
+
+from reportlab.lib.pagesizes import A4, letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # pragma: no cover - optional dependency
+    PdfReader = PdfWriter = None
+
+PAGE_SIZES = {'A4': A4, 'letter': letter}
+
+# forkserver children start from a clean process, not a copy of a threaded worker
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class PDFRenderTimeout(Exception):
+    """Rendering took longer than the caller allowed"""
+
+
+def _paragraph_style(styles, params):
+    params = dict(params)
+    parent = styles[params.pop('parent', 'Normal')]
+    return ParagraphStyle(params.pop('name', f'{parent.name}Custom'), parent=parent, **params)
+
+
+def _flowables(items, styles):
+    for item in items:
+        kind = item[0]
+        if kind == 'paragraph':
+            yield Paragraph(item[1], _paragraph_style(styles, item[2]))
+        elif kind == 'spacer':
+            yield Spacer(1, item[1])
+        elif kind == 'table':
+            table = Table(item[1], colWidths=item[2])
+            table.setStyle(TableStyle(item[3]))
+            yield table
+        else:
+            raise ValueError(f"Unknown story item: {kind}")
+
+
+def render_part(document, head, table, rows):
+    """One PDF (bytes): the head items, then a table of rows repeating its header on every page"""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=PAGE_SIZES[document.get('pagesize', 'A4')], **document.get('margins', {}))
+    styles = getSampleStyleSheet()
+    story = list(_flowables(head, styles))
+    if rows:
+        link_style = _paragraph_style(styles, table['link_style']) if table.get('link_style') else styles['Normal']
+        data = [table['headers']]
+        for row in rows:
+            data.append([
+                Paragraph(f'<link href={quoteattr(cell[1])}>{escape(cell[0])}</link>', link_style)
+                if isinstance(cell, tuple) else cell
+                for cell in row
+            ])
+        entries_table = Table(data, colWidths=table['col_widths'], repeatRows=1)
+        entries_table.setStyle(TableStyle(table['style']))
+        story.append(entries_table)
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def render_table_pdf(output, document, head, table, rows, chunk_rows=500, workers=1, timeout=None,
+                     pool_slots=None):
+    """Write the head items and a table of rows to the file object output.
+
+    Rows are read as parts are submitted, so rendering overlaps reading them.
+    pool_slots (a threading semaphore shared by the callers) is held while a
+    pool renders; when it can't be taken the rows are rendered in-process.
+    """
+    deadline = time.monotonic() + timeout if timeout else None
+
+    def remaining():
+        if deadline is None:
+            return None
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise PDFRenderTimeout(f"PDF rendering took longer than {timeout}s")
+        return left
+
+    chunks = _chunks(rows, chunk_rows)
+    first = next(chunks, [])
+    second = next(chunks, None)
+    parallel = second is not None and workers > 1 and PdfWriter is not None
+    if parallel and pool_slots is not None:
+        # Every pool this process may run is busy: render here rather than start another
+        parallel = pool_slots.acquire(blocking=False)
+    if not parallel:
+        rows = first + (second or []) + [row for chunk in chunks for row in chunk]
+        output.write(render_part(document, head, table, rows))
+        remaining()
+        return
+
+    try:
+        # Leaving the block terminates the pool, including parts still rendering after a timeout
+        with multiprocessing.get_context(START_METHOD).Pool(workers) as pool:
+            results = [pool.apply_async(render_part, (document, head, table, first))]
+            for chunk in itertools.chain([second], chunks):
+                remaining()
+                results.append(pool.apply_async(render_part, (document, [], table, chunk)))
+
+            writer = PdfWriter()
+            for result in results:
+                try:
+                    part = result.get(remaining())
+                except multiprocessing.TimeoutError:
+                    raise PDFRenderTimeout(f"PDF rendering took longer than {timeout}s")
+                writer.append(PdfReader(io.BytesIO(part)))
+            writer.write(output)
+    finally:
+        if pool_slots is not None:
+            pool_slots.release()
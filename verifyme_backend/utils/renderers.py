@@ -0,0 +1,109 @@
+"""
+JSON renderer and parser backed by orjson, plus streaming JSON list responses.
+
+FastJSONRenderer / FastJSONParser are drop-in replacements for DRF's
+JSONRenderer / JSONParser (see REST_FRAMEWORK in settings). When orjson is not
+installed, or a request needs something orjson can't do (indented output,
+a non UTF-8 request body), they fall back to the stock implementations, so
+output is the same either way.
+
+streaming_json_response() writes a JSON array incrementally from an iterator
+of row chunks, for list responses too large to build in memory.
+"""
+import logging
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.utils import encoders
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# DRF escapes these so the output is also valid JavaScript
+_LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+# Dates go through DRF's encoder so they look exactly as they did before
+_ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+_drf_encoder = encoders.JSONEncoder()
+
+
+def _default(value):
+    """Types orjson doesn't encode natively (Decimal, lazy strings, dates, ...)"""
+    return _drf_encoder.default(value)
+
+
+def _escape_line_separators(content):
+    for raw, escaped in _LINE_SEPARATORS:
+        if raw in content:
+            content = content.replace(raw, escaped)
+    return content
+
+
+def dumps(data):
+    """Encode data as compact JSON bytes, matching DRF's JSONRenderer output"""
+    if orjson is None:
+        return JSONRenderer().render(data)
+    return _escape_line_separators(orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS))
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer using orjson for compact output"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return dumps(data)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits or NaN; the stdlib encoder decides
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser using orjson for UTF-8 request bodies"""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+def iter_json_list(chunks):
+    """Yield a JSON array as bytes, one piece per chunk of rows"""
+    yield b'['
+    first = True
+    for rows in chunks:
+        if not rows:
+            continue
+        encoded = dumps(list(rows))
+        # Drop the chunk's own brackets and join it to the previous one
+        yield (b'' if first else b',') + encoded[1:-1]
+        first = False
+    yield b']'
+
+
+def streaming_json_response(chunks, status=200, filename=None):
+    """StreamingHttpResponse writing a JSON array from an iterator of row chunks"""
+    response = StreamingHttpResponse(iter_json_list(chunks), content_type='application/json', status=status)
+    if filename:
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -122,6 +122,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
@@ -239,10 +240,10 @@ REST_FRAMEWORK = {
         'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'utils.renderers.FastJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'utils.renderers.FastJSONParser',
         'rest_framework.parsers.MultiPartParser',
         'rest_framework.parsers.FileUploadParser',
     ],
@@ -303,6 +304,9 @@ CORS_ALLOWED_HEADERS = [
     'x-requested-with',
 ]
 
+# Read by the dashboard event stream when the server is at its stream limit
+CORS_EXPOSE_HEADERS = ['retry-after']
+
 # Security Settings
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -360,13 +364,47 @@ FIELD_ENCRYPTION_KEY = os.environ.get('FIELD_ENCRYPTION_KEY', 'your-32-character
 FILE_UPLOAD_PERMISSIONS = 0o644
 
 # Cache Configuration (Redis for production)
+REDIS_URL = os.environ.get('REDIS_URL')
+
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'unique-snowflake',
-    }
+    },
+    # Counts, statistics and their data versions (see forms/data_version.py);
+    # shared between processes when Redis is available
+    'statistics': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+        'KEY_PREFIX': 'verifyme',
+        'OPTIONS': {
+            'socket_connect_timeout': 0.5,
+            'socket_timeout': 0.5,
+        },
+    } if REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'statistics',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
 }
 
+STATISTICS_CACHE_ALIAS = 'statistics'
+# Without Redis every process has its own versions, so keep entries short-lived
+STATISTICS_CACHE_TIMEOUT = 300 if REDIS_URL else 30
+
+# Dashboard events (see utils/events.py); the local broker only reaches
+# streams served by the publishing process
+EVENT_BROKER = 'utils.events.RedisEventBroker' if REDIS_URL else 'utils.events.LocalEventBroker'
+EVENT_STREAM_MAX_SECONDS = 300
+# Open streams per process; each holds a gunicorn thread (16 per worker), so
+# this leaves the rest for ordinary requests
+EVENT_STREAM_MAX_STREAMS = int(os.environ.get('EVENT_STREAM_MAX_STREAMS', 8))
+
+# Background exports (see reports/export_jobs.py). The thread queue runs them
+# in the web process; with DatabaseExportQueue `manage.py run_exports` does
+EXPORT_QUEUE = os.environ.get('EXPORT_QUEUE', 'reports.export_jobs.ThreadExportQueue')
+EXPORT_WORKER_THREADS = 2
+
 # Session Configuration
 SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 SESSION_COOKIE_AGE = 3600  # 1 hour
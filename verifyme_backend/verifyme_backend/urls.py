@@ -37,11 +37,13 @@ urlpatterns = [
     path('accounts/', include('accounts.urls', namespace='accounts_direct')),
     path('forms/', include('forms.urls', namespace='forms_direct')),
     path('logs/', include('logs.urls', namespace='logs_direct')),
+    path('reports/', include('reports.urls', namespace='reports_direct')),
     
     # Alternative paths for compatibility
     path('api/accounts/', include('accounts.urls', namespace='accounts_api')),
     path('api/forms/', include('forms.urls', namespace='forms_api')),
     path('api/logs/', include('logs.urls', namespace='logs_api')),
+    path('api/reports/', include('reports.urls', namespace='reports_api')),
     
     # Test endpoint
     path('api/test/', test_view, name='test'),
@@ -7,6 +7,7 @@ import { Button } from '@/components/ui/button'
 import { Input } from '@/components/ui/input'
 import { BarChart3, Activity, Users, Building2, Search, RefreshCw, LogIn, LogOut, Clock } from 'lucide-react'
 import { apiClient } from '@/lib/api'
+import { useEventStream, DashboardEvent } from '@/hooks/useEventStream'
 import { toast } from 'sonner'
 
 interface RealTimeAnalytics {
@@ -48,11 +49,33 @@ export default function SuperAdminAnalyticsPage() {
 
   useEffect(() => {
     fetchAnalytics()
-    // Set up auto-refresh every 30 seconds
-    const interval = setInterval(fetchAnalytics, 30000)
-    return () => clearInterval(interval)
   }, [])
 
+  // Live updates: logins and logouts are applied as they happen instead of
+  // polling; anything the events can't express triggers a refetch
+  const applyActivity = (event: DashboardEvent) => {
+    const activity = event.data as unknown as RealTimeAnalytics['recent_activities'][number]
+    const login = activity.action === 'LOGIN'
+    setAnalytics(current => current && {
+      ...current,
+      activities: {
+        total_logins: current.activities.total_logins + (login ? 1 : 0),
+        total_logouts: current.activities.total_logouts + (login ? 0 : 1),
+        logins_today: current.activities.logins_today + (login ? 1 : 0),
+        logouts_today: current.activities.logouts_today + (login ? 0 : 1)
+      },
+      recent_activities: [activity, ...current.recent_activities].slice(0, 20),
+      last_updated: activity.timestamp
+    })
+  }
+
+  useEventStream({
+    'activity.login': applyActivity,
+    'activity.logout': applyActivity,
+    'activity.user_created': () => fetchAnalytics(),
+    resync: () => fetchAnalytics()
+  })
+
   const fetchAnalytics = async () => {
     try {
       setLoading(true)
@@ -0,0 +1,146 @@
+'use client';
+
+import { useEffect, useRef } from 'react';
+import { apiClient } from '@/lib/api';
+
+const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
+
+export interface DashboardEvent<T = Record<string, unknown>> {
+  id?: string;
+  type: string;
+  data: T;
+}
+
+export type DashboardEventHandlers = Record<string, (event: DashboardEvent) => void>;
+
+interface UseEventStreamOptions {
+  // Super admins: stream one organization instead of all of them
+  organization?: string;
+  enabled?: boolean;
+}
+
+type RefreshResult = 'refreshed' | 'logged-out' | 'failed';
+
+// The api.ts flow: trade the refresh token for a new access token, or send the user to log in
+const refreshAccessToken = async (): Promise<RefreshResult> => {
+  const refreshToken = localStorage.getItem('refresh_token');
+  if (!refreshToken) {
+    localStorage.removeItem('access_token');
+    window.location.href = '/login';
+    return 'logged-out';
+  }
+  try {
+    const tokens = await apiClient.refresh(refreshToken);
+    localStorage.setItem('access_token', tokens.access);
+    if (tokens.refresh) localStorage.setItem('refresh_token', tokens.refresh);
+    return 'refreshed';
+  } catch (error) {
+    // A rejected refresh token is a 401, which the api interceptor turns into a redirect to /login
+    const status = (error as { response?: { status?: number } }).response?.status;
+    return status === 401 ? 'logged-out' : 'failed';
+  }
+};
+
+/**
+ * Subscribe to the server-sent dashboard events (`/forms/api/events/`).
+ *
+ * Uses fetch instead of EventSource so the access token goes in the
+ * Authorization header. The server ends each stream after a few minutes;
+ * the hook reconnects with the last event id so nothing is missed. An expired
+ * access token is refreshed and the stream reconnected. A `resync` event
+ * means events were lost and the dashboard should refetch its data.
+ */
+export const useEventStream = (handlers: DashboardEventHandlers, options: UseEventStreamOptions = {}) => {
+  const { organization, enabled = true } = options;
+  const handlersRef = useRef(handlers);
+  handlersRef.current = handlers;
+
+  useEffect(() => {
+    if (!enabled) return;
+    const controller = new AbortController();
+    let lastEventId: string | undefined;
+    let retryMs = 2000;
+    let refreshed = false;
+
+    const dispatch = (block: string) => {
+      let id: string | undefined;
+      let type = 'message';
+      const data: string[] = [];
+      for (const line of block.split('\n')) {
+        if (line.startsWith('retry:')) retryMs = Number(line.slice(6).trim()) || retryMs;
+        else if (line.startsWith('id:')) id = line.slice(3).trim();
+        else if (line.startsWith('event:')) type = line.slice(6).trim();
+        else if (line.startsWith('data:')) data.push(line.slice(5).trimStart());
+      }
+      if (id) lastEventId = id;
+      if (!data.length) return;
+      const handler = handlersRef.current[type] || handlersRef.current['*'];
+      if (!handler) return;
+      try {
+        handler({ id, type, data: JSON.parse(data.join('\n')) });
+      } catch (error) {
+        console.error('Error handling dashboard event:', type, error);
+      }
+    };
+
+    const connect = async () => {
+      while (!controller.signal.aborted) {
+        let waitMs = retryMs;
+        try {
+          const token = localStorage.getItem('access_token');
+          const url = new URL('/forms/api/events/', API_BASE_URL);
+          if (organization) url.searchParams.set('organization', organization);
+          // A query parameter rather than the Last-Event-ID header, which CORS would have to allow
+          if (lastEventId) url.searchParams.set('last_event_id', lastEventId);
+          const response = await fetch(url.toString(), {
+            headers: {
+              Accept: 'text/event-stream',
+              ...(token ? { Authorization: `Bearer ${token}` } : {}),
+            },
+            signal: controller.signal,
+          });
+          if (response.status === 401) {
+            // A fresh token that is rejected too won't get better by retrying
+            if (refreshed) return;
+            refreshed = true;
+            const result = await refreshAccessToken();
+            if (result === 'logged-out') return;
+            if (result === 'refreshed') continue; // reconnect right away with the new token
+            refreshed = false; // the refresh itself failed (e.g. offline): try it again after the wait
+            throw new Error('Could not refresh the access token');
+          }
+          if (response.status === 403) return;
+          if (response.status === 503) {
+            // The server is at its open stream limit; come back when it says to
+            const retryAfter = Number(response.headers.get('Retry-After'));
+            if (retryAfter > 0) waitMs = retryAfter * 1000;
+          }
+          if (!response.ok || !response.body) throw new Error(`Event stream failed: ${response.status}`);
+          refreshed = false;
+
+          const reader = response.body.getReader();
+          const decoder = new TextDecoder();
+          let buffer = '';
+          while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let boundary = buffer.indexOf('\n\n');
+            while (boundary !== -1) {
+              dispatch(buffer.slice(0, boundary));
+              buffer = buffer.slice(boundary + 2);
+              boundary = buffer.indexOf('\n\n');
+            }
+          }
+        } catch (error) {
+          if (controller.signal.aborted) return;
+          console.warn('Dashboard event stream interrupted, reconnecting:', error);
+        }
+        await new Promise((resolve) => setTimeout(resolve, waitMs));
+      }
+    };
+
+    connect();
+    return () => controller.abort();
+  }, [organization, enabled]);
+};
@@ -298,8 +298,9 @@ export const apiClient = {
   // Form Entries
   getFormEntries: async (params?: Record<string, unknown>) => {
     try {
+      // Dashboards still read form_schema_details, so ask for the full representation
       const response = await api.get('/forms/api/entries/', { 
-        params: params || {} 
+        params: { fields: 'all', ...(params || {}) } 
       });
       return response.data;
     } catch (error) {
@@ -317,7 +318,7 @@ export const apiClient = {
   advancedFilterEntries: async (filters: Record<string, unknown>) => {
     try {
       console.log('🔍 Sending advanced filter request with data:', { filters })
-      const response = await api.post('/forms/api/entries/advanced-filter/', filters);
+      const response = await api.post('/forms/api/entries/advanced-filter/', { fields: 'all', ...filters });
       console.log('🔍 Received advanced filter response:', response.data)
       return response.data;
     } catch (error) {
@@ -534,9 +535,31 @@ export const apiClient = {
     return response.data;
   },
 
+  // Background export: returns { export_id } right away; progress arrives as
+  // export.progress events (useEventStream) and the file via downloadExport
+  startBackgroundExport: async (data: Record<string, unknown>) => {
+    const response = await api.post('/forms/api/export/', { ...data, async: true });
+    return response.data as { message: string; export_id: string; status: string };
+  },
+
+  getExport: async (exportId: string) => {
+    const response = await api.get(`/reports/api/exports/${exportId}/`);
+    return response.data;
+  },
+
+  downloadExport: async (exportId: string) => {
+    const response = await api.post(`/reports/api/exports/${exportId}/download/`);
+    return response.data as { download_url: string; file_name: string; file_size: number; expires_in: number };
+  },
+
+  cancelExport: async (exportId: string) => {
+    const response = await api.post(`/reports/api/exports/${exportId}/cancel/`);
+    return response.data;
+  },
+
   // Enhanced export functionality with date range filtering
   enhancedExportData: async (exportData: {
-    format: 'excel' | 'pdf' | 'csv'
+    format: 'excel' | 'pdf' | 'csv' | 'parquet' | 'feather'
     filters: {
       date_range?: 'all' | 'last_7_days' | 'last_30_days' | 'last_90_days' | 'custom'
       custom_start_date?: string
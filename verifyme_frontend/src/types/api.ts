@@ -231,7 +231,7 @@ export interface FormFieldFile {
 
 // Export Types
 export interface ExportOptions {
-  format: 'excel' | 'pdf' | 'csv'
+  format: 'excel' | 'pdf' | 'csv' | 'json' | 'parquet' | 'feather'
   filters?: FormEntryFilters
   includeFields?: string[]
   excludeFields?: string[]